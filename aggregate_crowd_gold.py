@@ -0,0 +1,85 @@
+"""
+Crowd Gold Aggregator - Turns crowd annotations into gold annotation files, incrementally.
+
+Reads the submissions added to the annotation store since the last run,
+updates the per-snippet vote tallies in `crowd_annotations/aggregation.db`
+(see `src/crowd_aggregation.py`), and rewrites the gold file of every chapter
+those submissions touched:
+
+    crowd_gold_annotations/<book>_chapter_<NNN>_crowd.json
+
+Each file holds the majority-vote (or confidence-weighted) interactions with
+their vote counts and the chapter's agreement statistics. They only cover the
+annotated paragraphs, which each file lists; evaluate against them with
+`run_evaluation.py --gold-dir crowd_gold_annotations`, which scores only the
+predictions from those paragraphs. Only snippets from the prioritised snippet
+index (`build_snippet_index.py`) can be placed in a chapter.
+
+Usage:
+    uv run aggregate_crowd_gold.py                    # New submissions only
+    uv run aggregate_crowd_gold.py --vote weighted --all
+    uv run aggregate_crowd_gold.py --rebuild          # Recount from the first submission
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from src.settings import Settings
+from src.annotation_store import AnnotationStore, store_path
+from src.character_mapper import CharacterMapper
+from src.crowd_aggregation import VOTE_MODES, CrowdAggregator, state_path, write_gold_files
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate crowd annotations into gold annotation files.")
+    parser.add_argument("--annotations-dir", type=Path, default=None,
+                        help="Crowd annotation directory (default: data.crowd_annotations_dir).")
+    parser.add_argument("--output-dir", type=Path, default=None,
+                        help="Where gold files are written (default: data.crowd_gold_dir).")
+    parser.add_argument("--vote", choices=VOTE_MODES, default=None,
+                        help="Vote rule (default: annotation.gold_vote).")
+    parser.add_argument("--min-annotators", type=int, default=None,
+                        help="Annotators a snippet needs before it counts (default: annotation.gold_min_annotators).")
+    parser.add_argument("--all", action="store_true",
+                        help="Rewrite every chapter's gold file, e.g. after changing --vote.")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the tallies and recount everything.")
+    args = parser.parse_args()
+
+    settings = Settings(config_path="config.yaml")
+    annotations_dir = args.annotations_dir or settings.CROWD_ANNOTATIONS_DIR
+    if not store_path(annotations_dir).exists():
+        print(f"FATAL: No annotation store in '{annotations_dir}'. "
+              f"Collect annotations with the survey app or run import_crowd_annotations.py.")
+        sys.exit(1)
+    output_dir = args.output_dir or settings.CROWD_GOLD_DIR
+    legacy = sorted(settings.GOLD_ANNOTATIONS_DIR.glob("*_crowd.json"))
+    if legacy and Path(output_dir).resolve() != settings.GOLD_ANNOTATIONS_DIR.resolve():
+        print(f"WARNING: {len(legacy)} crowd gold file(s) from an earlier version are in "
+              f"'{settings.GOLD_ANNOTATIONS_DIR}'. They cover only the annotated passages; delete them "
+              f"so they are not scored as whole chapters.")
+    vote = args.vote or settings.GOLD_VOTE
+    min_annotators = args.min_annotators or settings.GOLD_MIN_ANNOTATORS
+
+    if args.rebuild:
+        for path in state_path(annotations_dir).parent.glob(f"{state_path(annotations_dir).name}*"):
+            path.unlink()
+
+    start = time.perf_counter()
+    character_mapper = CharacterMapper(file_path=str(settings.CHARACTER_FILE))
+    aggregator = CrowdAggregator(state_path(annotations_dir), name_resolver=character_mapper.get_canonical_name)
+    previous = aggregator.watermark
+    read, unplaced, touched = aggregator.consume(AnnotationStore(store_path(annotations_dir)))
+    documents = set(aggregator.documents()) if args.all or args.rebuild else touched
+    written = write_gold_files(aggregator, documents, output_dir, vote=vote, min_annotators=min_annotators)
+
+    print(f"\nRead {read} new submission(s) after row {previous} (now at row {aggregator.watermark}) "
+          f"in {time.perf_counter() - start:.2f}s.")
+    if unplaced:
+        print(f"WARNING: {unplaced} submission(s) are for snippets outside the snippet index "
+              f"and have no chapter; they were skipped.")
+    print(f"{len(documents)} chapter(s) to update, {len(written)} with at least {min_annotators} "
+          f"annotators per snippet ({vote} vote):")
+    for path in written:
+        print(f"  -> {path}")
+    aggregator.close()
@@ -0,0 +1,142 @@
+"""
+Batch Analysis Driver - Builds, analyzes and visualizes every book in one process.
+
+Replaces the per-book `build_graph.py` + `analyze_graph.py` subprocesses of
+`analyze_all.sh`: configuration and the character map are loaded once and
+shared with a process pool, each book's results are read once, and the graph
+that was just built is analyzed directly instead of being re-derived.
+
+The pool runs three phases: build every graph, detect communities for every
+graph and chapter window in one batch (cached by graph hash), then write the
+reports and visualizations.
+
+Usage:
+    uv run analyze_all.py                     # All books + the combined novel
+    uv run analyze_all.py book_1 book_2       # Selected books only
+    uv run analyze_all.py --workers 4 --no-novel
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+
+from src.settings import Settings
+from src.character_mapper import CharacterMapper
+from src.analytics_cache import REPORT_FORMATS
+from src.communities import CommunityResult, community_graphs, detect_communities_batch
+from src.graph_builder import ChapterEdges, build_interaction_graph, result_files, save_graph_artifact
+from src.pipeline import analyze_graph_artifact, community_cache_dir, community_config_from_settings
+
+NOVEL_NAME = "novel"
+
+# State loaded once per worker process by the pool initializer
+_SETTINGS: Optional[Settings] = None
+_CHARACTER_MAPPER: Optional[CharacterMapper] = None
+
+
+def _init_worker(settings: Settings, character_mapper: CharacterMapper):
+    global _SETTINGS, _CHARACTER_MAPPER
+    _SETTINGS = settings
+    _CHARACTER_MAPPER = character_mapper
+
+
+def build_graph(name: str, book_names: List[str]) -> Tuple[nx.Graph, ChapterEdges, float]:
+    """Build and save the graph for one book (or several books concatenated)."""
+    start = time.perf_counter()
+    results_dirs = [_SETTINGS.RESULTS_DIR / book_name for book_name in book_names]
+
+    graph, chapter_edges = build_interaction_graph(results_dirs, _CHARACTER_MAPPER)
+    save_graph_artifact(graph, _SETTINGS.GRAPH_ARTIFACTS_DIR / f"{name}_graph.gml")
+    return graph, chapter_edges, time.perf_counter() - start
+
+
+def analyze_graph(name: str, graph: nx.Graph, chapter_edges: ChapterEdges,
+                  communities: Dict[Tuple[str, Optional[int]], CommunityResult], visualize: bool = True,
+                  top_n: Optional[int] = None, formats: Optional[List[str]] = None) -> float:
+    """Write the reports and visualizations for one built graph (analytics come from the cache when unchanged)."""
+    start = time.perf_counter()
+    analyze_graph_artifact(name, graph, chapter_edges, _SETTINGS, visualize=visualize, verbose=False,
+                           communities=communities, top_n=top_n, formats=formats)
+    return time.perf_counter() - start
+
+
+def discover_books(settings: Settings) -> List[str]:
+    """Every results directory that holds chapter files (judge outputs are skipped)."""
+    return sorted(d.name for d in settings.RESULTS_DIR.iterdir()
+                  if d.is_dir() and not d.name.endswith("_judged") and result_files(d))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and analyze graphs for all books in one process.")
+    parser.add_argument("book_names", nargs="*", help="Books to process (default: every results directory).")
+    parser.add_argument("--workers", type=int, default=None, help="Processes in the pool (default: CPU count).")
+    parser.add_argument("--no-novel", action="store_true", help="Skip the combined whole-novel graph.")
+    parser.add_argument("--no-viz", action="store_true", help="Skip the HTML visualizations.")
+    parser.add_argument("--top-n", type=int, default=None, help="Results per ranking (default: analysis.top_n_results).")
+    parser.add_argument("--format", dest="formats", action="append", choices=REPORT_FORMATS,
+                        help="Report format; repeat for several (default: analysis.report_formats).")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    settings = Settings(config_path="config.yaml")
+    print("--- Starting Full Analysis Pipeline for All Books ---")
+
+    if not settings.RESULTS_DIR.exists():
+        print(f"ERROR: The directory '{settings.RESULTS_DIR}' was not found.")
+        print("Please run the 'run_llm_extraction.py' script first.")
+        sys.exit(1)
+
+    book_names = args.book_names or discover_books(settings)
+    missing = [name for name in book_names if not (settings.RESULTS_DIR / name).exists()]
+    if missing:
+        print(f"ERROR: No results found for {missing}.")
+        sys.exit(1)
+
+    jobs = [(name, [name]) for name in book_names]
+    # The combined novel uses the canonical book_N runs only, in reading order
+    novel_books = sorted((name for name in book_names if re.fullmatch(r"book_\d+", name)),
+                         key=lambda name: int(name.split('_')[-1]))
+    if not args.no_novel and len(novel_books) > 1:
+        jobs.append((NOVEL_NAME, novel_books))
+
+    character_mapper = CharacterMapper(file_path=str(settings.CHARACTER_FILE))
+    workers = min(args.workers or os.cpu_count() or 1, len(jobs))
+
+    # Largest jobs first so the combined novel does not start last
+    jobs.sort(key=lambda job: len(job[1]), reverse=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(settings, character_mapper)) as pool:
+        futures = {name: pool.submit(build_graph, name, books) for name, books in jobs}
+        built = {name: future.result() for name, future in futures.items()}
+
+        # Every book and chapter window in one batch; unchanged graphs come from the cache
+        community_start = time.perf_counter()
+        window_graphs = {}
+        for name, (graph, chapter_edges, _) in built.items():
+            window_graphs.update(community_graphs(name, graph, chapter_edges, settings.TEMPORAL_WINDOW))
+        communities = detect_communities_batch(window_graphs, community_config_from_settings(settings),
+                                               cache_dir=community_cache_dir(settings), executor=pool)
+        print(f"Communities for {len(window_graphs)} graphs and chapter windows "
+              f"in {time.perf_counter() - community_start:.2f}s")
+
+        futures = {name: pool.submit(analyze_graph, name, graph, chapter_edges,
+                                     {key: result for key, result in communities.items() if key[0] == name},
+                                     not args.no_viz, args.top_n, args.formats)
+                   for name, (graph, chapter_edges, _) in built.items()}
+        analysis_seconds = {name: future.result() for name, future in futures.items()}
+
+    print("\n" + "=" * 60)
+    print(f"{'Graph':<28} {'Nodes':>6} {'Edges':>6} {'Seconds':>8}")
+    print("-" * 60)
+    for name, (graph, _, build_seconds) in sorted(built.items()):
+        seconds = build_seconds + analysis_seconds[name]
+        print(f"{name:<28} {graph.number_of_nodes():>6} {graph.number_of_edges():>6} {seconds:>8.2f}")
+    print("=" * 60)
+    print(f"\n--- Full Analysis Pipeline Complete in {time.perf_counter() - start:.2f}s ({workers} workers) ---")
+    print("All reports and visualizations have been generated in the 'analysis_reports' directory.")
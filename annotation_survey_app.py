@@ -9,6 +9,13 @@ Run with:
 
 Designed to be shareable with Digital Humanities communities for 
 building gold-standard annotations.
+
+Submissions go to the SQLite store in `crowd_annotations/annotations.db`
+(see `src/annotation_store.py`), which many annotators can write at once.
+Legacy `annotator_<id>.json` files are imported into it on startup.
+Passages come from the prioritised snippet index (see `src/snippet_queue.py`),
+built once and cached across reruns; each one is served until it has
+`annotation.annotators_per_snippet` annotators.
 """
 
 import streamlit as st
@@ -18,16 +25,20 @@ import hashlib
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-import random
+
+from src.settings import Settings
+from src.annotation_store import AnnotationStore, store_path
+from src.snippet_queue import SnippetQueue, save_snippet_index, snippet_index_from_settings
 
 # --- Configuration ---
-DATA_DIR = Path("./data/Middlemarch")
 ANNOTATIONS_DIR = Path("./crowd_annotations")
 ANNOTATIONS_DIR.mkdir(exist_ok=True)
 
 # Character list for validation
 CHARACTER_FILE = Path("./char_alias.json")
 
+SETTINGS = Settings(config_path="config.yaml")
+
 # Interaction types
 INTERACTION_TYPES = [
     "Direct Dialogue",
@@ -51,40 +62,38 @@ def load_snippets_for_annotation() -> List[Dict[str, Any]]:
     """
     Load text snippets that need annotation.
     
-    These are pre-selected paragraphs containing potential interactions.
-    In production, these would be generated from the extraction pipeline.
+    These are the paragraphs the models are least sure about, ranked by
+    `build_snippet_index.py`. If the index is missing it is built once here.
     """
-    snippets_file = Path("./annotation_snippets.json")
+    snippets_file = SETTINGS.SNIPPET_INDEX_FILE
     
     if snippets_file.exists():
-        with open(snippets_file, 'r') as f:
+        with open(snippets_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     
-    # Generate sample snippets from book text
-    snippets = []
-    for book_file in sorted(DATA_DIR.glob("*.txt")):
-        with open(book_file, 'r') as f:
-            text = f.read()
-        
-        # Split into paragraphs and sample some
-        paragraphs = [p.strip() for p in text.split('\n\n') if len(p.strip()) > 100]
-        sampled = random.sample(paragraphs, min(5, len(paragraphs)))
-        
-        for i, para in enumerate(sampled):
-            snippets.append({
-                'id': f"{book_file.stem}_{i:03d}",
-                'source': book_file.stem,
-                'text': para[:1000],  # Limit to 1000 chars
-                'context': f"From {book_file.stem}"
-            })
-    
-    # Save for consistency
-    with open(snippets_file, 'w') as f:
-        json.dump(snippets, f, indent=2)
-    
+    snippets = snippet_index_from_settings(SETTINGS)
+    save_snippet_index(snippets, snippets_file)
     return snippets
 
 
+@st.cache_resource
+def get_snippet_queue() -> SnippetQueue:
+    """The snippet index and per-snippet annotator counts, shared by every session."""
+    return SnippetQueue(
+        load_snippets_for_annotation(),
+        annotators_per_snippet=SETTINGS.ANNOTATORS_PER_SNIPPET,
+        lease_seconds=SETTINGS.SNIPPET_LEASE_MINUTES * 60
+    )
+
+
+@st.cache_resource
+def get_annotation_store() -> AnnotationStore:
+    """One store shared by every session; each session thread gets its own connection."""
+    store = AnnotationStore(store_path(ANNOTATIONS_DIR))
+    store.import_json_files(ANNOTATIONS_DIR)
+    return store
+
+
 def get_annotator_id() -> str:
     """Get or create a unique annotator ID."""
     if 'annotator_id' not in st.session_state:
@@ -94,7 +103,7 @@ def get_annotator_id() -> str:
 
 
 def save_annotation(annotation: Dict[str, Any]):
-    """Save an annotation to disk."""
+    """Append an annotation to the store (one atomic insert)."""
     annotator_id = get_annotator_id()
     timestamp = datetime.now().isoformat()
     
@@ -104,33 +113,12 @@ def save_annotation(annotation: Dict[str, Any]):
         **annotation
     }
     
-    # Save to annotator-specific file
-    annotator_file = ANNOTATIONS_DIR / f"annotator_{annotator_id}.json"
-    
-    existing = []
-    if annotator_file.exists():
-        with open(annotator_file, 'r') as f:
-            existing = json.load(f)
-    
-    existing.append(annotation_record)
-    
-    with open(annotator_file, 'w') as f:
-        json.dump(existing, f, indent=2)
+    get_annotation_store().append(annotation_record)
 
 
-def get_annotation_progress() -> Dict[str, int]:
-    """Get annotation progress for current annotator."""
-    annotator_id = get_annotator_id()
-    annotator_file = ANNOTATIONS_DIR / f"annotator_{annotator_id}.json"
-    
-    if annotator_file.exists():
-        with open(annotator_file, 'r') as f:
-            annotations = json.load(f)
-        return {
-            'completed': len(annotations),
-            'snippet_ids': [a['snippet_id'] for a in annotations]
-        }
-    return {'completed': 0, 'snippet_ids': []}
+def get_annotation_progress() -> Dict[str, Any]:
+    """Get annotation progress for current annotator (an indexed query)."""
+    return get_annotation_store().progress(get_annotator_id())
 
 
 # --- Streamlit UI ---
@@ -195,16 +183,18 @@ def main():
         st.metric("Your Annotations", progress['completed'])
         st.caption(f"Annotator ID: {get_annotator_id()}")
     
-    # Load data
-    snippets = load_snippets_for_annotation()
+    # Load data (cached across reruns; only submissions since the last rerun are read)
+    queue = get_snippet_queue()
+    queue.refresh(get_annotation_store())
     characters = load_characters()
     progress = get_annotation_progress()
     
-    # Find next unannotated snippet
-    completed_ids = set(progress['snippet_ids'])
-    remaining = [s for s in snippets if s['id'] not in completed_ids]
+    # Next passage: the one this annotator holds, else the most uncertain that still needs annotators
+    if 'skipped_snippets' not in st.session_state:
+        st.session_state.skipped_snippets = set()
+    current = queue.next_for(get_annotator_id(), set(progress['snippet_ids']) | st.session_state.skipped_snippets)
     
-    if not remaining:
+    if current is None:
         st.success("🎉 You've completed all available passages! Thank you!")
         st.balloons()
         
@@ -213,16 +203,10 @@ def main():
         st.write(f"Total annotations: {progress['completed']}")
         return
     
-    # Get current snippet
-    if 'current_snippet_idx' not in st.session_state:
-        st.session_state.current_snippet_idx = 0
-    
-    current = remaining[min(st.session_state.current_snippet_idx, len(remaining)-1)]
-    
     # Progress bar
-    total = len(snippets)
+    total = len(queue.snippets)
     completed = progress['completed']
-    st.progress(completed / total, text=f"Progress: {completed}/{total} passages")
+    st.progress(min(completed / total, 1.0), text=f"Progress: {completed}/{total} passages")
     
     # Display snippet
     st.subheader(f"Passage from {current['source']}")
@@ -323,14 +307,15 @@ def main():
                 })
                 
                 # Reset and move to next
+                queue.record(get_annotator_id(), current['id'])
                 st.session_state.interactions = []
-                st.session_state.current_snippet_idx += 1
                 st.success("Annotation saved! Loading next passage...")
                 st.rerun()
     
     # Skip option
     if st.button("⏭️ Skip this passage"):
-        st.session_state.current_snippet_idx += 1
+        st.session_state.skipped_snippets.add(current['id'])
+        queue.release(get_annotator_id())
         st.session_state.interactions = []
         st.rerun()
 
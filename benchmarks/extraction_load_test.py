@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Extraction Load Test - Runs `run_llm_extraction.py` end to end against the mock model.
+
+Starts `benchmarks/mock_ollama_server.py` in-process. It then writes a
+temporary config whose `llm_host` points at the mock and whose books and
+results live in a scratch directory. The real extraction script runs as a
+subprocess: chunking, prompts, HTTP, parsing, deduplication and saving, with
+only the model replaced. Every request the mock answered is recorded, which gives:
+
+- throughput: chunks/s over the extraction (first to last request) and the whole run,
+  with chunks counted by the run's telemetry, apart from the requests (retries
+  and cascade escalations send several requests for one chunk);
+- latency: p50/p90/p99 of the requests as the mock served them;
+- client overhead: time between one answer and the next request of the same
+  chapter, i.e. our own per-chunk work, which is what regressions in this repo
+  show up in. Chapters run in parallel on several hosts, so requests are mapped
+  to their chapter through the paragraph they quote;
+- failure recovery: requests failed on purpose, chunks lost to them, whether
+  every chapter was still written, and interactions saved versus served.
+
+With the latency and error knobs at zero this measures the pipeline alone.
+`--hosts N` starts N mock servers and lists them all in `llm_host`, so the
+extraction spreads chapters over them (`src/host_pool.py`); with `--parallel 1`
+each mock serves one request at a time like a single Ollama box, and chunks/s
+should grow about N-fold. `--dead-hosts K` adds K endpoints that refuse
+connections, to exercise ejection and retries.
+
+Usage:
+    python benchmarks/extraction_load_test.py                         # book_1, first 3 chapters
+    python benchmarks/extraction_load_test.py --books book_1 book_2 --chapters 5
+    python benchmarks/extraction_load_test.py --latency-ms 300 --latency-dist lognormal \\
+        --error-rate 0.05 --disconnect-rate 0.02 --malformed-rate 0.02 --output load_test.json
+    python benchmarks/extraction_load_test.py --chapters 8 --latency-ms 100 --parallel 1 --hosts 4 --dead-hosts 1
+    python benchmarks/extraction_load_test.py --cascade-model small --malformed-rate 0.2   # Escalations
+"""
+
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.mock_ollama_server import (  # noqa: E402
+    OUTCOMES, MockOllamaServer, RequestRecord, add_profile_arguments, profile_from_args,
+)
+from src.data_preprocessor import load_books, split_chapters  # noqa: E402
+
+
+def write_workspace(workdir: Path, books: List[str], chapters: int, llm_host: Union[str, List[str]],
+                    cascade_model: Optional[str] = None) -> Dict[str, int]:
+    """Copy the first `chapters` chapters of each book and a config pointing at the mock."""
+    with open(PROJECT_ROOT / "config.yaml", 'r') as f:
+        config = yaml.safe_load(f)
+    books_dir = workdir / "books"
+    books_dir.mkdir()
+    expected = {}
+    for name, text in load_books(str(PROJECT_ROOT / config['data']['books_directory'])).items():
+        if Path(name).stem not in books:
+            continue
+        kept = split_chapters(text)[:chapters]
+        with open(books_dir / name, 'w', encoding='utf-8') as f:
+            f.write("".join(f"Chapter{i + 1}\n{chapter}" for i, chapter in enumerate(kept)))
+        expected[Path(name).stem] = len(kept)
+
+    config['data'].update({
+        'books_directory': str(books_dir),
+        'character_file': str(PROJECT_ROOT / config['data']['character_file']),
+        'llm_results_dir': str(workdir / "llm_results"),
+        'graph_artifacts_dir': str(workdir / "graph_artifacts"),
+    })
+    config['models']['llm_host'] = llm_host
+    config['models']['cascade_model'] = cascade_model
+    with open(workdir / "config.yaml", 'w') as f:
+        yaml.safe_dump(config, f)
+    return expected
+
+
+def unused_url() -> str:
+    """A local URL nothing listens on (the port is bound once, then released)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def chapter_texts(books_dir: Path) -> Dict[Tuple[str, int], str]:
+    """(book, 0-based chapter) -> text, split exactly as the extraction splits the books."""
+    return {(Path(name).stem, index): chapter
+            for name, text in load_books(str(books_dir)).items()
+            for index, chapter in enumerate(split_chapters(text))}
+
+
+def request_streams(records: List[RequestRecord],
+                    chapters: Dict[Tuple[str, int], str]) -> List[Optional[Tuple[str, int]]]:
+    """The chapter each request's paragraph was taken from; None where it cannot be found."""
+    keys = list(chapters)
+    normalised = [" ".join(chapters[key].split()) for key in keys]
+    corpus = "\n".join(normalised)
+    starts = np.cumsum([0] + [len(text) + 1 for text in normalised[:-1]])
+    streams = []
+    for record in records:
+        position = corpus.find(record.head) if record.head else -1
+        streams.append(keys[int(np.searchsorted(starts, position, side='right')) - 1] if position >= 0 else None)
+    return streams
+
+
+def summarise(records: List[RequestRecord], expected: Dict[str, int], results_dir: Path,
+              run_seconds: float, exit_code: int,
+              chapters: Optional[Dict[Tuple[str, int], str]] = None) -> Dict[str, Any]:
+    records = sorted(records, key=lambda r: r.started)
+    latencies = np.array([r.seconds for r in records])
+    # Gap between an answer and the next request of the same chapter: prompt building, parsing,
+    # saving. Across chapters the gaps would mix parallel streams and come out negative.
+    by_stream: Dict[Tuple[str, int], List[RequestRecord]] = {}
+    streams = request_streams(records, chapters) if chapters else [None] * len(records)
+    for record, stream in zip(records, streams):
+        if stream is not None:
+            by_stream.setdefault(stream, []).append(record)
+    gaps = np.array([b.started - (a.started + a.seconds)
+                     for stream_records in by_stream.values()
+                     for a, b in zip(stream_records, stream_records[1:])])
+    span = records[-1].started + records[-1].seconds - records[0].started if records else 0.0
+
+    written = {book: len(list((results_dir / book).glob("chapter_*.json"))) for book in expected}
+    saved = 0
+    for book in expected:
+        for path in (results_dir / book).glob("chapter_*.json"):
+            with open(path, 'r', encoding='utf-8') as f:
+                saved += len(json.load(f).get("interactions", []))
+
+    outcomes = {outcome: sum(r.outcome == outcome for r in records) for outcome in OUTCOMES}
+    # Requests retried on another host do not lose their chunk; the run's telemetry knows which did
+    lost, cascade, chunks = len(records) - outcomes['ok'], None, None
+    for path in sorted((results_dir / "telemetry").glob("run_*.json"))[-1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            run_summary = json.load(f)['summary']
+        lost, cascade, chunks = run_summary['failed_requests'], run_summary.get('cascade'), run_summary['chunks']
+    percentile = lambda values, q: round(float(np.percentile(values, q)) * 1000, 2) if len(values) else None
+    return {
+        'exit_code': exit_code,
+        'chunks': chunks,
+        'requests': len(records),
+        'run_seconds': round(run_seconds, 3),
+        'extraction_seconds': round(span, 3),
+        'chunks_per_second': round(chunks / span, 2) if chunks and span else None,
+        'chunks_per_second_overall': round(chunks / run_seconds, 2) if chunks and run_seconds else None,
+        'requests_per_second': round(len(records) / span, 2) if span else None,
+        'latency_ms': {'p50': percentile(latencies, 50), 'p90': percentile(latencies, 90),
+                       'p99': percentile(latencies, 99), 'max': percentile(latencies, 100)},
+        'client_overhead_ms': {'p50': percentile(gaps, 50), 'p99': percentile(gaps, 99)},
+        'unplaced_requests': sum(stream is None for stream in streams),
+        'outcomes': outcomes,
+        'chunks_lost': lost,
+        'chapters_expected': sum(expected.values()),
+        'chapters_written': sum(written.values()),
+        'interactions_served': sum(r.interactions for r in records if r.outcome == "ok"),
+        'interactions_saved': saved,
+        'cascade': cascade,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test run_llm_extraction.py against a mock Ollama server.")
+    parser.add_argument("--books", nargs="+", default=["book_1"], help="Books to extract.")
+    parser.add_argument("--chapters", type=int, default=3, help="Chapters per book.")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds before the extraction is killed.")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the summary as JSON.")
+    parser.add_argument("--show-log", action="store_true", help="Print the extraction script's output.")
+    parser.add_argument("--hosts", type=int, default=1, help="Mock servers listed in llm_host.")
+    parser.add_argument("--dead-hosts", type=int, default=0, help="Unreachable endpoints added to llm_host.")
+    parser.add_argument("--cascade-model", default=None,
+                        help="Run the two-tier cascade with this small model (the mock answers any model name).")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    servers = []
+    for index in range(args.hosts):
+        profile = profile_from_args(args)
+        profile.seed += index                   # Each mock draws its own latencies and failures
+        servers.append(MockOllamaServer(profile).start())
+    urls = [server.url for server in servers] + [unused_url() for _ in range(args.dead_hosts)]
+    print(f"Mock Ollama server(s) on {', '.join(urls[:args.hosts])}"
+          + (f"; unreachable: {', '.join(urls[args.hosts:])}" if args.dead_hosts else ""))
+    with tempfile.TemporaryDirectory(prefix="ge_llm_load_") as tmp:
+        workdir = Path(tmp)
+        expected = write_workspace(workdir, args.books, args.chapters, urls[0] if len(urls) == 1 else urls,
+                                   cascade_model=args.cascade_model)
+        if not expected:
+            print(f"FATAL: None of {args.books} is in the books directory.")
+            sys.exit(1)
+        print(f"Extracting {sum(expected.values())} chapter(s) of {', '.join(expected)}...")
+
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "run_llm_extraction.py", "--config", str(workdir / "config.yaml")],
+                              cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=args.timeout)
+        run_seconds = time.perf_counter() - start
+        for server in servers:
+            server.stop()
+        if args.show_log or proc.returncode != 0:
+            print(proc.stdout[-5000:], proc.stderr[-5000:], sep="\n")
+        records = [record for server in servers for record in server.records]
+        summary = summarise(records, expected, workdir / "llm_results", run_seconds, proc.returncode,
+                            chapters=chapter_texts(workdir / "books"))
+        summary['requests_per_host'] = [len(server.records) for server in servers]
+
+    print(f"\n{'Chunks':<26}{summary['chunks']} ({summary['requests']} requests)")
+    print(f"{'Throughput':<26}{summary['chunks_per_second']} chunks/s during extraction "
+          f"({summary['chunks_per_second_overall']} chunks/s including startup, {summary['run_seconds']}s; "
+          f"{summary['requests_per_second']} requests/s)")
+    latency, overhead = summary['latency_ms'], summary['client_overhead_ms']
+    print(f"{'Model latency (ms)':<26}p50 {latency['p50']}  p90 {latency['p90']}  "
+          f"p99 {latency['p99']}  max {latency['max']}")
+    print(f"{'Client overhead (ms)':<26}p50 {overhead['p50']}  p99 {overhead['p99']} (per chapter"
+          + (f"; {summary['unplaced_requests']} request(s) not placed in a chapter)"
+             if summary['unplaced_requests'] else ")"))
+    if args.hosts > 1:
+        print(f"{'Requests per host':<26}{summary['requests_per_host']}")
+    if summary['cascade']:
+        cascade = summary['cascade']
+        print(f"{'Cascade':<26}{cascade['escalated']} of {cascade['chunks']} chunks escalated, "
+              f"{cascade['tiers']['small']['requests']} small / {cascade['tiers']['large']['requests']} large requests")
+    print(f"{'Injected failures':<26}" + ", ".join(f"{summary['outcomes'][o]} {o}" for o in OUTCOMES[1:]))
+    print(f"{'Recovery':<26}{summary['chunks_lost']} chunk(s) lost, "
+          f"{summary['chapters_written']}/{summary['chapters_expected']} chapters written, "
+          f"{summary['interactions_saved']} interactions saved of {summary['interactions_served']} served "
+          f"(after deduplication), exit code {summary['exit_code']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Summary saved to {args.output}")
+    if summary['exit_code'] != 0 or summary['chapters_written'] < summary['chapters_expected']:
+        sys.exit(1)
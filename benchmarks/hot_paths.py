@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Hot-Path Benchmarks - Times the pipeline's expensive steps on synthetic corpora.
+
+Every benchmark runs on inputs generated by `benchmarks/synthetic.py` at each
+requested scale (1x = the size of Middlemarch). Only the call itself is
+timed, best of --repeat runs, with its console output discarded:
+
+    chunking        create_adaptive_chunks over the novel's sentences
+    alias_lookup    CharacterMapper.get_canonical_name over every extracted mention
+    llm_parse       parse_llm_output over one raw model output per chunk
+    graph_build     build_interaction_graph from llm_results chapter files
+    centralities    GraphManager degree/betweenness/eigenvector report
+    visualization   GraphManager pyvis page (communities + ForceAtlas2 layout)
+    evaluation      InteractionEvaluator strict + flexible matching
+    agreement       compute_agreement_metrics over five annotators
+
+Timings can be saved as a baseline and later runs compared against it; the
+comparison fails when a benchmark got slower than the tolerance allows.
+Baselines are machine-specific (each records the machine it was taken on), so
+none is committed: save one on the machine you compare on. Without one,
+--compare only prints the timings.
+
+Usage:
+    python benchmarks/hot_paths.py                          # 1x and 10x
+    python benchmarks/hot_paths.py --scales 1 10 100 --repeat 1
+    python benchmarks/hot_paths.py --only graph_build centralities
+    python benchmarks/hot_paths.py --save-baseline          # Store as the baseline
+    python benchmarks/hot_paths.py --compare                # Exit 1 on regressions
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks import synthetic  # noqa: E402
+
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmarks" / "baselines" / "baseline.json"
+
+# name -> setup(scale, workdir) -> (input size, timed call)
+Setup = Callable[[float, Path], Tuple[int, Callable[[], object]]]
+
+
+class WordTokenizer:
+    """Counts words instead of model tokens; `transformers` is not needed to time the chunker."""
+
+    def encode(self, text: str) -> list:
+        return text.split()
+
+
+def _mapper(scale: float, workdir: Path):
+    from src.character_mapper import CharacterMapper
+
+    path = synthetic.write_cast(synthetic.cast(scale), workdir / f"cast_{scale:g}.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        return CharacterMapper(file_path=str(path))
+
+
+def _graph(scale: float, workdir: Path):
+    from src.graph_builder import build_interaction_graph
+
+    book_dirs = synthetic.write_llm_results(workdir / f"llm_results_{scale:g}", scale)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return build_interaction_graph(book_dirs, _mapper(scale, workdir))[0]
+
+
+def setup_chunking(scale: float, workdir: Path):
+    from run_llm_extraction import create_adaptive_chunks
+
+    sentences = synthetic.sentences(scale)
+    return len(sentences), lambda: create_adaptive_chunks(sentences, WordTokenizer(), 256, 1)
+
+
+def setup_alias_lookup(scale: float, workdir: Path):
+    mapper = _mapper(scale, workdir)
+    mentions = synthetic.mentions(synthetic.cast(scale), 2 * synthetic.scaled("interactions", scale))
+    return len(mentions), lambda: list(map(mapper.get_canonical_name, mentions))
+
+
+def setup_llm_parse(scale: float, workdir: Path):
+    from src.llm_client import parse_llm_output
+
+    chunks = synthetic.scaled("words", scale) // 190       # ~256 tokens per chunk
+    outputs = synthetic.llm_outputs(synthetic.cast(scale), chunks)
+    return len(outputs), lambda: [parse_llm_output(output) for output in outputs]
+
+
+def setup_graph_build(scale: float, workdir: Path):
+    from src.graph_builder import build_interaction_graph
+
+    book_dirs = synthetic.write_llm_results(workdir / f"llm_results_{scale:g}", scale)
+    mapper = _mapper(scale, workdir)
+    return synthetic.scaled("interactions", scale), lambda: build_interaction_graph(book_dirs, mapper)
+
+
+def setup_centralities(scale: float, workdir: Path):
+    from src.graph_manager import GraphManager
+
+    G = _graph(scale, workdir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = GraphManager.from_graph(G)
+    return G.number_of_edges(), lambda: manager.generate_full_analysis_report()
+
+
+def setup_visualization(scale: float, workdir: Path):
+    from src.graph_manager import GraphManager
+
+    G = _graph(scale, workdir)
+    output_path = workdir / "analysis_reports" / f"scale_{scale:g}" / "network.html"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def draw():
+        manager = GraphManager.from_graph(G)
+        manager.save_interactive_visualization(output_path)
+    return G.number_of_nodes(), draw
+
+
+def setup_evaluation(scale: float, workdir: Path):
+    from src.evaluation_metrics import InteractionEvaluator
+
+    characters = synthetic.cast(scale)
+    n = synthetic.scaled("interactions", scale)
+    gold = synthetic.interactions(characters, n, seed=1)
+    predictions = synthetic.interactions(characters, n, seed=2)
+
+    def evaluate():
+        evaluator = InteractionEvaluator(gold)
+        return evaluator.evaluate_strict(predictions), evaluator.evaluate_flexible(predictions)
+    return n, evaluate
+
+
+def setup_agreement(scale: float, workdir: Path):
+    from src.evaluation_metrics import _presence_matrix, compute_agreement_metrics
+
+    n = synthetic.scaled("interactions", scale) // 10
+    annotator_results, pairs = synthetic.annotator_sets(synthetic.cast(scale), annotators=5, n=n)
+    # Unmatched candidate pairs would time the degenerate all-absent path (kappa = 1)
+    presence, _ = _presence_matrix(list(annotator_results.values()), pairs)
+    kappa = compute_agreement_metrics(annotator_results, pairs).cohens_kappa
+    assert presence.any() and kappa < 1, f"Degenerate agreement input (kappa {kappa})"
+    return n, lambda: compute_agreement_metrics(annotator_results, pairs)
+
+
+BENCHMARKS: Dict[str, Setup] = {
+    "chunking": setup_chunking,
+    "alias_lookup": setup_alias_lookup,
+    "llm_parse": setup_llm_parse,
+    "graph_build": setup_graph_build,
+    "centralities": setup_centralities,
+    "visualization": setup_visualization,
+    "evaluation": setup_evaluation,
+    "agreement": setup_agreement,
+}
+
+
+def run(name: str, scale: float, workdir: Path, repeat: int) -> Dict[str, float]:
+    """Best-of-`repeat` wall time of one benchmark at one scale."""
+    size, call = BENCHMARKS[name](scale, workdir)
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - start)
+    return {"seconds": min(timings), "size": size}
+
+
+def machine() -> Dict[str, str]:
+    return {"node": platform.node(), "system": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+            "python": platform.python_version()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the pipeline's hot paths on synthetic corpora.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10],
+                        help="Corpus sizes as multiples of Middlemarch.")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=None,
+                        help="Run these benchmarks only.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest is kept.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these timings as the baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline; exit 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before --compare reports a regression (0.25 = 25%%).")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare and not args.baseline.exists():
+        # Baselines are per machine, so a fresh checkout has none: time the run, compare nothing
+        print(f"No baseline at '{args.baseline}', so there is nothing to compare against. "
+              f"Record one on this machine with --save-baseline.")
+        args.compare = False
+    elif args.compare:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        baseline = stored["results"]
+        if stored.get("machine") != machine():
+            print(f"WARNING: The baseline was recorded on {stored.get('machine')}; timings may not be comparable.")
+
+    results: Dict[str, Dict[str, float]] = {}
+    regressions = 0
+    print(f"{'Benchmark':<14} {'Scale':>6} {'Size':>10} {'Seconds':>9} {'Baseline':>9} {'Ratio':>6}  Status")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory(prefix="ge_llm_bench_") as workdir:
+        for scale in args.scales:
+            for name in args.only or BENCHMARKS:
+                key = f"{name}@{scale:g}"
+                results[key] = result = run(name, scale, Path(workdir), args.repeat)
+                line = f"{name:<14} {scale:>5g}x {result['size']:>10} {result['seconds']:>9.3f}"
+                if key in baseline:
+                    ratio = result['seconds'] / baseline[key]['seconds']
+                    slower = ratio > 1 + args.tolerance
+                    regressions += slower
+                    line += f" {baseline[key]['seconds']:>9.3f} {ratio:>6.2f}  {'REGRESSION' if slower else 'ok'}"
+                elif args.compare:
+                    line += f" {'-':>9} {'-':>6}  not in baseline"
+                print(line, flush=True)
+
+    print("-" * 70)
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "machine": machine(),
+                       "repeat": args.repeat, "results": results}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    if args.compare:
+        if regressions:
+            print(f"{regressions} benchmark(s) are more than {args.tolerance:.0%} slower than the baseline.")
+            sys.exit(1)
+        print("No benchmark regressed beyond the tolerance.")
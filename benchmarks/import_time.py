@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark - Guards the startup cost of every entry point.
+
+Each module is imported in a fresh interpreter with `python -X importtime`.
+The check fails if the cumulative import time exceeds its budget, or if a
+heavy dependency that should only be loaded on demand shows up at import.
+
+Usage:
+    python benchmarks/import_time.py             # Check all budgets
+    python benchmarks/import_time.py --repeat 5  # Best-of-5 timing
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import budget in milliseconds (best of --repeat runs)
+IMPORT_BUDGETS_MS = {
+    "build_graph": 500,
+    "analyze_graph": 600,
+    "analyze_all": 600,
+    "temporal_analysis": 500,
+    "run_llm_extraction": 600,
+    "run_judge_pipeline": 600,
+    "src.graph_manager": 500,
+    "src.gemini_judge": 400,
+    "src.evaluation_metrics": 150,
+    "sweep_judge_thresholds": 400,
+}
+
+# Dependencies that must only be imported on the code paths that use them
+LAZY_MODULES = ["pyvis", "community", "matplotlib", "transformers", "nltk", "google.generativeai", "torch"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(\S+)")
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    """Return (cumulative import ms, lazily-loaded modules that were imported anyway)."""
+    probe = (f"import sys, {module}; "
+             f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and match.group(2) == module:
+            cumulative_us = int(match.group(1))
+    leaked = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative_us / 1000, leaked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check entry-point import times against budgets.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is kept.")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'Module':<26} {'Import ms':>10} {'Budget':>8}  Status")
+    print("-" * 60)
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        best_ms = min(ms for ms, _ in runs)
+        leaked = sorted({m for _, mods in runs for m in mods})
+
+        problems = []
+        if best_ms > budget:
+            problems.append("over budget")
+        if leaked:
+            problems.append(f"eager import of {', '.join(leaked)}")
+        failures += bool(problems)
+        print(f"{module:<26} {best_ms:>10.1f} {budget:>8}  {'; '.join(problems) or 'ok'}")
+
+    print("-" * 60)
+    if failures:
+        print(f"{failures} module(s) failed the import-time check.")
+        sys.exit(1)
+    print("All entry points are within their import-time budgets.")
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Mock Ollama Server - An offline stand-in for the extraction model.
+
+Implements the Ollama endpoints the pipeline talks to: `POST /api/generate`
+(used by `LLMClient`), `POST /api/chat`, and `GET /api/tags` / `/api/version`
+for health checks. Responses are non-streaming, like `LLMClient` requests them.
+
+Each request is answered after a sampled delay: a base latency from a
+fixed, uniform, exponential or lognormal distribution (reported as prompt
+evaluation), plus the output tokens divided by `--tokens-per-second`
+(reported as generation). With `--parallel N` only N requests are served at
+once and the rest wait, like an Ollama box with OLLAMA_NUM_PARALLEL=N.
+The first request also pays `--cold-load-ms`, reported as
+`load_duration`, like a model Ollama still had to load. A share of the
+requests can fail on purpose: HTTP 500, a dropped connection, or a `response` that is not
+valid JSON. The JSON output is either cycled from a canned file (a list of
+response strings or objects) or synthesised from the prompt: pairs of the
+`## VALID CHARACTERS ##` whose names occur in the paragraph, with a 4-word
+evidence snippet copied from it. Everything is drawn from a seeded RNG.
+
+`benchmarks/extraction_load_test.py` starts it in-process and drives
+`run_llm_extraction.py` against it.
+
+Usage:
+    python benchmarks/mock_ollama_server.py --port 11435
+    python benchmarks/mock_ollama_server.py --latency-ms 800 --latency-dist lognormal \\
+        --tokens-per-second 40 --error-rate 0.02 --malformed-rate 0.01
+    # then set models.llm_host to "http://127.0.0.1:11435"
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+OUTCOMES = ("ok", "malformed", "error", "disconnect")
+INTERACTION_TYPES = ["Direct Dialogue", "Physical Action", "Observation", "Memory/Reference"]
+CHARS_PER_TOKEN = 4
+HEAD_CHARS = 80                             # Start of the paragraph kept with each request record
+
+# The section headers, not their mentions in the rules above them
+_CHARACTER_LIST = re.compile(r'## VALID CHARACTERS ##[ \t]*\n\s*\[(.*?)\]', re.DOTALL)
+_PARAGRAPH = re.compile(r'## PARAGRAPH TO ANALYZE ##[ \t]*\n(.*?)\n---', re.DOTALL)
+_QUOTED = re.compile(r'"([^"]+)"')
+_TITLES = {"mr.", "mrs.", "miss", "sir", "lady", "dr.", "rev.", "reverend", "the", "lord", "young", "old"}
+
+
+@dataclass
+class MockProfile:
+    """How the mock model behaves."""
+    latency_ms: float = 0.0                 # Mean base latency per request
+    latency_dist: str = "fixed"             # One of LATENCY_DISTRIBUTIONS
+    latency_spread: float = 0.5             # uniform: +/- share of the mean; lognormal: sigma
+    tokens_per_second: float = 0.0          # Generation speed; 0 answers instantly
+    cold_load_ms: float = 0.0               # Model load paid by the first request
+    error_rate: float = 0.0                 # Share of requests answered with HTTP 500
+    disconnect_rate: float = 0.0            # Share of requests dropped without an answer
+    malformed_rate: float = 0.0             # Share of answers whose `response` is truncated JSON
+    max_interactions: int = 4               # Synthetic outputs: at most this many per chunk
+    parallel: int = 0                       # Requests served at once, the rest queue; 0 = unlimited
+    canned: Optional[List[str]] = None      # Cycled response strings instead of synthetic ones
+    seed: int = 42
+
+
+@dataclass
+class RequestRecord:
+    endpoint: str
+    outcome: str                            # One of OUTCOMES
+    started: float                          # time.perf_counter() on arrival
+    seconds: float                          # Until the answer (or the drop) was sent
+    interactions: int = 0                   # Interactions in the returned output
+    head: str = ""                          # Start of the prompt's paragraph, whitespace-normalised
+
+
+def paragraph_head(prompt: str, length: int = HEAD_CHARS) -> str:
+    """The first `length` characters of the paragraph a prompt asks about, on single spaces."""
+    paragraph = _PARAGRAPH.search(prompt)
+    return " ".join((paragraph.group(1) if paragraph else prompt).split())[:length]
+
+
+def load_canned(path: Path) -> List[str]:
+    """A JSON list of model outputs; objects are serialised, strings are used as they are."""
+    with open(path, 'r', encoding='utf-8') as f:
+        outputs = json.load(f)
+    return [output if isinstance(output, str) else json.dumps(output) for output in outputs]
+
+
+def synthetic_output(prompt: str, rng: random.Random, max_interactions: int = 4) -> Dict[str, Any]:
+    """Interactions between listed characters mentioned in the paragraph, as the prompt asks for."""
+    listed = _CHARACTER_LIST.search(prompt)
+    names = _QUOTED.findall(listed.group(1)) if listed else []
+    paragraph = _PARAGRAPH.search(prompt)
+    text = paragraph.group(1) if paragraph else prompt
+    words = text.split()
+    present = {word.strip('.,;:!?"\'()’‘“”—').lower() for word in words}
+    mentioned = [name for name in names
+                 if any(part.lower() not in _TITLES and part.lower() in present for part in name.split())]
+
+    interactions = []
+    if len(mentioned) >= 2 and len(words) >= 4:
+        for _ in range(rng.randint(0, max_interactions)):
+            first, second = rng.sample(mentioned, 2)
+            start = rng.randrange(len(words) - 3)
+            interactions.append({
+                "character_1": first,
+                "character_2": second,
+                "interaction_type": rng.choice(INTERACTION_TYPES),
+                "evidence_snippet": " ".join(words[start:start + 4]),
+            })
+    return {"interactions": interactions}
+
+
+class MockOllamaServer:
+    """Threaded HTTP server answering like Ollama; every request is recorded in `records`."""
+
+    def __init__(self, profile: MockProfile, host: str = "127.0.0.1", port: int = 0):
+        if profile.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{profile.latency_dist}'. "
+                             f"Use one of {LATENCY_DISTRIBUTIONS}.")
+        self.profile = profile
+        self.records: List[RequestRecord] = []
+        self._rng = random.Random(profile.seed)
+        self._canned_index = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(profile.parallel) if profile.parallel > 0 else contextlib.nullcontext()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockOllamaServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _latency(self) -> float:
+        """Base latency in seconds (call with the lock held)."""
+        mean, spread = self.profile.latency_ms / 1000, self.profile.latency_spread
+        if mean <= 0 or self.profile.latency_dist == "fixed":
+            return max(mean, 0.0)
+        if self.profile.latency_dist == "uniform":
+            return self._rng.uniform(mean * (1 - spread), mean * (1 + spread))
+        if self.profile.latency_dist == "exponential":
+            return self._rng.expovariate(1 / mean)
+        # Lognormal with the requested mean: mu = ln(mean) - sigma^2 / 2
+        return self._rng.lognormvariate(math.log(mean) - spread ** 2 / 2, spread)
+
+    def _plan(self, prompt: str):
+        """(outcome, output string, interactions, (load, prompt eval, generation) seconds) for one request."""
+        with self._lock:
+            draw = self._rng.random()
+            p = self.profile
+            if draw < p.error_rate:
+                outcome = "error"
+            elif draw < p.error_rate + p.disconnect_rate:
+                outcome = "disconnect"
+            elif draw < p.error_rate + p.disconnect_rate + p.malformed_rate:
+                outcome = "malformed"
+            else:
+                outcome = "ok"
+            if p.canned:
+                output = p.canned[self._canned_index % len(p.canned)]
+                self._canned_index += 1
+            else:
+                output = json.dumps(synthetic_output(prompt, self._rng, p.max_interactions))
+            latency = self._latency()
+            load = 0.0 if self._loaded else p.cold_load_ms / 1000
+            self._loaded = True
+
+        try:
+            interactions = len(json.loads(output).get("interactions", []))
+        except (json.JSONDecodeError, AttributeError):
+            interactions = 0
+        if outcome == "malformed":
+            output, interactions = output[:max(len(output) // 2, 1)], 0
+        generation = 0.0
+        if outcome in ("ok", "malformed") and p.tokens_per_second > 0:
+            generation = len(output) / CHARS_PER_TOKEN / p.tokens_per_second
+        return outcome, output, interactions, (load, latency, generation)
+
+    def _record(self, record: RequestRecord):
+        with self._lock:
+            self.records.append(record)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass                                # One line per chunk would drown the load test
+
+            def _send_json(self, status: int, body: Dict[str, Any]):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": "mock", "model": "mock"}]})
+                elif self.path == "/api/version":
+                    self._send_json(200, {"version": "mock"})
+                else:
+                    self._send_json(404, {"error": f"unknown endpoint {self.path}"})
+
+            def do_POST(self):
+                started = time.perf_counter()
+                if self.path not in ("/api/generate", "/api/chat"):
+                    self._send_json(404, {"error": f"unknown endpoint {self.path}"})
+                    return
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": "request body is not valid JSON"})
+                    return
+                if self.path == "/api/chat":
+                    messages = request.get("messages") or [{}]
+                    prompt = messages[-1].get("content", "")
+                else:
+                    prompt = request.get("prompt", "")
+
+                with server._slots:
+                    outcome, output, interactions, (load, prompt_eval, generation) = server._plan(prompt)
+                    time.sleep(load + prompt_eval + generation)
+                record = RequestRecord(self.path, outcome, started, 0.0, interactions, paragraph_head(prompt))
+                if outcome == "disconnect":
+                    self.close_connection = True
+                elif outcome == "error":
+                    self._send_json(500, {"error": "mock: injected server error"})
+                else:
+                    body = {
+                        "model": request.get("model", "mock"),
+                        "created_at": datetime.now(timezone.utc).isoformat(),
+                        "done": True,
+                        "done_reason": "stop",
+                        "total_duration": int((load + prompt_eval + generation) * 1e9),
+                        "load_duration": int(load * 1e9),
+                        "prompt_eval_count": len(prompt) // CHARS_PER_TOKEN,
+                        "prompt_eval_duration": int(prompt_eval * 1e9),
+                        "eval_count": len(output) // CHARS_PER_TOKEN,
+                        "eval_duration": int(generation * 1e9),
+                    }
+                    if self.path == "/api/chat":
+                        body["message"] = {"role": "assistant", "content": output}
+                    else:
+                        body["response"] = output
+                    self._send_json(200, body)
+                record.seconds = time.perf_counter() - started
+                server._record(record)
+
+        return Handler
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """The `MockProfile` options, shared with the load-test harness."""
+    group = parser.add_argument_group("mock model")
+    group.add_argument("--latency-ms", type=float, default=0.0, help="Mean base latency per request.")
+    group.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    group.add_argument("--latency-spread", type=float, default=0.5,
+                       help="uniform: +/- share of the mean; lognormal: sigma.")
+    group.add_argument("--tokens-per-second", type=float, default=0.0, help="Generation speed (0 = instant).")
+    group.add_argument("--cold-load-ms", type=float, default=0.0, help="Model load paid by the first request.")
+    group.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500.")
+    group.add_argument("--disconnect-rate", type=float, default=0.0, help="Share of requests dropped.")
+    group.add_argument("--malformed-rate", type=float, default=0.0, help="Share of outputs cut to invalid JSON.")
+    group.add_argument("--max-interactions", type=int, default=4, help="Synthetic outputs: most per chunk.")
+    group.add_argument("--parallel", type=int, default=0,
+                       help="Requests served at once; the rest queue (0 = unlimited).")
+    group.add_argument("--canned", type=Path, default=None, help="JSON list of outputs to cycle through.")
+    group.add_argument("--seed", type=int, default=42)
+
+
+def profile_from_args(args: argparse.Namespace) -> MockProfile:
+    return MockProfile(latency_ms=args.latency_ms, latency_dist=args.latency_dist,
+                       latency_spread=args.latency_spread, tokens_per_second=args.tokens_per_second,
+                       cold_load_ms=args.cold_load_ms,
+                       error_rate=args.error_rate, disconnect_rate=args.disconnect_rate,
+                       malformed_rate=args.malformed_rate, max_interactions=args.max_interactions,
+                       parallel=args.parallel,
+                       canned=load_canned(args.canned) if args.canned else None, seed=args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve an offline stand-in for the Ollama extraction model.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockOllamaServer(profile_from_args(args), host=args.host, port=args.port).start()
+    print(f"Mock Ollama server listening on {server.url} (Ctrl+C to stop).")
+    try:
+        while True:
+            time.sleep(10)
+            counts = {outcome: sum(r.outcome == outcome for r in server.records) for outcome in OUTCOMES}
+            print(f"  {len(server.records)} request(s): {counts}", flush=True)
+    except KeyboardInterrupt:
+        server.stop()
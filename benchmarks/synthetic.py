@@ -0,0 +1,172 @@
+"""
+Synthetic Corpora - Middlemarch-shaped inputs for the benchmarks, at any scale.
+
+Everything is generated from a seed, so a scale always produces the same
+input and timings stay comparable across commits. At 1x the sizes match the
+real extraction of Middlemarch (`MIDDLEMARCH`); text, chapters and
+interactions grow linearly with the scale. The cast grows with its square
+root (a novel ten times longer does not have ten times the characters): the
+real 90 characters of `char_alias.json` plus generated extras.
+"""
+
+import itertools
+import json
+import math
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Sizes of the real corpus: 8 books, their chapters and the default extraction run
+MIDDLEMARCH = {
+    "books": 8,
+    "chapters": 86,
+    "words": 312_000,
+    "interactions": 10_430,
+    "characters": 90,
+}
+WORDS_PER_SENTENCE = 18
+INTERACTIONS_PER_CHUNK = 3
+INTERACTION_TYPES = ["Direct Dialogue", "Physical Action", "Observation", "Memory/Reference"]
+
+_WORDS = ("the a of and to in that was her his she he it with had for as not but at on be by which "
+          "said would could been have Mr Mrs Miss Dorothea Casaubon Lydgate Rosamond Middlemarch "
+          "Lowick town marriage money look face mind heart good little great own felt thought know "
+          "never always something nothing himself herself letter evening morning room house uncle").split()
+
+
+def scaled(key: str, scale: float) -> int:
+    """A `MIDDLEMARCH` size at `scale` (the cast grows with sqrt(scale))."""
+    factor = math.sqrt(scale) if key == "characters" else scale
+    return max(1, int(round(MIDDLEMARCH[key] * factor)))
+
+
+def cast(scale: float) -> List[Dict[str, Any]]:
+    """`char_alias.json` entries: the real characters plus numbered extras."""
+    with open(PROJECT_ROOT / "char_alias.json", 'r', encoding='utf-8') as f:
+        characters = json.load(f)
+    for i in range(len(characters), scaled("characters", scale)):
+        name = f"Extra Character {i:05d}"
+        characters.append({"canonical_name": name, "aliases": [name, f"Extra {i:05d}", f"character {i:05d}"]})
+    return characters[:scaled("characters", scale)]
+
+
+def write_cast(characters: List[Dict[str, Any]], path: Path) -> Path:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(characters, f)
+    return path
+
+
+def _popular(rng: random.Random, n: int) -> int:
+    """A character index where a few leads appear far more often than the rest (Zipf-like)."""
+    return min(int(rng.paretovariate(1.2)) - 1, n - 1)
+
+
+def mentions(characters: List[Dict[str, Any]], n: int, seed: int = 42) -> List[str]:
+    """Character mentions as the LLM writes them: aliases in any case, plus 10% unknown names."""
+    rng = random.Random(seed)
+    names = []
+    for _ in range(n):
+        if rng.random() < 0.1:
+            names.append(f"Stranger {rng.randrange(10_000)}")
+            continue
+        character = characters[_popular(rng, len(characters))]
+        alias = rng.choice(character["aliases"] + [character["canonical_name"]])
+        names.append(rng.choice((alias, alias.lower(), alias.upper())))
+    return names
+
+
+def sentences(scale: float, seed: int = 42) -> List[str]:
+    """Sentences of the novel's total length, averaging `WORDS_PER_SENTENCE` words."""
+    rng = random.Random(seed)
+    count = scaled("words", scale) // WORDS_PER_SENTENCE
+    return [" ".join(rng.choices(_WORDS, k=rng.randint(4, 2 * WORDS_PER_SENTENCE - 4))).capitalize() + "."
+            for _ in range(count)]
+
+
+def interactions(characters: List[Dict[str, Any]], n: int, seed: int = 42) -> List[Dict[str, str]]:
+    """Extracted interactions between canonical names, weighted towards the leads."""
+    rng = random.Random(seed)
+    records = []
+    while len(records) < n:
+        first = characters[_popular(rng, len(characters))]["canonical_name"]
+        second = characters[_popular(rng, len(characters))]["canonical_name"]
+        if first == second:
+            continue
+        records.append({
+            "character_1": first,
+            "character_2": second,
+            "interaction_type": rng.choice(INTERACTION_TYPES),
+            "evidence_snippet": " ".join(rng.choices(_WORDS, k=5)),
+        })
+    return records
+
+
+def llm_outputs(characters: List[Dict[str, Any]], n: int, seed: int = 42) -> List[str]:
+    """
+    Raw JSON strings like the model returns them, `INTERACTIONS_PER_CHUNK` on
+    average: some keys carry stray commas and spaces, 2% of the interactions
+    have an invalid type and 1% of the outputs are not valid JSON.
+    """
+    rng = random.Random(seed)
+    pool = iter(interactions(characters, n * 2 * INTERACTIONS_PER_CHUNK, seed=seed))
+    outputs = []
+    for _ in range(n):
+        chunk = []
+        for record in itertools.islice(pool, rng.randint(0, 2 * INTERACTIONS_PER_CHUNK)):
+            record = dict(record)
+            if rng.random() < 0.05:
+                record["character_2 ,"] = record.pop("character_2")
+            if rng.random() < 0.02:
+                record["interaction_type"] = "Telepathy"
+            chunk.append(record)
+        text = json.dumps({"interactions": chunk})
+        outputs.append(text[:-7] if rng.random() < 0.01 else text)
+    return outputs
+
+
+def write_llm_results(results_dir: Path, scale: float, seed: int = 42) -> List[Path]:
+    """Chapter files of `MIDDLEMARCH['books']` books under `results_dir`; returns the book directories."""
+    characters = cast(scale)
+    records = interactions(characters, scaled("interactions", scale), seed=seed)
+    chapters = scaled("chapters", scale)
+    books = MIDDLEMARCH["books"]
+    book_dirs = []
+    for b in range(books):
+        book_dir = Path(results_dir) / f"book_{b + 1}"
+        book_dir.mkdir(parents=True, exist_ok=True)
+        book_dirs.append(book_dir)
+        book_chapters = range(b * chapters // books, (b + 1) * chapters // books)
+        for local, chapter in enumerate(book_chapters):
+            start = chapter * len(records) // chapters
+            end = (chapter + 1) * len(records) // chapters
+            with open(book_dir / f"chapter_{local:03d}.json", 'w', encoding='utf-8') as f:
+                json.dump({"interactions": records[start:end]}, f)
+    return book_dirs
+
+
+def annotator_sets(characters: List[Dict[str, Any]], annotators: int, n: int,
+                   seed: int = 42) -> Tuple[Dict[str, List[Dict[str, str]]], List[Tuple[str, str]]]:
+    """
+    (annotator -> interactions, candidate pairs) for `compute_agreement_metrics`:
+    every annotator keeps each of `n` reference interactions with 80%
+    probability and changes its type 15% of the time.
+    """
+    # Candidate pairs must be keyed the way the agreement code matches them, or none ever match
+    from src.evaluation_metrics import normalize_interaction_flexible
+
+    rng = random.Random(seed)
+    reference = interactions(characters, n, seed=seed)
+    results = {}
+    for a in range(annotators):
+        kept = []
+        for record in reference:
+            if rng.random() < 0.8:
+                record = dict(record)
+                if rng.random() < 0.15:
+                    record["interaction_type"] = rng.choice(INTERACTION_TYPES)
+                kept.append(record)
+        results[f"annotator_{a:03d}"] = kept
+    pairs = sorted({normalize_interaction_flexible(r) for r in reference})
+    return results, pairs
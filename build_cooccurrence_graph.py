@@ -0,0 +1,78 @@
+"""
+Co-occurrence Baseline Builder - A character network in seconds, without the LLM.
+
+Links characters whose aliases appear in the same sentence, paragraph or
+word window (see `src/cooccurrence.py`) and saves the graph in the same
+artifact format as `build_graph.py`, as `<book>_cooccurrence_<unit>_graph.gml`.
+With --compare, each baseline is compared with the book's LLM graph.
+
+Usage:
+    uv run build_cooccurrence_graph.py book_1 --compare
+    uv run build_cooccurrence_graph.py --all --unit window --window 30
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from src.settings import Settings
+from src.character_mapper import CharacterMapper
+from src.cooccurrence import (UNITS, AliasMatcher, baseline_name, build_cooccurrence_graph, compare_with_llm,
+                              load_book_texts, save_comparison)
+from src.graph_builder import load_graph_artifact, save_graph_artifact
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build co-occurrence baseline graph artifacts from the book text.")
+    parser.add_argument("book_names", nargs="*", help="Books to process (e.g. 'book_1').")
+    parser.add_argument("--all", action="store_true", help="Process every book in the books directory.")
+    parser.add_argument("--unit", choices=UNITS, default=None,
+                        help="Co-occurrence unit (default: analysis.cooccurrence_unit in config.yaml).")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Window size in words for --unit window (default: analysis.cooccurrence_window).")
+    parser.add_argument("--compare", action="store_true", help="Compare each baseline with the book's LLM graph.")
+    parser.add_argument("--top-n", type=int, default=10, help="Rows per section in the comparison report.")
+    parser.add_argument("--output-dir", type=Path, default=Path("./analysis_reports/cooccurrence"),
+                        help="Where the comparison reports are written.")
+    args = parser.parse_args()
+
+    settings = Settings(config_path="config.yaml")
+    unit = args.unit or settings.COOCCURRENCE_UNIT
+    window = args.window or settings.COOCCURRENCE_WINDOW
+
+    names = list(args.book_names)
+    if args.all:
+        names += sorted((p.stem for p in settings.BOOKS_DIR.glob("*.txt") if p.stem not in names),
+                        key=lambda name: (len(name), name))
+    if not names:
+        parser.error("Give at least one book name, or --all.")
+    missing = [name for name in names if not (settings.BOOKS_DIR / f"{name}.txt").exists()]
+    if missing:
+        print(f"FATAL: No book text for {missing} in '{settings.BOOKS_DIR}'.")
+        sys.exit(1)
+
+    print(f"\n--- Co-occurrence Baseline ({unit}{f', {window} words' if unit == 'window' else ''}) ---")
+    matcher = AliasMatcher(CharacterMapper(file_path=str(settings.CHARACTER_FILE)))
+    start = time.perf_counter()
+    for book_name, book_text in load_book_texts(settings.BOOKS_DIR, names).items():
+        book_start = time.perf_counter()
+        G, _ = build_cooccurrence_graph([book_text], matcher, unit=unit, window=window)
+        name = baseline_name(book_name, unit)
+        output_path = settings.GRAPH_ARTIFACTS_DIR / f"{name}_graph.gml"
+        save_graph_artifact(G, output_path)
+        print(f"{book_name}: {G.number_of_nodes()} characters, {G.number_of_edges()} edges, "
+              f"{int(G.size(weight='weight'))} co-occurrences in {time.perf_counter() - book_start:.2f}s "
+              f"-> {output_path}")
+
+        if args.compare:
+            llm_path = settings.GRAPH_ARTIFACTS_DIR / f"{book_name}_graph.gml"
+            if not llm_path.exists():
+                print(f"  No LLM graph artifact at {llm_path}; run 'build_graph.py {book_name}' to compare.")
+                continue
+            comparison = compare_with_llm(load_graph_artifact(llm_path), G, llm_name=book_name,
+                                          baseline_name=name, top_n=args.top_n)
+            report_path, _ = save_comparison(comparison, args.output_dir, top_n=args.top_n)
+            print(f"  vs LLM: recall {comparison.recall:.3f}, precision {comparison.precision:.3f}, "
+                  f"PageRank correlation {comparison.centrality_correlation:.3f} -> {report_path}")
+
+    print(f"\nBuilt {len(names)} baseline graph(s) in {time.perf_counter() - start:.2f}s.")
@@ -0,0 +1,46 @@
+"""
+Snippet Index Builder - Ranks passages for crowd annotation by model uncertainty.
+
+Every paragraph of the novel is scored by how unsure the models are about it
+(judge `needs_review` share plus disagreement between extraction runs, see
+`src/snippet_queue.py`), and the top ones are written to the snippet index
+that `annotation_survey_app.py` serves. Rebuild it after new extraction or
+judge runs; submissions already collected keep counting towards their snippets.
+
+Usage:
+    uv run build_snippet_index.py
+    uv run build_snippet_index.py --size 1000 --output ./annotation_snippets.json
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from src.settings import Settings
+from src.snippet_queue import save_snippet_index, snippet_index_from_settings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the prioritised snippet index for the annotation app.")
+    parser.add_argument("--size", type=int, default=None,
+                        help="Snippets to keep (default: annotation.snippet_index_size).")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Index file (default: annotation.snippet_index_file).")
+    args = parser.parse_args()
+
+    settings = Settings(config_path="config.yaml")
+    if args.size:
+        settings.SNIPPET_INDEX_SIZE = args.size
+    output_path = args.output or settings.SNIPPET_INDEX_FILE
+
+    start = time.perf_counter()
+    snippets = snippet_index_from_settings(settings)
+    save_snippet_index(snippets, output_path)
+
+    uncertain = [s for s in snippets if s['priority'] > 0]
+    print(f"\nIndexed {len(snippets)} snippet(s) in {time.perf_counter() - start:.2f}s: "
+          f"{len(uncertain)} with model uncertainty "
+          f"({sum(s['disagreement'] > 0 for s in snippets)} with run disagreement, "
+          f"{sum(s['needs_review'] > 0 for s in snippets)} with judge reviews).")
+    for snippet in snippets[:5]:
+        print(f"  {snippet['id']:<22} priority {snippet['priority']:.3f}  {snippet['text'][:60]}...")
+    print(f"Index saved to {output_path}")
@@ -0,0 +1,40 @@
+"""
+Crowd Annotation Importer - Moves legacy annotator JSON files into the annotation store.
+
+`annotation_survey_app.py` now appends submissions to
+`crowd_annotations/annotations.db` (see `src/annotation_store.py`). This
+imports the `annotator_<id>.json` files written before that. Submissions
+already in the store are skipped, so it is safe to run repeatedly; the JSON
+files are left in place.
+
+Usage:
+    uv run import_crowd_annotations.py
+    uv run import_crowd_annotations.py --annotations-dir ./crowd_annotations
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from src.settings import Settings
+from src.annotation_store import AnnotationStore, store_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import annotator_*.json files into the annotation store.")
+    parser.add_argument("--annotations-dir", type=Path, default=None,
+                        help="Crowd annotation directory (default: data.crowd_annotations_dir).")
+    args = parser.parse_args()
+
+    settings = Settings(config_path="config.yaml")
+    annotations_dir = args.annotations_dir or settings.CROWD_ANNOTATIONS_DIR
+    if not annotations_dir.is_dir():
+        print(f"FATAL: No crowd annotation directory at '{annotations_dir}'.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    store = AnnotationStore(store_path(annotations_dir))
+    files, added = store.import_json_files(annotations_dir)
+    print(f"Read {files} annotator file(s): {added} new submission(s) imported in "
+          f"{time.perf_counter() - start:.2f}s; the store now holds {store.count()}.")
+    print(f"Store: {store.path}")
@@ -0,0 +1,59 @@
+"""
+Agreement Runner - Inter-annotator agreement of the crowd annotations.
+
+Reads the submissions saved by `annotation_survey_app.py`, builds one
+items x annotators label matrix (an item is a character pair within a
+snippet, labelled with an interaction type or "No Interaction") and reports
+Fleiss' kappa, Krippendorff's alpha and the mean pairwise Cohen's kappa,
+broken down per snippet and per interaction type.
+
+Usage:
+    uv run run_agreement.py
+    uv run run_agreement.py --annotations-dir ./crowd_annotations --top-n 20
+    uv run run_agreement.py --profile                 # Stage timings into run_logs/
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from src.settings import Settings
+from src.character_mapper import CharacterMapper
+from src.evaluation_metrics import (compute_label_agreement, crowd_label_matrix, generate_agreement_report,
+                                    load_crowd_annotations, save_agreement_report)
+from src.profiling import add_profile_argument, start_profiler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute inter-annotator agreement of crowd annotations.")
+    parser.add_argument("--annotations-dir", type=Path, default=None,
+                        help="Crowd annotation directory (default: data.crowd_annotations_dir).")
+    parser.add_argument("--top-n", type=int, default=10, help="Least-agreed snippets listed in the report.")
+    parser.add_argument("--output-dir", type=Path, default=Path("./analysis_reports/agreement"),
+                        help="Where agreement_report.txt and agreement.json are written.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    profiler = start_profiler(args.profile, "run_agreement")
+
+    settings = Settings(config_path="config.yaml")
+    with profiler.stage("load annotations"):
+        records = load_crowd_annotations(str(args.annotations_dir or settings.CROWD_ANNOTATIONS_DIR))
+    if not records:
+        print("FATAL: No crowd annotations found. Collect some with 'streamlit run annotation_survey_app.py'.")
+        sys.exit(1)
+
+    with profiler.stage("load characters"):
+        character_mapper = CharacterMapper(file_path=str(settings.CHARACTER_FILE))
+    start = time.perf_counter()
+    with profiler.stage("label matrix"):
+        matrix = crowd_label_matrix(records, name_resolver=character_mapper.get_canonical_name)
+    with profiler.stage("agreement"):
+        breakdown = compute_label_agreement(matrix)
+    with profiler.stage("save report"):
+        report_path, json_path = save_agreement_report(breakdown, str(args.output_dir), top_n=args.top_n)
+
+    print(generate_agreement_report(breakdown, args.top_n))
+    print(f"\n{len(records)} submissions, {len(matrix.annotators)} annotators, {len(matrix.items)} items "
+          f"in {time.perf_counter() - start:.2f}s.")
+    print(f"Report saved to {report_path}\nPer-snippet agreement saved to {json_path}")
+    profiler.finish()
@@ -0,0 +1,137 @@
+"""
+Evaluation Runner - Scores every extraction run against every gold annotation file.
+
+Gold files in `gold_annotations/` name the chapter they annotate; extraction
+runs are the `llm_results/<book>[_<run>]` directories (`book_1` is the
+default run of book_1, `book_1_sentenceSplitting` another run of it). All runs
+are evaluated in one vectorised call (see `evaluate_corpus`), with strict,
+flexible and per-type scores per chapter, book and run. Bootstrap resampling
+of the gold chapters adds confidence intervals to every run's scores and a
+paired test for every pair of runs.
+
+Crowd gold (`aggregate_crowd_gold.py`) only covers the annotated paragraphs
+of a chapter. For such chapters, only the predictions whose evidence is
+quoted from those paragraphs are scored.
+
+Usage:
+    uv run run_evaluation.py                          # Every run with gold chapters
+    uv run run_evaluation.py --runs default sentenceSplitting
+    uv run run_evaluation.py --raw-names              # Compare names as extracted
+    uv run run_evaluation.py --resamples 0            # Point estimates only
+    uv run run_evaluation.py --gold-dir crowd_gold_annotations   # Against the crowd gold
+    uv run run_evaluation.py --profile                # Stage timings into run_logs/
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from src.settings import Settings
+from src.character_mapper import CharacterMapper
+from src.data_preprocessor import load_books, split_chapters
+from src.evaluation_metrics import (BOOTSTRAP_UNITS, MATCH_MODES, bootstrap_evaluation, discover_runs,
+                                    evaluate_corpus, export_for_error_analysis, load_gold_documents,
+                                    load_run_predictions, restrict_to_paragraphs, save_corpus_evaluation)
+from src.profiling import add_profile_argument, start_profiler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate extraction runs against the gold annotations.")
+    parser.add_argument("--gold-dir", type=Path, default=None,
+                        help="Gold annotation directory (default: data.gold_annotations_dir).")
+    parser.add_argument("--runs", nargs="*", default=None, help="Only evaluate these runs (e.g. 'default').")
+    parser.add_argument("--raw-names", action="store_true",
+                        help="Do not resolve character aliases before matching.")
+    parser.add_argument("--resamples", type=int, default=None,
+                        help="Bootstrap resamples, 0 to skip (default: evaluation.bootstrap_resamples).")
+    parser.add_argument("--bootstrap-unit", choices=BOOTSTRAP_UNITS, default=None,
+                        help="Resample chapters or whole books (default: evaluation.bootstrap_unit).")
+    parser.add_argument("--output-dir", type=Path, default=Path("./analysis_reports/evaluation"),
+                        help="Where the reports are written.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    profiler = start_profiler(args.profile, "run_evaluation")
+
+    settings = Settings(config_path="config.yaml")
+    with profiler.stage("load gold"):
+        gold, scopes = load_gold_documents(str(args.gold_dir or settings.GOLD_ANNOTATIONS_DIR))
+    if not gold:
+        print("FATAL: No gold annotations found.")
+        sys.exit(1)
+    books = {book for book, _ in gold}
+
+    run_dirs = discover_runs(str(settings.RESULTS_DIR), books)
+    if args.runs:
+        run_dirs = {name: dirs for name, dirs in run_dirs.items() if name in args.runs}
+    if not run_dirs:
+        print(f"FATAL: No extraction results for the gold books {sorted(books)}.")
+        sys.exit(1)
+
+    name_resolver = None
+    if not args.raw_names:
+        with profiler.stage("load characters"):
+            name_resolver = CharacterMapper(file_path=str(settings.CHARACTER_FILE)).get_canonical_name
+
+    start = time.perf_counter()
+    with profiler.stage("load predictions"):
+        runs = {name: load_run_predictions(dirs) for name, dirs in run_dirs.items()}
+    partial = {key for key, scope in scopes.items() if scope is not None}
+    if partial:
+        # Gold for some paragraphs only: score the predictions quoted from those paragraphs
+        with profiler.stage("restrict to paragraphs"):
+            chapter_texts = {}
+            for book_file, book_text in load_books(str(settings.BOOKS_DIR)).items():
+                for index, chapter_text in enumerate(split_chapters(book_text)):
+                    if (Path(book_file).stem, index) in partial:
+                        chapter_texts[(Path(book_file).stem, index)] = chapter_text
+            unplaced = 0
+            for name in runs:
+                runs[name], dropped = restrict_to_paragraphs(runs[name], scopes, chapter_texts)
+                unplaced += dropped
+        print(f"{len(partial)} gold chapter(s) cover only their annotated paragraphs; predictions elsewhere "
+              f"are not scored ({unplaced} prediction(s) whose evidence could not be placed were dropped).")
+        missing = sorted(partial - set(chapter_texts))
+        if missing:
+            print(f"WARNING: No book text for {missing}; their predictions cannot be placed.")
+    with profiler.stage("evaluate"):
+        evaluation = evaluate_corpus(gold, runs, name_resolver=name_resolver)
+    evaluated = time.perf_counter()
+
+    resamples = settings.EVAL_BOOTSTRAP_RESAMPLES if args.resamples is None else args.resamples
+    bootstrap = []
+    if resamples > 0:
+        try:
+            with profiler.stage("bootstrap"):
+                bootstrap = [bootstrap_evaluation(evaluation, mode=mode,
+                                                  unit=args.bootstrap_unit or settings.EVAL_BOOTSTRAP_UNIT,
+                                                  resamples=resamples, confidence=settings.EVAL_BOOTSTRAP_CONFIDENCE,
+                                                  seed=settings.EVAL_BOOTSTRAP_SEED)
+                             for mode in MATCH_MODES]
+        except ValueError as e:
+            print(f"WARNING: Skipping confidence intervals. Details: {e}")
+    with profiler.stage("save reports"):
+        report_path, json_path, csv_path = save_corpus_evaluation(evaluation, str(args.output_dir),
+                                                                  per_type=settings.EVAL_PER_TYPE_METRICS,
+                                                                  bootstrap=bootstrap)
+        if settings.EVAL_EXPORT_ERROR_ANALYSIS:
+            for run in evaluation.runs:
+                export_for_error_analysis(evaluation.result_for_run(run),
+                                          str(args.output_dir / f"errors_{run}.json"))
+
+    print(f"Evaluated {len(evaluation.runs)} run(s) on {len(evaluation.documents)} gold chapter(s) "
+          f"in {evaluated - start:.2f}s.")
+    if bootstrap:
+        print(f"Bootstrapped {resamples} resamples of {bootstrap[0].unit}s in {time.perf_counter() - evaluated:.2f}s.")
+    intervals = {result.mode: result.intervals for result in bootstrap}
+    print(f"\n{'Run':<24} {'Mode':<10} {'Precision':>10} {'Recall':>10} {'F1':>10}  F1 interval")
+    for mode in MATCH_MODES:
+        for row in evaluation.scores("run", mode):
+            f1_interval = intervals.get(mode, {}).get(row['run'], {}).get('f1_score')
+            print(f"{row['run']:<24} {mode:<10} {row['precision']:>10.4f} {row['recall']:>10.4f} "
+                  f"{row['f1_score']:>10.4f}" + (f"  [{f1_interval[0]:.4f}, {f1_interval[1]:.4f}]" if f1_interval else ""))
+    for result in bootstrap:
+        for test in result.paired_tests:
+            print(f"{result.mode} {test.metric}: {test.run_a} - {test.run_b} = {test.delta:+.4f} "
+                  f"[{test.lower:+.4f}, {test.upper:+.4f}], p = {test.p_value:.4f}")
+    print(f"\nReport saved to {report_path}\nScores saved to {json_path} and {csv_path}")
+    profiler.finish()
@@ -9,6 +9,7 @@ Usage:
     uv run run_judge_pipeline.py book_1
     uv run run_judge_pipeline.py book_1 --sample-rate 0.2  # Judge 20% sample
     uv run run_judge_pipeline.py book_1 --threshold 0.7     # Accept threshold
+    uv run run_judge_pipeline.py book_1 --profile           # Stage timings into run_logs/
 """
 
 import os
@@ -27,6 +28,7 @@ from src.gemini_judge import (
     Verdict,
     filter_by_verdict
 )
+from src.profiling import NULL_PROFILER, add_profile_argument, start_profiler
 
 # Configure logging
 logging.basicConfig(
@@ -59,7 +61,8 @@ def run_judge_pipeline(
     book_name: str,
     sample_rate: float = 1.0,
     accept_threshold: float = 0.7,
-    reject_threshold: float = 0.3
+    reject_threshold: float = 0.3,
+    profiler=NULL_PROFILER
 ):
     """
     Run the judge pipeline on extracted interactions.
@@ -69,6 +72,7 @@ def run_judge_pipeline(
         sample_rate: Fraction of interactions to judge (0.0-1.0)
         accept_threshold: Minimum score to auto-accept
         reject_threshold: Maximum score to auto-reject
+        profiler: Times chapter loading, judging and saving (see src/profiling.py)
     """
     # Load settings
     settings = Settings(config_path="config.yaml")
@@ -109,8 +113,9 @@ def run_judge_pipeline(
         logger.info(f"Processing {file_path.name}")
         
         # Load interactions
-        with open(file_path, 'r', encoding='utf-8') as f:
-            chapter_data = json.load(f)
+        with profiler.stage("load interactions"):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                chapter_data = json.load(f)
         
         interactions = chapter_data.get('interactions', [])
         all_stats['total_interactions'] += len(interactions)
@@ -122,15 +127,16 @@ def run_judge_pipeline(
         import random
         if sample_rate < 1.0:
             sample_size = max(1, int(len(interactions) * sample_rate))
-            sampled_indices = set(random.sample(range(len(interactions)), sample_size))
+            sampled_indices = sorted(random.sample(range(len(interactions)), sample_size))
             interactions_to_judge = [interactions[i] for i in sampled_indices]
         else:
             interactions_to_judge = interactions
-            sampled_indices = set(range(len(interactions)))
+            sampled_indices = list(range(len(interactions)))
         
         # Get chapter text for context
         chapter_idx = int(file_path.stem.split('_')[-1])
-        chapter_text = load_chapter_text(settings.BOOKS_DIR, book_name, chapter_idx)
+        with profiler.stage("load chapter text"):
+            chapter_text = load_chapter_text(settings.BOOKS_DIR, book_name, chapter_idx)
         
         # Prepare for judging
         to_judge = [
@@ -145,14 +151,15 @@ def run_judge_pipeline(
         ]
         
         # Judge interactions
-        evaluations = judge.judge_batch(to_judge, batch_size=10)
+        with profiler.stage("judge batch"):
+            evaluations = judge.judge_batch(to_judge, batch_size=10)
         
         # Build judged interactions
         judged_interactions = []
         confidence_scores = []
         aggregate_scores = []
         
-        for interaction, evaluation in zip(interactions_to_judge, evaluations):
+        for index, interaction, evaluation in zip(sampled_indices, interactions_to_judge, evaluations):
             if evaluation:
                 agg_score = judge.compute_aggregate_score(evaluation)
                 judged = JudgedInteraction(
@@ -163,7 +170,11 @@ def run_judge_pipeline(
                     verdict=evaluation.verdict,
                     confidence_score=evaluation.confidence_score,
                     aggregate_score=agg_score,
-                    reasoning=evaluation.reasoning
+                    reasoning=evaluation.reasoning,
+                    factuality_score=evaluation.factuality_score,
+                    character_validity_score=evaluation.character_validity_score,
+                    type_accuracy_score=evaluation.type_accuracy_score,
+                    interaction_index=index
                 )
                 judged_interactions.append(judged)
                 confidence_scores.append(evaluation.confidence_score)
@@ -186,20 +197,25 @@ def run_judge_pipeline(
             all_stats['avg_confidence'] += sum(confidence_scores)
             all_stats['avg_aggregate_score'] += sum(aggregate_scores)
         
-        # Save judged results
+        # Save judged results; 'judged' keeps every raw score so
+        # sweep_judge_thresholds.py can re-apply other thresholds offline
         output_data = {
             'chapter': file_path.stem,
             'sample_rate': sample_rate,
+            'accept_threshold': accept_threshold,
+            'reject_threshold': reject_threshold,
             'total_original': len(chapter_data.get('interactions', [])),
             'total_judged': len(judged_interactions),
+            'judged': [j.model_dump() for j in judged_interactions],
             'accepted': [j.model_dump() for j in filtered['accepted']],
             'rejected': [j.model_dump() for j in filtered['rejected']],
             'needs_review': [j.model_dump() for j in filtered['needs_review']]
         }
         
         output_path = judged_dir / file_path.name
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, default=str)
+        with profiler.stage("save verdicts"):
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, default=str)
     
     # Finalize stats
     if all_stats['judged_interactions'] > 0:
@@ -259,12 +275,16 @@ if __name__ == "__main__":
         default=0.3,
         help="Reject threshold for aggregate score (default: 0.3)"
     )
+    add_profile_argument(parser)
     
     args = parser.parse_args()
+    profiler = start_profiler(args.profile, "run_judge_pipeline")
     
     run_judge_pipeline(
         book_name=args.book_name,
         sample_rate=args.sample_rate,
         accept_threshold=args.threshold,
-        reject_threshold=args.reject_threshold
+        reject_threshold=args.reject_threshold,
+        profiler=profiler
     )
+    profiler.finish()
@@ -2,24 +2,25 @@ import os
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-import re
 import sys
+import time
 from pathlib import Path
 import json
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-import nltk
-import ssl
 from tqdm import tqdm
 import argparse
 import shutil
-from transformers import AutoTokenizer
 
 from src.settings import Settings
-from src.data_preprocessor import load_books
+from src.data_preprocessor import load_books, split_chapters
 from src.character_mapper import CharacterMapper
 from src.prompt_manager import PromptManager
 from src.llm_client import LLMClient
+from src.profiling import add_profile_argument, start_profiler
+from src.telemetry import generate_telemetry_report, save_chapter_telemetry, save_run_telemetry, summarize
+from src.utils import ensure_nltk_resource, interaction_key
 
 
 def create_adaptive_chunks(sentences: list[str], tokenizer, token_limit: int, overlap_sentences: int) -> list[str]:
@@ -51,19 +52,24 @@ def create_adaptive_chunks(sentences: list[str], tokenizer, token_limit: int, ov
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the LLM-based NLP extraction pipeline.")
     parser.add_argument("--force-rerun", action="store_true", help="Deletes 'llm_results' for a clean slate.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Update a live graph per book as interactions arrive and snapshot it periodically.")
+    parser.add_argument("--config", default="config.yaml",
+                        help="Configuration file; its directory is the root for the data paths.")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    profiler = start_profiler(args.profile, "run_llm_extraction")
 
     # --- 1. SETUP ---
     print("--- LLM Extraction Pipeline with Adaptive Chunking Started ---")
-    try:
-        _create_unverified_https_context = ssl._create_unverified_context
-    except AttributeError:
-        pass
-    else:
-        ssl._create_default_https_context = _create_unverified_https_context
-    nltk.download('punkt', quiet=True)
+    # Heavy NLP dependencies are only imported once we know we are extracting
+    with profiler.stage("import nlp"):
+        import nltk
+        from transformers import AutoTokenizer
+
+        ensure_nltk_resource("tokenizers/punkt", "punkt")
 
-    settings = Settings(config_path="config.yaml")
+    settings = Settings(config_path=args.config)
 
     RESULTS_DIR = settings.RESULTS_DIR
     if args.force_rerun and RESULTS_DIR.exists():
@@ -72,72 +78,169 @@ if __name__ == "__main__":
 
     # --- 2. DATA LOADING & PREP ---
     print(f"\n--- Loading all books from '{settings.BOOKS_DIR}' ---")
-    all_books_raw = load_books(settings.BOOKS_DIR)
+    with profiler.stage("load books"):
+        all_books_raw = load_books(settings.BOOKS_DIR)
     print(f"Found {len(all_books_raw)} books to process.")
 
-    counting_tokenizer = AutoTokenizer.from_pretrained(settings.FAST_TOKENIZER)
-    character_mapper = CharacterMapper(file_path=str(settings.CHARACTER_FILE))
-    prompt_manager = PromptManager(canonical_character_list=character_mapper.all_canonical_names)
-    llm_client = LLMClient(host=settings.LLM_HOST)
+    with profiler.stage("load tokenizer"):
+        counting_tokenizer = AutoTokenizer.from_pretrained(settings.FAST_TOKENIZER)
+    with profiler.stage("load characters"):
+        character_mapper = CharacterMapper(file_path=str(settings.CHARACTER_FILE))
+        prompt_manager = PromptManager(canonical_character_list=character_mapper.all_canonical_names)
+    llm_client = LLMClient(host=settings.LLM_HOST, retries=settings.LLM_HOST_RETRIES,
+                           max_failures=settings.LLM_HOST_MAX_FAILURES,
+                           cooldown_seconds=settings.LLM_HOST_COOLDOWN_SECONDS)
+
+    cascade = None
+    if settings.CASCADE_MODEL:
+        # The alias scan pulls in the co-occurrence baseline (numpy, networkx)
+        from src.cascade import CascadeConfig, CascadeExtractor, generate_cascade_report
+
+        cascade = CascadeExtractor(llm_client, character_mapper,
+                                   CascadeConfig(small_model=settings.CASCADE_MODEL, large_model=settings.LLM_MODEL,
+                                                 max_characters=settings.CASCADE_MAX_CHARACTERS,
+                                                 escalate_on=settings.CASCADE_ESCALATE_ON))
+        print(f"Cascade: chunks go to '{settings.CASCADE_MODEL}' first, hard ones to '{settings.LLM_MODEL}'.")
+
+    stream = None
+    if args.stream:
+        # Graph code (numpy, networkx arrays) is only needed for live updates
+        from src.streaming import StreamConfig, StreamingPipeline
+
+        stream = StreamingPipeline(character_mapper, settings.GRAPH_ARTIFACTS_DIR,
+                                   StreamConfig(refresh_every=settings.STREAM_REFRESH_INTERACTIONS,
+                                                snapshot_seconds=settings.STREAM_SNAPSHOT_SECONDS))
+        stream.start()
+        print(f"Streaming live graphs to '{settings.GRAPH_ARTIFACTS_DIR}' "
+              f"(snapshots every {settings.STREAM_SNAPSHOT_SECONDS}s).")
 
     # --- 3. LLM PROCESSING ---
-    for book_filename, book_text in all_books_raw.items():
-        book_name = Path(book_filename).stem
-        print(f"\n\n--- Processing Book: {book_name} ---")
-        BOOK_RESULTS_DIR = RESULTS_DIR / book_name
-        BOOK_RESULTS_DIR.mkdir(exist_ok=True)
-
-        chapter_pattern = re.compile(r'^\s*Chapter\s*\d+\s*', re.MULTILINE)
-        chapters_raw = chapter_pattern.split(book_text)[1:]
-        print(f"Found {len(chapters_raw)} chapters.")
-
-        for i, chapter_text in enumerate(chapters_raw):
-            chapter_output_path = BOOK_RESULTS_DIR / f"chapter_{i:03d}.json"
-            if chapter_output_path.exists():
-                print(f"Skipping Chapter {i + 1} as its result file already exists.")
-                continue
-
-            print(f"\n--- Processing Chapter {i + 1}/{len(chapters_raw)} ---")
+    # Chunks of a chapter depend on each other (the active character buffer), chapters do not:
+    # with several Ollama hosts, as many chapters run at once as the pool serves requests.
+    workers = settings.EXTRACTION_WORKERS or llm_client.pool.capacity
+    if workers > 1:
+        print(f"Extracting up to {workers} chapters in parallel.")
+
+    def extract_chapter(book_name: str, i: int, chapter_text: str, chapter_output_path: Path,
+                        label: str) -> list:
+        """Extracts, deduplicates and saves one chapter; returns its chunk telemetry."""
+        print(f"\n--- Processing {label} ---")
+        with profiler.stage("sentence split"):
             sentences = nltk.sent_tokenize(chapter_text)
+        with profiler.stage("chunking"):
             chunks = create_adaptive_chunks(sentences, counting_tokenizer, settings.CHUNK_TOKEN_LIMIT,
                                             settings.CHUNK_OVERLAP_SENTENCES)
 
-            all_chapter_interactions = []
-            active_character_buffer = deque(maxlen=5)
+        all_chapter_interactions = []
+        chapter_telemetry = []
+        active_character_buffer = deque(maxlen=5)
 
-            for chunk_text in tqdm(chunks, desc=f"Chapter {i + 1} Chunks"):
+        for chunk_index, chunk_text in enumerate(tqdm(chunks, desc=f"Chapter {i + 1} Chunks", disable=workers > 1)):
+            taken_up = time.perf_counter()
+            with profiler.stage("build prompt"):
                 prompt = prompt_manager.create_interaction_prompt(chunk_text, list(active_character_buffer))
 
-                # THE FIX: The client returns a single object or None, not a list.
-                llm_response = llm_client.get_llm_response(settings.LLM_MODEL, prompt)
-
-                # THE FIX: We no longer loop. We just check if the single response is valid.
-                if llm_response and llm_response.interactions:
-                    interactions = [interaction.model_dump() for interaction in llm_response.interactions]
-                    all_chapter_interactions.extend(interactions)
-                    for interaction in interactions:
-                        if interaction['character_1'] not in active_character_buffer:
-                            active_character_buffer.append(interaction['character_1'])
-                        if interaction['character_2'] not in active_character_buffer:
-                            active_character_buffer.append(interaction['character_2'])
-
-            # THE FIX: Simpler, more robust deduplication.
-            # Convert each dict to a string to make it hashable for the set.
+            # THE FIX: The client returns a single object or None, not a list.
+            with profiler.stage("llm request"):
+                if cascade:
+                    llm_response, telemetry = cascade.generate(chunk_text, prompt, list(active_character_buffer),
+                                                               queued_at=taken_up)
+                else:
+                    llm_response, telemetry = llm_client.generate(settings.LLM_MODEL, prompt, queued_at=taken_up)
+            telemetry.book, telemetry.chapter, telemetry.chunk = book_name, i, chunk_index
+            chapter_telemetry.append(telemetry)
+
+            # THE FIX: We no longer loop. We just check if the single response is valid.
+            if llm_response and llm_response.interactions:
+                interactions = [interaction.model_dump() for interaction in llm_response.interactions]
+                all_chapter_interactions.extend(interactions)
+                if stream:
+                    stream.submit(book_name, i, interactions)
+                for interaction in interactions:
+                    if interaction['character_1'] not in active_character_buffer:
+                        active_character_buffer.append(interaction['character_1'])
+                    if interaction['character_2'] not in active_character_buffer:
+                        active_character_buffer.append(interaction['character_2'])
+
+        # THE FIX: Simpler, more robust deduplication.
+        # Convert each dict to a string to make it hashable for the set.
+        with profiler.stage("deduplicate and save"):
             seen = set()
             deduplicated_interactions = []
             for interaction in all_chapter_interactions:
                 # Create a unique key for the interaction, ignoring order of characters
-                key_part1 = tuple(sorted((interaction['character_1'], interaction['character_2'])))
-                key_part2 = interaction['evidence_snippet']
-                interaction_key = (key_part1, key_part2)
+                key = interaction_key(interaction)
 
-                if interaction_key not in seen:
+                if key not in seen:
                     deduplicated_interactions.append(interaction)
-                    seen.add(interaction_key)
+                    seen.add(key)
 
             with open(chapter_output_path, 'w', encoding='utf-8') as f:
                 json.dump({"interactions": deduplicated_interactions}, f, indent=2)
 
-            print(f"Saved {len(deduplicated_interactions)} unique interactions for Chapter {i + 1}")
+        print(f"Saved {len(deduplicated_interactions)} unique interactions for Chapter {i + 1}"
+              + (f" of {book_name}" if workers > 1 else ""))
+        if not settings.TELEMETRY_ENABLED:
+            return []
+        save_chapter_telemetry(chapter_output_path.parent, i, chapter_telemetry, settings.TELEMETRY_COLD_LOAD_SECONDS)
+        return chapter_telemetry
 
+    run_telemetry = []
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chapter") if workers > 1 else None
+    pending = []
+    try:
+        for book_filename, book_text in all_books_raw.items():
+            book_name = Path(book_filename).stem
+            print(f"\n\n--- Processing Book: {book_name} ---")
+            BOOK_RESULTS_DIR = RESULTS_DIR / book_name
+            BOOK_RESULTS_DIR.mkdir(exist_ok=True)
+
+            chapters_raw = split_chapters(book_text)
+            print(f"Found {len(chapters_raw)} chapters.")
+
+            for i, chapter_text in enumerate(chapters_raw):
+                chapter_output_path = BOOK_RESULTS_DIR / f"chapter_{i:03d}.json"
+                if chapter_output_path.exists():
+                    print(f"Skipping Chapter {i + 1} as its result file already exists.")
+                    if stream:
+                        # Earlier chapters still belong in the live graph
+                        with open(chapter_output_path, 'r', encoding='utf-8') as f:
+                            stream.submit(book_name, i, json.load(f).get("interactions", []))
+                    continue
+
+                label = f"Chapter {i + 1}/{len(chapters_raw)}" + (f" of {book_name}" if executor else "")
+                if executor:
+                    pending.append(executor.submit(extract_chapter, book_name, i, chapter_text,
+                                                   chapter_output_path, label))
+                else:
+                    run_telemetry.extend(extract_chapter(book_name, i, chapter_text, chapter_output_path, label))
+
+        if executor:
+            for future in pending:
+                run_telemetry.extend(future.result())
+    finally:
+        # Also on Ctrl-C or a failed chapter: chapters not yet started are dropped, running ones
+        # finish, and the live graphs get their final snapshot from what was queued
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        if stream:
+            stream.close()
+
+    if run_telemetry:
+        summary = summarize(run_telemetry, settings.TELEMETRY_COLD_LOAD_SECONDS, settings.TELEMETRY_SLOWEST_CHUNKS)
+        summary['hosts'] = llm_client.pool.summary()
+        if cascade:
+            summary['cascade'] = cascade.summary()
+        telemetry_path = save_run_telemetry(RESULTS_DIR, summary, {
+            'llm_model': settings.LLM_MODEL,
+            'llm_host': settings.LLM_HOST,
+            'cascade_model': settings.CASCADE_MODEL,
+            'chunk_token_limit': settings.CHUNK_TOKEN_LIMIT,
+            'chunk_overlap_sentences': settings.CHUNK_OVERLAP_SENTENCES,
+        })
+        print("\n" + generate_telemetry_report(summary))
+        if cascade:
+            print("\n" + generate_cascade_report(summary['cascade']))
+        print(f"Telemetry saved to {telemetry_path}")
+    profiler.finish()
     print("\n\n--- LLM Extraction Complete ---")
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""
+Analytics Cache - Computed network analytics as a reusable, hash-keyed artifact.
+
+Everything the reports show (relationship ranking, centralities, communities,
+per-chapter rankings and the temporal series) is computed once per graph and
+stored as JSON under `graph_artifacts/analytics/`. The key is a hash of the
+graph's weighted edges, its per-chapter edges and the analysis parameters, so
+changing `top_n` or the output format only re-renders: the text, JSON and CSV
+renderers below read from the artifact, and rendered HTML pages are memoized
+next to it (`pages/<report>/`, one entry per page type; a new page evicts the
+one it supersedes).
+"""
+
+import csv
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+
+from src.centrality import BetweennessConfig, betweenness_centrality
+from src.communities import CommunityConfig, CommunityResult
+from src.graph_builder import ChapterEdges
+from src.network_math import degree_and_strength, normalized_degree
+from src.temporal_network import TemporalNetwork, write_series_csv
+from src.utils import graph_content_hash
+
+# Bump when the artifact layout or any computation changes, to invalidate old entries
+ANALYTICS_VERSION = 2
+# Bump when the HTML pages change (viewer template, pyvis styling, layout code), to invalidate memoized pages
+RENDERER_VERSION = 2
+
+REPORT_FORMATS = ("text", "json", "csv")
+
+CENTRALITY_NAMES = ("Degree Centrality", "Betweenness Centrality", "Eigenvector Centrality")
+
+
+@dataclass
+class AnalyticsArtifact:
+    """Full (untruncated) analytics of one graph; renderers pick their own top N."""
+    key: str
+    graph_hash: str
+    params: Dict[str, Any]
+    num_nodes: int
+    num_edges: int
+    relationships: List[list]            # [char1, char2, weight], heaviest first
+    strength: Dict[str, float]           # Weighted degree (total interactions) per character
+    centralities: Dict[str, List[list]]  # Metric name -> [character, score], highest first
+    betweenness: str                     # How betweenness was computed (BetweennessResult.describe)
+    chapters: List[list] = field(default_factory=list)  # [chapter index, [[character, score], ...]]
+    temporal: Dict[str, List[list]] = field(default_factory=dict)  # Series mode -> SERIES_COLUMNS rows
+    communities: Optional[Dict[str, Any]] = None          # asdict(CommunityResult)
+
+    def community_result(self) -> Optional[CommunityResult]:
+        return CommunityResult(**self.communities) if self.communities else None
+
+
+def analytics_key(graph_hash: str, chapter_edges: Optional[ChapterEdges], params: Dict[str, Any]) -> str:
+    """Cache key of a graph, its chapter slices and the analysis parameters."""
+    digest = hashlib.sha256()
+    digest.update(f"v{ANALYTICS_VERSION}\n{graph_hash}\n".encode('utf-8'))
+    for chapter, edges in sorted((chapter_edges or {}).items()):
+        digest.update(f"{chapter}:{json.dumps(sorted(map(list, edges)))}\n".encode('utf-8'))
+    digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def analytics_params(betweenness: Optional[BetweennessConfig] = None,
+                     communities: Optional[CommunityConfig] = None, temporal_window: int = 3) -> Dict[str, Any]:
+    """The parameters results depend on (worker counts are excluded: they do not change results)."""
+    params: Dict[str, Any] = {"temporal_window": temporal_window}
+    params["betweenness"] = {k: v for k, v in asdict(betweenness or BetweennessConfig()).items() if k != "workers"}
+    if communities is not None:
+        params["communities"] = {k: v for k, v in asdict(communities).items() if k != "workers"}
+    return params
+
+
+def _ranked(scores: Dict[str, float]) -> List[list]:
+    # Ties broken by name, so the ranking does not depend on node insertion order
+    return [[char, float(score)] for char, score in sorted(scores.items(), key=lambda item: (-item[1], item[0]))]
+
+
+def chapter_rankings(chapter_edges: ChapterEdges,
+                     network: Optional[TemporalNetwork] = None) -> List[list]:
+    """[chapter index, [[character, degree centrality], ...]] for every chapter with interactions."""
+    network = network or TemporalNetwork.from_chapter_edges(chapter_edges)
+    n = len(network.characters)
+    rankings = []
+    for position, chapter_idx in enumerate(sorted(chapter_edges)):
+        if not chapter_edges[chapter_idx]:
+            continue
+        degree, _ = degree_and_strength(n, network.pair_u, network.pair_v, network.chapter(position))
+        scores = normalized_degree(degree)
+        active = np.flatnonzero(degree)
+        ranked = active[np.argsort(-scores[active], kind='stable')]
+        rankings.append([chapter_idx, [[network.characters[i], float(scores[i])] for i in ranked]])
+    return rankings
+
+
+def compute_analytics(graph: nx.Graph, chapter_edges: Optional[ChapterEdges] = None,
+                      betweenness: Optional[BetweennessConfig] = None,
+                      communities: Optional[CommunityResult] = None, temporal_window: int = 3,
+                      params: Optional[Dict[str, Any]] = None, weight: str = 'weight') -> AnalyticsArtifact:
+    """Compute every analytic the reports use for `graph` (and its chapters, if given)."""
+    graph_hash = graph_content_hash(graph, weight=weight)
+    params = params if params is not None else analytics_params(betweenness, temporal_window=temporal_window)
+
+    relationships = sorted(([*sorted((u, v)), int(data.get(weight, 1))] for u, v, data in graph.edges(data=True)),
+                           key=lambda item: (-item[2], item[0], item[1]))
+    centralities: Dict[str, List[list]] = {}
+    betweenness_description = ""
+    if graph.number_of_nodes():
+        try:
+            eigenvector = nx.eigenvector_centrality(graph, weight=weight, max_iter=1000)
+        except nx.PowerIterationFailedConvergence:
+            eigenvector = {}
+        betweenness_result = betweenness_centrality(graph, betweenness, weight=weight)
+        betweenness_description = betweenness_result.describe()
+        centralities = {
+            "Degree Centrality": _ranked(nx.degree_centrality(graph)),
+            "Betweenness Centrality": _ranked(betweenness_result.scores),
+            "Eigenvector Centrality": _ranked(eigenvector),
+        }
+
+    chapters: List[list] = []
+    temporal: Dict[str, List[list]] = {}
+    if chapter_edges:
+        network = TemporalNetwork.from_chapter_edges(chapter_edges)
+        chapters = chapter_rankings(chapter_edges, network)
+        temporal = {
+            "cumulative": network.series_rows(mode="cumulative"),
+            "window": network.series_rows(mode="window", window=temporal_window),
+        }
+
+    return AnalyticsArtifact(
+        key=analytics_key(graph_hash, chapter_edges, params),
+        graph_hash=graph_hash,
+        params=params,
+        num_nodes=graph.number_of_nodes(),
+        num_edges=graph.number_of_edges(),
+        relationships=relationships,
+        strength={node: float(value) for node, value in graph.degree(weight=weight)},
+        centralities=centralities,
+        betweenness=betweenness_description,
+        chapters=chapters,
+        temporal=temporal,
+        communities=asdict(communities) if communities else None,
+    )
+
+
+def load_or_compute_analytics(graph: nx.Graph, chapter_edges: Optional[ChapterEdges], cache_dir: Optional[Path],
+                              betweenness: Optional[BetweennessConfig] = None,
+                              community_config: Optional[CommunityConfig] = None,
+                              communities: Optional[CommunityResult] = None,
+                              temporal_window: int = 3) -> AnalyticsArtifact:
+    """The cached artifact for this graph and parameters, computing and storing it on a miss."""
+    params = analytics_params(betweenness, community_config if communities else None, temporal_window)
+    key = analytics_key(graph_content_hash(graph), chapter_edges, params)
+    path = cache_dir / f"{key}.json" if cache_dir else None
+
+    if path is not None and path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return AnalyticsArtifact(**json.load(f))
+        except (json.JSONDecodeError, TypeError):
+            pass  # Unreadable or from an older layout: recompute below
+
+    artifact = compute_analytics(graph, chapter_edges, betweenness, communities, temporal_window, params)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(artifact), f)
+        tmp_path.replace(path)
+    return artifact
+
+
+# --- Renderers ---
+
+def render_overview(artifact: AnalyticsArtifact, top_n: int = 10) -> str:
+    """Network size, heaviest relationships and centrality rankings."""
+    if not artifact.num_nodes: return "Graph is empty. No analysis can be performed."
+    report_lines = ["--- Character Network Analysis Report ---\n"]
+    report_lines.append(f"Total Characters (Nodes): {artifact.num_nodes}")
+    report_lines.append(f"Total Unique Relationships (Edges): {artifact.num_edges}")
+    report_lines.append(f"\n--- Top {top_n} Relationships by Interaction Count ---")
+    for char1, char2, weight in artifact.relationships[:top_n]:
+        report_lines.append(f"  {weight:<5} | {char1} -- {char2}")
+    for name, ranking in artifact.centralities.items():
+        report_lines.append(f"\n--- Top {top_n} Characters by {name} ---")
+        if name == "Betweenness Centrality" and artifact.betweenness:
+            report_lines.append(f"  ({artifact.betweenness})")
+        for char, score in ranking[:top_n]:
+            report_lines.append(f"  {char:<30} | Score: {score:.4f}")
+    return "\n".join(report_lines)
+
+
+def render_communities(artifact: AnalyticsArtifact, max_members: int = 10) -> str:
+    """Each consensus community with its most connected members."""
+    return render_community_members(artifact.community_result(), artifact.strength, max_members)
+
+
+def render_community_members(communities: Optional[CommunityResult], strength: Dict[str, float],
+                             max_members: int = 10) -> str:
+    """`render_communities` from a partition and per-character interaction counts."""
+    if communities is None:
+        return ""
+    report_lines = [f"\n--- Communities ({communities.describe()}) ---"]
+    for community, members in communities.members().items():
+        ranked = sorted(members, key=lambda char: (-strength.get(char, 0), char))
+        shown = ", ".join(ranked[:max_members])
+        more = f" (+{len(ranked) - max_members} more)" if len(ranked) > max_members else ""
+        report_lines.append(f"  Community {community} [{len(members)}]: {shown}{more}")
+    return "\n".join(report_lines)
+
+
+def render_chapters(artifact: AnalyticsArtifact, top_n: int = 5) -> str:
+    """The most connected characters of each chapter."""
+    return render_chapter_rankings(artifact.chapters, top_n)
+
+
+def render_chapter_rankings(chapters: List[list], top_n: int = 5) -> str:
+    """`render_chapters` from `chapter_rankings` output."""
+    report_lines = [f"\n--- Top {top_n} Most Important Characters by Chapter ---"]
+    for chapter_idx, ranking in chapters:
+        report_lines.append(f"\nChapter {chapter_idx + 1}:")
+        for i, (char, score) in enumerate(ranking[:top_n]):
+            report_lines.append(f"  {i + 1}. {char:<30} (Score: {score:.4f})")
+    return "\n".join(report_lines)
+
+
+def render_text(artifact: AnalyticsArtifact, top_n: int = 10, chapter_top_n: int = 5) -> str:
+    """The complete `analysis_report.txt`."""
+    return (f"{render_overview(artifact, top_n)}\n{render_communities(artifact)}\n\n"
+            f"{render_chapters(artifact, chapter_top_n)}")
+
+
+def render_json(artifact: AnalyticsArtifact, top_n: int = 10, chapter_top_n: int = 5) -> Dict[str, Any]:
+    """The report as structured data, truncated like the text report."""
+    communities = artifact.community_result()
+    return {
+        "graph_hash": artifact.graph_hash,
+        "parameters": artifact.params,
+        "nodes": artifact.num_nodes,
+        "edges": artifact.num_edges,
+        "top_relationships": [{"characters": [char1, char2], "interactions": weight}
+                              for char1, char2, weight in artifact.relationships[:top_n]],
+        "centralities": {name: [{"character": char, "score": score} for char, score in ranking[:top_n]]
+                         for name, ranking in artifact.centralities.items()},
+        "betweenness_method": artifact.betweenness,
+        "communities": None if communities is None else {
+            "summary": communities.describe(),
+            "members": {str(community): members for community, members in communities.members().items()},
+        },
+        "chapters": [{"chapter": chapter_idx + 1,
+                      "top_characters": [{"character": char, "score": score} for char, score in ranking[:chapter_top_n]]}
+                     for chapter_idx, ranking in artifact.chapters],
+    }
+
+
+def write_centrality_csv(artifact: AnalyticsArtifact, output_path: Path):
+    """One row per character with every centrality, interaction count and community."""
+    scores = {name: dict(map(tuple, ranking)) for name, ranking in artifact.centralities.items()}
+    communities = artifact.community_result()
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["character", "interactions", "degree_centrality", "betweenness_centrality",
+                         "eigenvector_centrality", "community"])
+        for char in sorted(artifact.strength, key=lambda c: (-artifact.strength[c], c)):
+            writer.writerow([char, int(artifact.strength[char])] +
+                            [f"{scores.get(name, {}).get(char, 0.0):.6f}" for name in CENTRALITY_NAMES] +
+                            [communities.partition.get(char, "") if communities else ""])
+
+
+def write_reports(artifact: AnalyticsArtifact, report_dir: Path, formats: List[str] = ("text",),
+                  top_n: int = 10) -> List[Path]:
+    """Render the requested report formats plus the temporal series CSVs into `report_dir`."""
+    unknown = set(formats) - set(REPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown report format(s) {sorted(unknown)}. Use any of {REPORT_FORMATS}.")
+
+    written = []
+    if "text" in formats:
+        written.append(report_dir / "analysis_report.txt")
+        with open(written[-1], 'w', encoding='utf-8') as f:
+            f.write(render_text(artifact, top_n))
+    if "json" in formats:
+        written.append(report_dir / "analysis_report.json")
+        with open(written[-1], 'w', encoding='utf-8') as f:
+            json.dump(render_json(artifact, top_n), f, indent=2, ensure_ascii=False)
+    if "csv" in formats:
+        written.append(report_dir / "centralities.csv")
+        write_centrality_csv(artifact, written[-1])
+    for mode, rows in artifact.temporal.items():
+        written.append(report_dir / f"temporal_{mode}.csv")
+        write_series_csv(written[-1], rows)
+    return written
+
+
+def memoized_page_path(cache_dir: Path, report: str, artifact: AnalyticsArtifact, page: str,
+                       **render_params) -> Path:
+    """Where the `page` of `report`, rendered from this artifact with these parameters, is memoized."""
+    render_key = json.dumps({"renderer": RENDERER_VERSION, **render_params}, sort_keys=True)
+    suffix = hashlib.sha256(render_key.encode('utf-8')).hexdigest()[:12]
+    return cache_dir / "pages" / report / f"{page}_{artifact.key}_{suffix}.html"
+
+
+def prune_memoized_pages(page_path: Path) -> List[Path]:
+    """Delete the entries `page_path` supersedes: the same report's earlier pages of its type."""
+    page = page_path.name.split("_", 1)[0]
+    removed = []
+    # Pages memoized before entries were kept per report sit directly in pages/
+    for stale in [*page_path.parent.glob(f"{page}_*.html"), *page_path.parent.parent.glob("*.html")]:
+        if stale != page_path:
+            stale.unlink(missing_ok=True)
+            removed.append(stale)
+    return removed
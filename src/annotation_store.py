@@ -0,0 +1,153 @@
+"""
+Annotation Store Module - Concurrent, append-only storage for crowd annotations.
+
+`annotation_survey_app.py` used to rewrite a whole `annotator_<id>.json` for
+every submission, so the cost grew with each annotator's history and two
+sessions saving at once could overwrite each other. The store is one SQLite
+database in WAL mode (`crowd_annotations/annotations.db`):
+
+- every submission is a single INSERT, atomic on its own, and WAL lets any
+  number of sessions read while one writes (writers wait on a busy timeout
+  instead of failing);
+- progress queries use an (annotator, snippet) index instead of re-reading files;
+- row ids only ever grow, so consumers can read "everything after row N"
+  (see `iter_records`).
+
+Records keep the JSON shape the app always wrote
+(`annotator_id`, `timestamp`, `snippet_id`, `source`, `interactions`), so
+existing readers such as `crowd_label_matrix` are unchanged.
+`import_json_files` loads the legacy per-annotator files; it is idempotent.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+STORE_FILENAME = "annotations.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS annotations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,   -- Append order; never reused
+    annotator_id TEXT NOT NULL,
+    snippet_id TEXT NOT NULL,
+    source TEXT,
+    timestamp TEXT NOT NULL,
+    record TEXT NOT NULL,                   -- The full submission as JSON
+    UNIQUE (annotator_id, snippet_id, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_annotations_annotator ON annotations (annotator_id, snippet_id);
+CREATE INDEX IF NOT EXISTS idx_annotations_snippet ON annotations (snippet_id, annotator_id);
+"""
+
+INSERT = ("INSERT OR IGNORE INTO annotations (annotator_id, snippet_id, source, timestamp, record) "
+          "VALUES (?, ?, ?, ?, ?)")
+
+
+def store_path(annotations_dir: Path) -> Path:
+    return Path(annotations_dir) / STORE_FILENAME
+
+
+def _row(record: Dict[str, Any]) -> Tuple[str, str, Any, str, str]:
+    return (str(record['annotator_id']), str(record['snippet_id']), record.get('source'),
+            str(record['timestamp']), json.dumps(record, ensure_ascii=False))
+
+
+class AnnotationStore:
+    """
+    Thread-safe handle on the annotation database.
+
+    Each thread (a Streamlit session runs in its own) gets its own
+    connection, so one store object can be shared, e.g. via `st.cache_resource`.
+    """
+
+    def __init__(self, path: Path, busy_timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit: each statement is its own transaction unless one is opened explicitly
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # --- Writes ---
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Store one submission; returns its row id (0 if an identical one was already stored)."""
+        cursor = self._connection().execute(INSERT, _row(record))
+        return cursor.lastrowid if cursor.rowcount else 0
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Store many submissions in one transaction; returns how many were new."""
+        connection = self._connection()
+        before = connection.total_changes
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(INSERT, (_row(record) for record in records))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return connection.total_changes - before
+
+    def import_json_files(self, annotations_dir: Path) -> Tuple[int, int]:
+        """
+        Import every legacy `annotator_<id>.json`. Submissions already in the
+        store are skipped, so importing twice is harmless.
+        Returns (files read, submissions added).
+        """
+        files = sorted(Path(annotations_dir).glob("annotator_*.json"))
+        records: List[Dict[str, Any]] = []
+        for file_path in files:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                records.extend(json.load(f))
+        return len(files), self.append_many(records) if records else 0
+
+    # --- Reads ---
+
+    def progress(self, annotator_id: str) -> Dict[str, Any]:
+        """Submissions of one annotator, in the shape the app has always used."""
+        rows = self._connection().execute(
+            "SELECT snippet_id FROM annotations WHERE annotator_id = ? ORDER BY id", (annotator_id,)).fetchall()
+        return {'completed': len(rows), 'snippet_ids': [snippet_id for snippet_id, in rows]}
+
+    def completed_snippets(self, annotator_id: str) -> Set[str]:
+        rows = self._connection().execute(
+            "SELECT DISTINCT snippet_id FROM annotations WHERE annotator_id = ?", (annotator_id,))
+        return {snippet_id for snippet_id, in rows}
+
+    def last_id(self) -> int:
+        return self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM annotations").fetchone()[0]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM annotations").fetchone()[0]
+
+    def iter_records(self, after: int = 0, batch_size: int = 1000) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """(row id, submission) of every row after `after`, in append order, read in batches."""
+        connection = self._connection()
+        while True:
+            rows = connection.execute("SELECT id, record FROM annotations WHERE id > ? ORDER BY id LIMIT ?",
+                                      (after, batch_size)).fetchall()
+            for row_id, record in rows:
+                yield row_id, json.loads(record)
+            if len(rows) < batch_size:
+                return
+            after = rows[-1][0]
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [record for _, record in self.iter_records()]
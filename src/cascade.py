@@ -0,0 +1,213 @@
+"""
+Cascade Module - Two-tier extraction: a small model first, the large one for hard chunks.
+
+With `models.cascade_model` set, `run_llm_extraction.py` sends every chunk to
+that small, fast model and only escalates it to `models.llm_model` when the
+small model's answer looks unreliable:
+
+- request_failed:     the small model gave no answer;
+- invalid_output:     no parseable JSON, or interaction objects that failed validation;
+- unresolved_name:    an extracted character that `char_alias.json` does not know;
+- alias_disagreement: an extracted character that neither the alias scan of the
+                      chunk nor the active character buffer mentions.
+
+A chunk in which the alias scan finds more than `cascade_max_characters`
+characters goes to the large model directly ("crowded"), without a small call.
+With "crowded" left out of `cascade_escalate_on`, such a chunk goes to the
+small model like any other and the rule is only counted. The alias scan is
+`AliasMatcher` from the co-occurrence baseline.
+
+`CascadeStats` keeps per-tier calls, time and tokens, and per reason how many
+chunks it fired on, how often the large model's interactions then differed
+from the small one's, and how often the large call failed. A reason whose
+escalations rarely change anything can be dropped from `cascade_escalate_on`.
+The summary goes into the extraction's telemetry run file.
+"""
+
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from src.character_mapper import CharacterMapper
+from src.cooccurrence import AliasMatcher
+from src.llm_client import LLMClient
+from src.schemas import LLMInteractionOutput
+from src.telemetry import ChunkTelemetry
+
+ESCALATION_REASONS = ("request_failed", "invalid_output", "unresolved_name", "alias_disagreement", "crowded")
+TIERS = ("small", "large")
+
+
+@dataclass
+class CascadeConfig:
+    small_model: str
+    large_model: str
+    max_characters: Optional[int] = 4       # None: never route by character count
+    escalate_on: Sequence[str] = ESCALATION_REASONS
+
+    def __post_init__(self):
+        unknown = set(self.escalate_on) - set(ESCALATION_REASONS)
+        if unknown:
+            raise ValueError(f"Unknown cascade escalation reason(s) {sorted(unknown)}. "
+                             f"Use any of {ESCALATION_REASONS}.")
+
+
+@dataclass
+class TierStats:
+    requests: int = 0
+    final_chunks: int = 0                   # Chunks whose saved answer came from this tier
+    seconds: float = 0.0                    # HTTP time
+    prompt_tokens: int = 0
+    generated_tokens: int = 0
+    interactions: int = 0                   # In the answers that were kept
+
+
+@dataclass
+class ReasonStats:
+    fired: int = 0                          # Chunks the rule flagged (several rules can flag one chunk)
+    escalated: int = 0                      # Chunks escalated with this as the first reason
+    changed: int = 0                        # ...of which the large model's interactions differed
+    failed: int = 0                         # ...of which the large call failed (the small answer was kept)
+
+
+@dataclass
+class CascadeStats:
+    tiers: Dict[str, TierStats] = field(default_factory=lambda: {tier: TierStats() for tier in TIERS})
+    reasons: Dict[str, ReasonStats] = field(
+        default_factory=lambda: {reason: ReasonStats() for reason in ESCALATION_REASONS})
+    chunks: int = 0
+
+
+def _interaction_set(output: Optional[LLMInteractionOutput]) -> Set[Tuple[FrozenSet[str], str]]:
+    if output is None:
+        return set()
+    return {(frozenset((i.character_1, i.character_2)), i.interaction_type) for i in output.interactions}
+
+
+class CascadeExtractor:
+    """Drop-in for `LLMClient.generate` in the chunk loop; thread-safe for parallel chapters."""
+
+    def __init__(self, client: LLMClient, character_mapper: CharacterMapper, config: CascadeConfig):
+        self.client = client
+        self.character_mapper = character_mapper
+        self.config = config
+        self.matcher = AliasMatcher(character_mapper)
+        self.stats = CascadeStats()
+        self._lock = threading.Lock()
+
+    def scan(self, chunk_text: str) -> Set[str]:
+        """Canonical characters the alias scan finds in the chunk."""
+        ids = self.matcher.find_mentions(chunk_text)[2]
+        return {self.matcher.characters[i] for i in set(ids.tolist())}
+
+    def escalation_reasons(self, output: Optional[LLMInteractionOutput], telemetry: ChunkTelemetry,
+                           scanned: Set[str], active_characters: Sequence[str]) -> List[str]:
+        """Every rule the small model's answer trips, in `ESCALATION_REASONS` order."""
+        if telemetry.status == "request_failed":
+            return ["request_failed"]
+        if output is None:
+            return ["invalid_output"]
+        reasons = ["invalid_output"] if telemetry.invalid_interactions else []
+        names = {name for i in output.interactions for name in (i.character_1, i.character_2)}
+        resolved = {self.character_mapper.get_canonical_name(name) for name in names}
+        if None in resolved:
+            reasons.append("unresolved_name")
+        known = scanned | {self.character_mapper.get_canonical_name(name) for name in active_characters}
+        if resolved - known - {None}:
+            reasons.append("alias_disagreement")
+        return reasons
+
+    def _record(self, tier: str, telemetry: ChunkTelemetry):
+        stats = self.stats.tiers[tier]
+        stats.requests += 1
+        stats.seconds += telemetry.http_seconds
+        stats.prompt_tokens += telemetry.prompt_eval_count
+        stats.generated_tokens += telemetry.eval_count
+
+    def generate(self, chunk_text: str, prompt: str, active_characters: Sequence[str],
+                 queued_at: Optional[float] = None) -> Tuple[Optional[LLMInteractionOutput], ChunkTelemetry]:
+        """The chunk's interactions and the telemetry of the call that produced them."""
+        scanned = self.scan(chunk_text)
+        crowded = self.config.max_characters is not None and len(scanned) > self.config.max_characters
+        small_output, small_telemetry = None, None
+        if crowded and "crowded" in self.config.escalate_on:
+            fired = ["crowded"]
+        else:
+            # Not escalated on, a crowded chunk still needs an answer: the small model's
+            small_output, small_telemetry = self.client.generate(self.config.small_model, prompt, queued_at=queued_at)
+            fired = self.escalation_reasons(small_output, small_telemetry, scanned, active_characters)
+            fired += ["crowded"] if crowded else []
+        escalate_on = [reason for reason in fired if reason in self.config.escalate_on]
+
+        large_output, large_telemetry = None, None
+        if escalate_on:
+            large_output, large_telemetry = self.client.generate(self.config.large_model, prompt, queued_at=queued_at)
+
+        # A failed escalation falls back to whatever the small model produced
+        use_large = large_telemetry is not None and (large_telemetry.status == "ok" or small_telemetry is None)
+        output, telemetry = (large_output, large_telemetry) if use_large else (small_output, small_telemetry)
+        if small_telemetry is not None and telemetry is large_telemetry:
+            telemetry.queue_seconds = small_telemetry.queue_seconds
+            telemetry.http_seconds += small_telemetry.http_seconds
+        telemetry.escalation = ",".join(escalate_on)
+
+        with self._lock:
+            self.stats.chunks += 1
+            if small_telemetry is not None:
+                self._record("small", small_telemetry)
+            if large_telemetry is not None:
+                self._record("large", large_telemetry)
+            for reason in fired:
+                self.stats.reasons[reason].fired += 1
+            if escalate_on:
+                first = self.stats.reasons[escalate_on[0]]
+                first.escalated += 1
+                if large_telemetry.status != "ok":
+                    # No large answer to compare with; counting it as changed would inflate the rule
+                    first.failed += 1
+                elif small_telemetry is not None and _interaction_set(small_output) != _interaction_set(large_output):
+                    first.changed += 1
+            final = self.stats.tiers["large" if use_large else "small"]
+            final.final_chunks += 1
+            final.interactions += len(output.interactions) if output else 0
+        return output, telemetry
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            chunks = self.stats.chunks
+            escalated = sum(reason.escalated for reason in self.stats.reasons.values())
+            return {
+                'small_model': self.config.small_model,
+                'large_model': self.config.large_model,
+                'max_characters': self.config.max_characters,
+                'escalate_on': list(self.config.escalate_on),
+                'chunks': chunks,
+                'escalated': escalated,
+                'escalation_rate': round(escalated / chunks, 4) if chunks else None,
+                'tiers': {tier: asdict(stats) for tier, stats in self.stats.tiers.items()},
+                'reasons': {reason: asdict(stats) for reason, stats in self.stats.reasons.items()},
+            }
+
+
+def generate_cascade_report(summary: Dict[str, Any]) -> str:
+    rate = summary['escalation_rate']
+    lines = [
+        "=" * 60,
+        f"CASCADE: {summary['small_model']} -> {summary['large_model']}",
+        "=" * 60,
+        f"Chunks:                {summary['chunks']}, {summary['escalated']} escalated "
+        f"({'n/a' if rate is None else f'{rate:.1%}'})",
+        "",
+        f"{'Tier':<8} {'Requests':>8} {'Kept':>6} {'HTTP s':>9} {'s/request':>9} {'Gen tokens':>10} {'Interactions':>12}",
+    ]
+    for tier, stats in summary['tiers'].items():
+        per_request = f"{stats['seconds'] / stats['requests']:.2f}" if stats['requests'] else "n/a"
+        lines.append(f"{tier:<8} {stats['requests']:>8} {stats['final_chunks']:>6} {stats['seconds']:>9.1f} "
+                     f"{per_request:>9} {stats['generated_tokens']:>10,} {stats['interactions']:>12}")
+    lines += ["", f"{'Reason':<20} {'Fired':>6} {'Escalated':>9} {'Changed':>8} {'Failed':>7}  "
+                  f"(changed: large model's interactions differed; failed: large call failed)"]
+    for reason, stats in summary['reasons'].items():
+        marker = "" if reason in summary['escalate_on'] else "  (not escalated)"
+        lines.append(f"{reason:<20} {stats['fired']:>6} {stats['escalated']:>9} {stats['changed']:>8} "
+                     f"{stats.get('failed', 0):>7}{marker}")
+    return "\n".join(lines)
@@ -0,0 +1,288 @@
+"""
+Communities Module - Cached multi-seed community detection with a consensus partition.
+
+Louvain (and Leiden) partitions depend on the random node order, so a single
+run makes the colours and groupings in the reports change from run to run.
+This module runs the algorithm with several seeds, picks the consensus
+partition (the run that agrees best with all the others, by adjusted Rand
+index) and reports the mean pairwise agreement as a stability score.
+
+Results are cached on disk keyed by a hash of the graph's content and the
+detection parameters, and `detect_communities_batch` evaluates every
+(graph, seed) pair of many graphs - all books and their chapter windows -
+in one process pool.
+"""
+
+import csv
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from src.graph_builder import ChapterEdges
+from src.temporal_network import TemporalNetwork
+from src.utils import graph_content_hash
+
+ALGORITHMS = ("louvain", "leiden")
+
+# Edge list shipped to pool workers: (u, v, weight)
+_EdgeList = List[Tuple[str, str, float]]
+
+
+@dataclass
+class CommunityConfig:
+    """How communities should be detected."""
+    algorithm: str = "louvain"   # "louvain" or "leiden" (needs the optional leidenalg/igraph packages)
+    seeds: int = 8               # Independent runs combined into the consensus
+    seed: int = 42               # First seed; runs use seed, seed + 1, ...
+    resolution: float = 1.0      # Modularity resolution (>1 favours smaller communities)
+    workers: int = 1             # >1 runs the seeds in a process pool
+
+
+@dataclass
+class CommunityResult:
+    """Consensus partition of one graph plus how stable it was across seeds."""
+    partition: Dict[str, int]    # Node -> community id (0 = largest community)
+    stability: float             # Mean pairwise adjusted Rand index between the seeded runs
+    modularity: float
+    algorithm: str
+    seeds: int
+    graph_hash: str
+
+    @property
+    def num_communities(self) -> int:
+        return len(set(self.partition.values()))
+
+    def members(self) -> Dict[int, List[str]]:
+        """Community id -> sorted member names."""
+        groups: Dict[int, List[str]] = {}
+        for node, community in sorted(self.partition.items()):
+            groups.setdefault(community, []).append(node)
+        return dict(sorted(groups.items()))
+
+    def describe(self) -> str:
+        """One-line summary suitable for a report header."""
+        return (f"{self.algorithm}, {self.num_communities} communities, {self.seeds} seeds, "
+                f"stability {self.stability:.3f}, modularity {self.modularity:.3f}")
+
+
+# --- Partition comparison ---
+
+def adjusted_rand_index(labels_a: np.ndarray, labels_b: np.ndarray) -> float:
+    """Adjusted Rand index of two labelings of the same nodes (1.0 = identical)."""
+    n = len(labels_a)
+    if n < 2:
+        return 1.0
+    _, a = np.unique(labels_a, return_inverse=True)
+    _, b = np.unique(labels_b, return_inverse=True)
+    contingency = np.zeros((a.max() + 1, b.max() + 1))
+    np.add.at(contingency, (a, b), 1)
+
+    def pairs(x):
+        return (x * (x - 1) / 2).sum()
+
+    index = pairs(contingency)
+    rows, cols = pairs(contingency.sum(axis=1)), pairs(contingency.sum(axis=0))
+    expected = rows * cols / pairs(np.array([n]))
+    maximum = (rows + cols) / 2
+    if maximum == expected:
+        return 1.0
+    return float((index - expected) / (maximum - expected))
+
+
+def consensus_partition(partitions: List[np.ndarray]) -> Tuple[int, float]:
+    """
+    Index of the run that agrees best with all the others, and the stability.
+
+    Stability is the mean adjusted Rand index over all pairs of runs.
+    """
+    k = len(partitions)
+    if k == 1:
+        return 0, 1.0
+    agreement = np.eye(k)
+    for i in range(k):
+        for j in range(i + 1, k):
+            agreement[i, j] = agreement[j, i] = adjusted_rand_index(partitions[i], partitions[j])
+    off_diagonal = (agreement.sum(axis=1) - 1) / (k - 1)
+    # argmax keeps the lowest seed on ties, so the choice is reproducible
+    return int(np.argmax(off_diagonal)), float(agreement[np.triu_indices(k, 1)].mean())
+
+
+def _canonical_labels(nodes: List[str], labels: np.ndarray) -> np.ndarray:
+    """Renumber communities by size (largest = 0), ties by their first member's name."""
+    order = sorted(set(labels.tolist()),
+                   key=lambda c: (-int((labels == c).sum()), min(nodes[i] for i in np.flatnonzero(labels == c))))
+    mapping = {community: rank for rank, community in enumerate(order)}
+    return np.array([mapping[c] for c in labels.tolist()], dtype=np.int64)
+
+
+# --- Single runs (executed in pool workers) ---
+
+def _run_seed(nodes: List[str], edges: _EdgeList, algorithm: str, seed: int, resolution: float) -> List[int]:
+    """Community label of every node in `nodes` for one seeded run."""
+    if algorithm == "louvain":
+        import community as community_louvain
+        G = nx.Graph()
+        G.add_nodes_from(nodes)
+        G.add_weighted_edges_from(edges)
+        partition = community_louvain.best_partition(G, weight='weight', resolution=resolution, random_state=seed)
+        return [partition[node] for node in nodes]
+
+    if algorithm == "leiden":
+        try:
+            import igraph as ig
+            import leidenalg
+        except ImportError as e:
+            raise ImportError("Leiden community detection needs the optional packages: "
+                              "uv sync --extra leiden") from e
+        index = {node: i for i, node in enumerate(nodes)}
+        g = ig.Graph(n=len(nodes), edges=[(index[u], index[v]) for u, v, _ in edges])
+        g.es['weight'] = [w for _, _, w in edges]
+        result = leidenalg.find_partition(g, leidenalg.RBConfigurationVertexPartition, weights='weight',
+                                          resolution_parameter=resolution, seed=seed)
+        return list(result.membership)
+
+    raise ValueError(f"Unknown community algorithm '{algorithm}'. Use one of {ALGORITHMS}.")
+
+
+def _graph_payload(G: nx.Graph, weight: str) -> Tuple[List[str], _EdgeList]:
+    nodes = sorted(G.nodes())
+    edges = [(u, v, float(data.get(weight, 1))) for u, v, data in G.edges(data=True)]
+    return nodes, edges
+
+
+def _combine_runs(G: nx.Graph, nodes: List[str], runs: List[List[int]], config: CommunityConfig,
+                  graph_hash: str, weight: str) -> CommunityResult:
+    partitions = [_canonical_labels(nodes, np.array(run)) for run in runs]
+    best, stability = consensus_partition(partitions)
+    partition = {node: int(label) for node, label in zip(nodes, partitions[best])}
+
+    groups: Dict[int, set] = {}
+    for node, community in partition.items():
+        groups.setdefault(community, set()).add(node)
+    modularity = nx.community.modularity(G, groups.values(), weight=weight) if G.number_of_edges() else 0.0
+
+    return CommunityResult(partition=partition, stability=stability, modularity=float(modularity),
+                           algorithm=config.algorithm, seeds=len(runs), graph_hash=graph_hash)
+
+
+# --- Cache ---
+
+def _cache_path(cache_dir: Path, graph_hash: str, config: CommunityConfig) -> Path:
+    return cache_dir / (f"{graph_hash[:24]}_{config.algorithm}_res{config.resolution:g}"
+                        f"_seeds{config.seeds}x{config.seed}.json")
+
+
+def _load_cached(path: Path) -> Optional[CommunityResult]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return CommunityResult(**json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError, TypeError):
+        return None
+
+
+def _save_cached(path: Path, result: CommunityResult):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(asdict(result), f)
+    tmp_path.replace(path)
+
+
+# --- Public API ---
+
+def detect_communities_batch(graphs: Dict[Hashable, nx.Graph], config: Optional[CommunityConfig] = None,
+                             cache_dir: Optional[Path] = None, executor: Optional[Executor] = None,
+                             weight: str = 'weight') -> Dict[Hashable, CommunityResult]:
+    """
+    Consensus communities for many graphs at once.
+
+    Cached graphs are read from `cache_dir`; every seeded run of the remaining
+    graphs is submitted to one pool (`executor`, or a new one when
+    `config.workers` > 1), so small chapter-window graphs do not each pay for
+    their own pool start-up. Identical graphs are computed once.
+    """
+    config = config or CommunityConfig()
+    if config.algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown community algorithm '{config.algorithm}'. Use one of {ALGORITHMS}.")
+
+    results: Dict[Hashable, CommunityResult] = {}
+    pending: Dict[str, List[Hashable]] = {}
+    for key, G in graphs.items():
+        graph_hash = graph_content_hash(G, weight=weight)
+        cached = _load_cached(_cache_path(cache_dir, graph_hash, config)) if cache_dir else None
+        if cached is not None:
+            results[key] = cached
+        elif G.number_of_nodes() == 0:
+            results[key] = CommunityResult({}, 1.0, 0.0, config.algorithm, 0, graph_hash)
+        else:
+            pending.setdefault(graph_hash, []).append(key)
+
+    if pending:
+        payloads = {graph_hash: _graph_payload(graphs[keys[0]], weight) for graph_hash, keys in pending.items()}
+        seeds = [config.seed + i for i in range(max(1, config.seeds))]
+        jobs = [(graph_hash, seed) for graph_hash in pending for seed in seeds]
+
+        owned_pool = None
+        if executor is None and config.workers > 1:
+            executor = owned_pool = ProcessPoolExecutor(max_workers=config.workers)
+        try:
+            if executor is None:
+                outputs = [_run_seed(*payloads[h], config.algorithm, seed, config.resolution) for h, seed in jobs]
+            else:
+                futures = [executor.submit(_run_seed, *payloads[h], config.algorithm, seed, config.resolution)
+                           for h, seed in jobs]
+                outputs = [future.result() for future in futures]
+        finally:
+            if owned_pool is not None:
+                owned_pool.shutdown()
+
+        for i, (graph_hash, keys) in enumerate(pending.items()):
+            runs = outputs[i * len(seeds):(i + 1) * len(seeds)]
+            result = _combine_runs(graphs[keys[0]], payloads[graph_hash][0], runs, config, graph_hash, weight)
+            if cache_dir:
+                _save_cached(_cache_path(cache_dir, graph_hash, config), result)
+            for key in keys:
+                results[key] = result
+
+    return {key: results[key] for key in graphs}
+
+
+def detect_communities(G: nx.Graph, config: Optional[CommunityConfig] = None, cache_dir: Optional[Path] = None,
+                       weight: str = 'weight') -> CommunityResult:
+    """Consensus communities of a single graph (see `detect_communities_batch`)."""
+    return detect_communities_batch({None: G}, config, cache_dir, weight=weight)[None]
+
+
+def community_graphs(name: str, graph: nx.Graph, chapter_edges: ChapterEdges,
+                     window: int = 3) -> Dict[Tuple[str, Optional[int]], nx.Graph]:
+    """
+    The graphs to partition for one book: the whole graph under (name, None)
+    and the sliding window ending at each chapter under (name, chapter).
+    """
+    graphs: Dict[Tuple[str, Optional[int]], nx.Graph] = {(name, None): graph}
+    if not chapter_edges:
+        return graphs
+    temporal = TemporalNetwork.from_chapter_edges(chapter_edges)
+    for chapter in range(temporal.num_chapters):
+        window_graph = nx.Graph()
+        for (char1, char2), weight in temporal.edge_weight_dict(temporal.window(chapter, window)).items():
+            window_graph.add_edge(char1, char2, weight=weight)
+        graphs[(name, chapter)] = window_graph
+    return graphs
+
+
+def export_window_communities(output_path: Path, results: Dict[Tuple[str, Optional[int]], CommunityResult]):
+    """Write one row per chapter window x character with its consensus community."""
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["chapter", "character", "community", "stability", "modularity"])
+        for (_, chapter), result in sorted(((key, r) for key, r in results.items() if key[1] is not None),
+                                           key=lambda item: item[0][1]):
+            for character, community in sorted(result.partition.items()):
+                writer.writerow([chapter + 1, character, community,
+                                 f"{result.stability:.4f}", f"{result.modularity:.4f}"])
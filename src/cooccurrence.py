@@ -0,0 +1,348 @@
+"""
+Co-occurrence Baseline - A character network from alias matching, without the LLM.
+
+Every alias in `char_alias.json` is matched in the book text with one
+trie-shaped regular expression, and two characters are linked each time they
+are mentioned in the same sentence, the same paragraph, or within a sliding
+window of words. Mentions are reduced to integer positions (sentence,
+paragraph or word index), so finding the co-occurring pairs of a chapter is
+a couple of `searchsorted` / `repeat` operations rather than a loop over
+windows, and the whole novel is processed in seconds.
+
+The graph has the same shape as `build_interaction_graph`'s (weights,
+per-chapter `details` of type "Co-occurrence", per-type layer counts), so it
+is saved, diffed and analysed like any extraction run. `compare_with_llm`
+reports where the LLM graph and the baseline disagree.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+
+from src.character_mapper import CharacterMapper
+from src.data_preprocessor import split_chapters
+from src.graph_builder import ChapterEdges, add_interaction, record_chapters
+from src.graph_diff import AlignedGraphs, diff_aligned
+
+UNITS = ("sentence", "paragraph", "window")
+COOCCURRENCE_TYPE = "Co-occurrence"
+MAX_EVIDENCE_CHARS = 300
+
+# Sentence ends, except after the honorifics that precede most names in the novel
+_SENTENCE_END = re.compile(r'(?<!\bMr)(?<!\bMrs)(?<!\bDr)(?<!\bSt)[.!?]+["\'”’)]*\s+')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_WORD = re.compile(r'\w+')
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """
+    Regex alternation of `words` shaped as a prefix trie.
+
+    Each text position only explores the branch of its first character (a flat
+    alternation of every alias is ~5x slower), and the greedy optional groups
+    prefer the longest alias ("Mr. Brooke" over "Brooke").
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if '' in node else body
+
+    return build(trie)
+
+
+class AliasMatcher:
+    """Finds character mentions in text, resolving every alias to its canonical character."""
+
+    def __init__(self, character_mapper: CharacterMapper, proper_names_only: bool = True):
+        self.alias_to_canonical = character_mapper.alias_to_canonical_map
+        self.characters = sorted(set(self.alias_to_canonical.values()))
+        self.character_index = {name: i for i, name in enumerate(self.characters)}
+        # Lower-case-only aliases ("uncle", "papa", "the banker") are ordinary words
+        # in narration; only count them when written as a name.
+        self.proper_names_only = proper_names_only
+        self.pattern = re.compile(r'(?<!\w)' + _trie_pattern(list(self.alias_to_canonical)) + r'(?!\w)',
+                                  re.IGNORECASE)
+
+    def find_mentions(self, text: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(start offsets, end offsets, character ids) of every mention, in text order."""
+        starts, ends, ids = [], [], []
+        for match in self.pattern.finditer(text):
+            mention = match.group()
+            if self.proper_names_only and mention.islower():
+                continue
+            starts.append(match.start())
+            ends.append(match.end())
+            ids.append(self.character_index[self.alias_to_canonical[mention.lower()]])
+        return (np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64),
+                np.array(ids, dtype=np.int64))
+
+
+def unit_positions(text: str, offsets: np.ndarray, unit: str) -> np.ndarray:
+    """
+    Position of each text offset in `unit`s: the index of its sentence or
+    paragraph, or of its word for the sliding window.
+    """
+    if unit == "sentence":
+        boundaries = [m.end() for m in _SENTENCE_END.finditer(text)]
+    elif unit == "paragraph":
+        boundaries = [m.end() for m in _PARAGRAPH_BREAK.finditer(text)]
+    elif unit == "window":
+        boundaries = [m.start() for m in _WORD.finditer(text)]
+    else:
+        raise ValueError(f"Unknown co-occurrence unit '{unit}'. Use one of {UNITS}.")
+    return np.searchsorted(np.array(boundaries, dtype=np.int64), offsets, side='right')
+
+
+def cooccurring_pairs(positions: np.ndarray, span: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index pairs (i, j), i < j, of the sorted `positions` that lie less than
+    `span` apart, generated without a Python loop over mentions.
+    """
+    n = len(positions)
+    ends = np.searchsorted(positions, positions + span, side='left')
+    partners = ends - np.arange(n) - 1
+    first = np.repeat(np.arange(n), partners)
+    block_starts = np.repeat(np.cumsum(partners) - partners, partners)
+    second = first + 1 + (np.arange(len(first)) - block_starts)
+    return first, second
+
+
+def chapter_cooccurrences(text: str, matcher: AliasMatcher, unit: str = "sentence",
+                          window: int = 50) -> List[Tuple[int, int, int, int]]:
+    """
+    (character id, character id, start, end) for every co-occurrence in `text`.
+
+    Sentence and paragraph units count each pair once per unit; the sliding
+    window counts every pair of mentions of different characters at most
+    `window` words apart. `start`/`end` delimit the text between the mentions.
+    """
+    starts, ends, ids = matcher.find_mentions(text)
+    if len(ids) < 2:
+        return []
+    positions = unit_positions(text, starts, unit)
+
+    if unit == "window":
+        span = window + 1
+    else:
+        # One mention per character per unit; sorting by (unit, character) keeps positions sorted
+        span = 1
+        _, keep = np.unique(positions * len(matcher.characters) + ids, return_index=True)
+        starts, ends, ids, positions = starts[keep], ends[keep], ids[keep], positions[keep]
+
+    first, second = cooccurring_pairs(positions, span)
+    distinct = ids[first] != ids[second]
+    first, second = first[distinct], second[distinct]
+    span_start = np.minimum(starts[first], starts[second])
+    span_end = np.maximum(ends[first], ends[second])
+    return list(zip(ids[first].tolist(), ids[second].tolist(), span_start.tolist(), span_end.tolist()))
+
+
+def _evidence(text: str, start: int, end: int) -> str:
+    snippet = " ".join(text[start:end].split())
+    if len(snippet) > MAX_EVIDENCE_CHARS:
+        half = MAX_EVIDENCE_CHARS // 2
+        snippet = f"{snippet[:half]} ... {snippet[-half:]}"
+    return snippet
+
+
+def build_cooccurrence_graph(book_texts: Sequence[str], matcher: AliasMatcher, unit: str = "sentence",
+                             window: int = 50) -> Tuple[nx.Graph, ChapterEdges]:
+    """
+    Co-occurrence graph and per-chapter edges of one or more books.
+
+    Mirrors `build_interaction_graph`: chapters are split like the extraction
+    run splits them and numbered continuously across books, and every
+    co-occurrence becomes one interaction detail on its edge.
+    """
+    if unit not in UNITS:
+        raise ValueError(f"Unknown co-occurrence unit '{unit}'. Use one of {UNITS}.")
+    G = nx.Graph()
+    chapter_edges: ChapterEdges = {}
+    chapter_offset = 0
+
+    for book_text in book_texts:
+        chapters = split_chapters(book_text)
+        for local_index, chapter_text in enumerate(chapters):
+            chapter_index = chapter_offset + local_index
+            edges = chapter_edges.setdefault(chapter_index, [])
+            for a, b, start, end in chapter_cooccurrences(chapter_text, matcher, unit, window):
+                char1, char2 = sorted((matcher.characters[a], matcher.characters[b]))
+                edges.append((char1, char2))
+                add_interaction(G, char1, char2, {
+                    "type": COOCCURRENCE_TYPE,
+                    "sentiment": "Neutral",
+                    "location": "Unknown",
+                    "evidence": _evidence(chapter_text, start, end),
+                    "chapter": chapter_index,
+                }, COOCCURRENCE_TYPE)
+        chapter_offset += len(chapters)
+
+    record_chapters(G, chapter_edges)
+    return G, chapter_edges
+
+
+# --- Comparison with an LLM extraction run ---
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    order = np.argsort(values, kind='stable')
+    _, first, counts = np.unique(values[order], return_index=True, return_counts=True)
+    ranks = np.empty(len(values))
+    ranks[order] = np.repeat(first + (counts - 1) / 2, counts)
+    return ranks
+
+
+def spearman_correlation(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation with tied values sharing their average rank."""
+    if len(a) < 2:
+        return 0.0
+    ra, rb = _average_ranks(a), _average_ranks(b)
+    if ra.std() == 0 or rb.std() == 0:
+        return 0.0
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+@dataclass
+class BaselineComparison:
+    """How an LLM graph differs from the co-occurrence baseline of the same text."""
+    llm: str
+    baseline: str
+    llm_edges: int
+    baseline_edges: int
+    shared_edges: int
+    precision: float             # Share of baseline pairs the LLM also links
+    recall: float                # Share of LLM pairs that are ever co-mentioned
+    weight_correlation: float    # Spearman over the union of pairs
+    centrality_correlation: float  # Spearman of PageRank over all characters
+    top_overlap: float           # Shared share of the top-N characters by PageRank
+    top_n: int
+    # Pairs the LLM links although they are never co-mentioned: signal from pronouns,
+    # descriptions and context that alias matching cannot see (or extraction errors)
+    llm_only: List[Tuple[str, str, float]] = field(default_factory=list)
+    # Co-mentioned pairs the LLM never saw interact
+    baseline_only: List[Tuple[str, str, float]] = field(default_factory=list)
+    # (u, v, LLM weight share, baseline weight share), largest LLM surplus first
+    llm_heavier: List[Tuple[str, str, float, float]] = field(default_factory=list)
+    # (character, LLM rank, baseline rank), biggest moves first
+    rank_changes: List[Tuple[str, int, int]] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "llm": self.llm,
+            "baseline": self.baseline,
+            "summary": {
+                "llm_edges": self.llm_edges,
+                "baseline_edges": self.baseline_edges,
+                "shared_edges": self.shared_edges,
+                "precision": self.precision,
+                "recall": self.recall,
+                "weight_correlation": self.weight_correlation,
+                "centrality_correlation": self.centrality_correlation,
+                f"top_{self.top_n}_overlap": self.top_overlap,
+            },
+            "llm_only": [{"characters": [u, v], "weight": w} for u, v, w in self.llm_only],
+            "baseline_only": [{"characters": [u, v], "weight": w} for u, v, w in self.baseline_only],
+            "llm_heavier": [{"characters": [u, v], "llm_share": a, "baseline_share": b}
+                            for u, v, a, b in self.llm_heavier],
+            "rank_changes": [{"character": c, "llm_rank": a, "baseline_rank": b} for c, a, b in self.rank_changes],
+        }
+
+    def generate_report(self, top_n: int = 10) -> str:
+        report_lines = [f"--- LLM Graph vs Co-occurrence Baseline: {self.llm} vs {self.baseline} ---\n"]
+        report_lines.append(f"Edges: LLM {self.llm_edges}, baseline {self.baseline_edges}, shared {self.shared_edges}")
+        report_lines.append(f"Recall of LLM edges by co-mention: {self.recall:.4f} | "
+                            f"Precision of co-mentions as interactions: {self.precision:.4f}")
+        report_lines.append(f"Edge weight correlation (Spearman): {self.weight_correlation:.4f}")
+        report_lines.append(f"PageRank correlation (Spearman): {self.centrality_correlation:.4f} | "
+                            f"Top-{self.top_n} overlap: {self.top_overlap:.2f}")
+
+        report_lines.append(f"\n--- Top {top_n} LLM Relationships Without Any Co-mention ---")
+        for u, v, w in self.llm_only[:top_n]:
+            report_lines.append(f"  {w:<5g} | {u} -- {v}")
+        report_lines.append(f"\n--- Top {top_n} Relationships the LLM Weighs Most Above Co-mention ---")
+        for u, v, a, b in self.llm_heavier[:top_n]:
+            report_lines.append(f"  {a:.4f} vs {b:.4f} | {u} -- {v}")
+        report_lines.append(f"\n--- Top {top_n} Co-mentioned Pairs the LLM Never Links ---")
+        for u, v, w in self.baseline_only[:top_n]:
+            report_lines.append(f"  {w:<5g} | {u} -- {v}")
+        report_lines.append(f"\n--- Top {top_n} PageRank Rank Differences ---")
+        for char, llm_rank, baseline_rank in self.rank_changes[:top_n]:
+            report_lines.append(f"  {char:<30} | LLM #{llm_rank:<3} baseline #{baseline_rank:<3}")
+        return "\n".join(report_lines)
+
+
+def compare_with_llm(llm_graph: nx.Graph, baseline_graph: nx.Graph, llm_name: str = "llm",
+                     baseline_name: str = "cooccurrence", top_n: int = 10) -> BaselineComparison:
+    """Compare an LLM graph with its co-occurrence baseline on aligned character pairs."""
+    aligned = AlignedGraphs.from_graphs({llm_name: llm_graph, baseline_name: baseline_graph})
+    diff = diff_aligned(aligned, [(0, 1)], metric="pagerank")[0]
+    llm_w, base_w = aligned.weights
+    llm_has, base_has = llm_w > 0, base_w > 0
+    shared = int((llm_has & base_has).sum())
+
+    llm_share = llm_w / llm_w.sum() if llm_w.sum() else llm_w
+    base_share = base_w / base_w.sum() if base_w.sum() else base_w
+    surplus = np.flatnonzero(llm_has & base_has & (llm_share > base_share))
+    surplus = surplus[np.argsort(-(llm_share[surplus] - base_share[surplus]), kind='stable')]
+
+    scores = aligned.centralities("pagerank")
+    both = np.flatnonzero(aligned.present.all(axis=0))
+    top_llm = set(np.argsort(-scores[0], kind='stable')[:top_n].tolist())
+    top_base = set(np.argsort(-scores[1], kind='stable')[:top_n].tolist())
+
+    return BaselineComparison(
+        llm=llm_name,
+        baseline=baseline_name,
+        llm_edges=int(llm_has.sum()),
+        baseline_edges=int(base_has.sum()),
+        shared_edges=shared,
+        precision=shared / int(base_has.sum()) if base_has.any() else 0.0,
+        recall=shared / int(llm_has.sum()) if llm_has.any() else 0.0,
+        weight_correlation=spearman_correlation(llm_w, base_w),
+        centrality_correlation=spearman_correlation(scores[0, both], scores[1, both]),
+        top_overlap=len(top_llm & top_base) / top_n if top_n else 0.0,
+        top_n=top_n,
+        llm_only=diff.removed,
+        baseline_only=diff.added,
+        llm_heavier=[(*aligned.pair_name(p), float(llm_share[p]), float(base_share[p])) for p in surplus],
+        rank_changes=[(char, rank_llm, rank_base) for char, rank_llm, rank_base, _, _ in diff.rank_changes],
+    )
+
+
+def save_comparison(comparison: BaselineComparison, output_dir: Path, top_n: int = 10) -> Tuple[Path, Path]:
+    """Write the comparison as `<baseline>_comparison.txt` and `.json`."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report_path = output_dir / f"{comparison.baseline}_comparison.txt"
+    json_path = output_dir / f"{comparison.baseline}_comparison.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(comparison.generate_report(top_n))
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(comparison.to_dict(), f, indent=2, ensure_ascii=False)
+    return report_path, json_path
+
+
+def baseline_name(book_name: str, unit: str) -> str:
+    """Artifact name of a baseline graph, e.g. 'book_1_cooccurrence_sentence'."""
+    return f"{book_name}_cooccurrence_{unit}"
+
+
+def load_book_texts(books_dir: Path, book_names: Sequence[str]) -> Dict[str, str]:
+    """Text of each named book (`<books_dir>/<name>.txt`)."""
+    texts = {}
+    for name in book_names:
+        with open(Path(books_dir) / f"{name}.txt", 'r', encoding='utf-8') as f:
+            texts[name] = f.read()
+    return texts
@@ -0,0 +1,273 @@
+"""
+Crowd Aggregation Module - Turns crowd submissions into gold annotation files, incrementally.
+
+`CrowdAggregator` reads the annotation store from a row-id watermark and
+keeps its state in a small SQLite database (`crowd_annotations/aggregation.db`):
+
+- one ballot per (snippet, annotator): the pairs they marked with type,
+  evidence and confidence. A later submission of the same snippet by the same
+  annotator replaces the earlier one, as in `crowd_label_matrix`;
+- per-snippet vote tallies: ballots and weight per snippet, and per
+  (snippet, pair, type).
+
+Consuming a submission only subtracts the replaced ballot and adds the new
+one, so each run reads the submissions made since the previous run and
+nothing else. Only the chapters those submissions touch are written again.
+
+A pair becomes a gold interaction when more than half of the snippet's
+ballots mark it (weighted by the annotator's confidence in "weighted" mode),
+and it takes the type with the most votes. Each file records the votes
+behind every interaction and the chapter's Krippendorff's alpha and Fleiss'
+kappa, in the format `load_gold_annotations` reads.
+
+Crowd gold only covers the annotated paragraphs, not whole chapters. The
+files are marked `partial` and list those `paragraphs`, and they go to their
+own directory (`data.crowd_gold_dir`). `load_gold_documents` returns the
+paragraphs as each chapter's scope, and `run_evaluation.py` then scores only
+the predictions quoted from them.
+"""
+
+import json
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.annotation_store import AnnotationStore
+from src.evaluation_metrics import NO_INTERACTION, DocumentKey, fleiss_kappa, krippendorff_alpha
+from src.snippet_queue import snippet_document, snippet_paragraph
+
+VOTE_MODES = ("majority", "weighted")
+STATE_FILENAME = "aggregation.db"
+DEFAULT_CONFIDENCE = 3                 # The app's confidence slider starts at 3 of 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS ballots (
+    snippet_id TEXT NOT NULL,
+    annotator_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    weight REAL NOT NULL,
+    labels TEXT NOT NULL,                   -- JSON [[character_1, character_2, type, evidence], ...]
+    PRIMARY KEY (snippet_id, annotator_id)
+);
+CREATE TABLE IF NOT EXISTS snippets (
+    snippet_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    chapter INTEGER NOT NULL,               -- 0-based, as in llm_results
+    ballots INTEGER NOT NULL,
+    weight REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snippets_document ON snippets (source, chapter);
+CREATE TABLE IF NOT EXISTS votes (
+    snippet_id TEXT NOT NULL,
+    character_1 TEXT NOT NULL,
+    character_2 TEXT NOT NULL,
+    interaction_type TEXT NOT NULL,
+    ballots INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    evidence TEXT NOT NULL,                 -- First evidence given for this label
+    PRIMARY KEY (snippet_id, character_1, character_2, interaction_type)
+);
+"""
+
+
+def state_path(annotations_dir: Path) -> Path:
+    return Path(annotations_dir) / STATE_FILENAME
+
+
+class CrowdAggregator:
+    """Vote tallies of every crowd-annotated snippet, updated from a watermark."""
+
+    def __init__(self, path: Path, name_resolver: Optional[Callable[[str], Optional[str]]] = None):
+        self.path = Path(path)
+        self.name_resolver = name_resolver
+        self.connection = sqlite3.connect(self.path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def watermark(self) -> int:
+        row = self.connection.execute("SELECT value FROM state WHERE key = 'watermark'").fetchone()
+        return row[0] if row else 0
+
+    def _name(self, mention: str) -> str:
+        return (self.name_resolver(mention) if self.name_resolver else None) or mention
+
+    def _ballot(self, record: Dict[str, Any]) -> Tuple[float, List[List[str]]]:
+        """(weight, [[character_1, character_2, type, evidence], ...]) of one submission."""
+        labels: Dict[Tuple[str, str], List[str]] = {}
+        confidences = []
+        for interaction in record.get('interactions', []):
+            interaction_type = interaction.get('interaction_type')
+            if interaction.get('type') == 'no_interaction' or not interaction.get('character_1') \
+                    or interaction_type in (None, "", NO_INTERACTION):
+                continue
+            pair = tuple(sorted((self._name(interaction['character_1']), self._name(interaction['character_2']))))
+            if pair[0] == pair[1] or pair in labels:
+                continue
+            labels[pair] = [*pair, interaction_type, interaction.get('evidence') or ""]
+            confidences.append(float(interaction.get('confidence') or DEFAULT_CONFIDENCE))
+        weight = (np.mean(confidences) if confidences else DEFAULT_CONFIDENCE) / 5
+        return float(weight), list(labels.values())
+
+    def _tally(self, snippet_id: str, weight: float, labels: List[List[str]], sign: int):
+        self.connection.execute("UPDATE snippets SET ballots = ballots + ?, weight = weight + ? WHERE snippet_id = ?",
+                                (sign, sign * weight, snippet_id))
+        for character_1, character_2, interaction_type, evidence in labels:
+            self.connection.execute(
+                "INSERT INTO votes VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (snippet_id, character_1, character_2, interaction_type) "
+                "DO UPDATE SET ballots = ballots + excluded.ballots, weight = weight + excluded.weight",
+                (snippet_id, character_1, character_2, interaction_type, sign, sign * weight, evidence))
+
+    def consume(self, store: AnnotationStore) -> Tuple[int, int, Set[DocumentKey]]:
+        """
+        Apply every submission after the watermark in one transaction.
+        Returns (submissions read, submissions without a known chapter, chapters touched).
+        """
+        read, unplaced, touched = 0, 0, set()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            watermark = self.watermark
+            for row_id, record in store.iter_records(after=watermark):
+                read += 1
+                watermark = row_id
+                snippet_id, annotator_id = str(record['snippet_id']), str(record['annotator_id'])
+                document = snippet_document(snippet_id)
+                if document is None:
+                    unplaced += 1
+                    continue
+
+                timestamp = str(record.get('timestamp', ''))
+                previous = self.connection.execute(
+                    "SELECT timestamp, weight, labels FROM ballots WHERE snippet_id = ? AND annotator_id = ?",
+                    (snippet_id, annotator_id)).fetchone()
+                if previous is not None and previous[0] > timestamp:
+                    continue                    # An older submission arriving late
+                self.connection.execute("INSERT OR IGNORE INTO snippets VALUES (?, ?, ?, 0, 0.0)",
+                                        (snippet_id, *document))
+                if previous is not None:
+                    self._tally(snippet_id, previous[1], json.loads(previous[2]), -1)
+
+                weight, labels = self._ballot(record)
+                self._tally(snippet_id, weight, labels, +1)
+                self.connection.execute("INSERT OR REPLACE INTO ballots VALUES (?, ?, ?, ?, ?)",
+                                        (snippet_id, annotator_id, timestamp, weight, json.dumps(labels)))
+                touched.add(document)
+            self.connection.execute("INSERT OR REPLACE INTO state VALUES ('watermark', ?)", (watermark,))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        return read, unplaced, touched
+
+    def documents(self) -> List[DocumentKey]:
+        return [tuple(row) for row in self.connection.execute(
+            "SELECT DISTINCT source, chapter FROM snippets ORDER BY source, chapter")]
+
+    def chapter_gold(self, document: DocumentKey, vote: str = "majority",
+                     min_annotators: int = 2) -> Optional[Dict[str, Any]]:
+        """
+        Gold file content for one (book, chapter), from the snippets with at
+        least `min_annotators` ballots; None if there are none yet.
+        """
+        if vote not in VOTE_MODES:
+            raise ValueError(f"Unknown vote '{vote}'. Use one of {VOTE_MODES}.")
+        column = 1 if vote == "majority" else 2
+        snippets = {row[0]: row for row in self.connection.execute(
+            "SELECT snippet_id, ballots, weight FROM snippets WHERE source = ? AND chapter = ? AND ballots >= ?",
+            (*document, min_annotators))}
+        if not snippets:
+            return None
+
+        # (snippet, pair) -> [(type, ballots, weight, evidence)]
+        labels: Dict[Tuple[str, str, str], List[Tuple[str, int, float, str]]] = {}
+        for snippet_id, character_1, character_2, interaction_type, ballots, weight, evidence in self.connection.execute(
+                "SELECT v.snippet_id, character_1, character_2, interaction_type, v.ballots, v.weight, evidence "
+                "FROM votes v JOIN snippets s ON s.snippet_id = v.snippet_id "
+                "WHERE s.source = ? AND s.chapter = ? AND s.ballots >= ? AND v.ballots > 0 "
+                "ORDER BY v.snippet_id, character_1, character_2, interaction_type", (*document, min_annotators)):
+            labels.setdefault((snippet_id, character_1, character_2), []).append(
+                (interaction_type, ballots, weight, evidence))
+
+        types = sorted({label[0] for votes in labels.values() for label in votes})
+        counts = np.zeros((len(labels), len(types) + 1))
+        interactions = []
+        for item, ((snippet_id, character_1, character_2), votes) in enumerate(labels.items()):
+            total = snippets[snippet_id][column]
+            marked = sum(label[column] for label in votes)
+            counts[item, 0] = snippets[snippet_id][1] - sum(label[1] for label in votes)
+            for label in votes:
+                counts[item, 1 + types.index(label[0])] = label[1]
+            if marked <= total / 2:
+                continue
+            # Types are in alphabetical order, so ties go to the first
+            interaction_type, ballots, weight, evidence = max(votes, key=lambda label: label[column])
+            interactions.append({
+                'character_1': character_1,
+                'character_2': character_2,
+                'interaction_type': interaction_type,
+                'evidence_snippet': evidence,
+                'snippet_id': snippet_id,
+                'votes': int(sum(label[1] for label in votes)),
+                'annotators': int(snippets[snippet_id][1]),
+                'support': round(marked / total, 4),
+                'type_agreement': round(ballots / sum(label[1] for label in votes), 4),
+            })
+
+        alpha = krippendorff_alpha(counts) if len(counts) else float('nan')
+        kappa = fleiss_kappa(counts) if len(counts) else float('nan')
+        annotators = self.connection.execute(
+            "SELECT COUNT(DISTINCT annotator_id) FROM ballots b JOIN snippets s ON s.snippet_id = b.snippet_id "
+            "WHERE s.source = ? AND s.chapter = ? AND s.ballots >= ?", (*document, min_annotators)).fetchone()[0]
+        pending = self.connection.execute(
+            "SELECT COUNT(*) FROM snippets WHERE source = ? AND chapter = ? AND ballots BETWEEN 1 AND ?",
+            (*document, min_annotators - 1)).fetchone()[0]
+        return {
+            '_metadata': {
+                'source': document[0],
+                'chapter': document[1] + 1,
+                'annotator': f"crowd_{vote}",
+                'annotation_date': date.today().isoformat(),
+                'partial': True,                # Gold for the annotated paragraphs only
+                'paragraphs': sorted(snippet_paragraph(snippet_id) for snippet_id in snippets),
+                'vote': vote,
+                'min_annotators': min_annotators,
+                'snippets': len(snippets),
+                'pending_snippets': pending,
+                'annotators': annotators,
+                'items': len(labels),
+                'krippendorff_alpha': None if np.isnan(alpha) else round(alpha, 4),
+                'fleiss_kappa': None if np.isnan(kappa) else round(kappa, 4),
+                'watermark': self.watermark,
+            },
+            'interactions': interactions,
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+def gold_file_path(output_dir: Path, document: DocumentKey) -> Path:
+    """`<book>_chapter_<NNN>_crowd.json` (1-based chapter), as `load_gold_documents` expects."""
+    return Path(output_dir) / f"{document[0]}_chapter_{document[1] + 1:03d}_crowd.json"
+
+
+def write_gold_files(aggregator: CrowdAggregator, documents: Set[DocumentKey], output_dir: Path,
+                     vote: str = "majority", min_annotators: int = 2) -> List[Path]:
+    """Rewrite the gold file of each given chapter that has enough annotations."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for document in sorted(documents):
+        gold = aggregator.chapter_gold(document, vote=vote, min_annotators=min_annotators)
+        if gold is None:
+            continue
+        path = gold_file_path(output_dir, document)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(gold, f, indent=2, ensure_ascii=False)
+        written.append(path)
+    return written
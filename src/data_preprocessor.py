@@ -4,6 +4,8 @@ from typing import Dict, List
 
 # No NLTK imports are needed here anymore. The main script will handle it.
 
+CHAPTER_PATTERN = re.compile(r'^\s*Chapter\s*\d+\s*', re.MULTILINE)
+
 def load_books(directory_path: str) -> Dict[str, str]:
     """Loads all .txt files from a directory into a dictionary."""
     book_texts = {}
@@ -15,3 +17,8 @@ def load_books(directory_path: str) -> Dict[str, str]:
         with open(file_path, 'r', encoding='utf-8') as f:
             book_texts[file_path.name] = f.read()
     return book_texts
+
+
+def split_chapters(book_text: str) -> List[str]:
+    """The chapters of one book, in order (chapter i is saved as `chapter_{i:03d}.json`)."""
+    return CHAPTER_PATTERN.split(book_text)[1:]
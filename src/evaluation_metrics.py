@@ -6,11 +6,16 @@ gold-standard annotations, computing inter-annotator agreement, and
 generating quality reports for research publication.
 """
 
-from typing import List, Dict, Set, Tuple, Optional, Any
+from typing import List, Dict, Set, Tuple, Optional, Any, Callable
 from dataclasses import dataclass, field
 from collections import defaultdict
+from pathlib import Path
+import csv
 import json
 import math
+import re
+
+import numpy as np
 
 
 @dataclass
@@ -50,6 +55,7 @@ class AgreementMetrics:
     cohens_kappa: float
     percent_agreement: float
     krippendorff_alpha: Optional[float] = None
+    fleiss_kappa: Optional[float] = None
     
     # Per-category agreement
     agreement_by_type: Dict[str, float] = field(default_factory=dict)
@@ -201,6 +207,297 @@ class InteractionEvaluator:
         return precision_by_type, recall_by_type, f1_by_type
 
 
+# --- Multi-annotator agreement ---
+
+NO_INTERACTION = "No Interaction"
+
+
+@dataclass
+class LabelMatrix:
+    """
+    Items x annotators matrix of category ids (-1 where an annotator did not
+    label the item). An item is a character pair, optionally within a snippet.
+    """
+    items: List[Tuple[str, str, str]]   # (snippet id, character 1, character 2)
+    annotators: List[str]
+    categories: List[str]
+    labels: np.ndarray
+
+    @property
+    def snippets(self) -> List[str]:
+        return sorted({snippet for snippet, _, _ in self.items})
+
+    def category_counts(self) -> np.ndarray:
+        """Items x categories: how many annotators chose each category for each item."""
+        n_items, n_categories = len(self.items), len(self.categories)
+        item_ids, _ = np.nonzero(self.labels >= 0)
+        keys = item_ids * n_categories + self.labels[self.labels >= 0]
+        return np.bincount(keys, minlength=n_items * n_categories).reshape(n_items, n_categories).astype(float)
+
+
+def _grouped_fleiss_kappa(counts: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Fleiss' kappa of each group of items (variable raters per item; items with < 2 raters are skipped)."""
+    raters = counts.sum(axis=1)
+    valid = raters >= 2
+    counts, raters, groups = counts[valid], raters[valid], groups[valid]
+    item_agreement = ((counts ** 2).sum(axis=1) - raters) / (raters * (raters - 1))
+    n_items = np.bincount(groups, minlength=n_groups)
+    observed = np.divide(np.bincount(groups, weights=item_agreement, minlength=n_groups), n_items,
+                         out=np.full(n_groups, np.nan), where=n_items > 0)
+
+    totals = np.zeros((n_groups, counts.shape[1]))
+    np.add.at(totals, groups, counts)
+    shares = np.divide(totals, totals.sum(axis=1, keepdims=True), out=np.zeros_like(totals),
+                       where=totals.sum(axis=1, keepdims=True) > 0)
+    expected = (shares ** 2).sum(axis=1)
+    # Everyone used a single category: perfect agreement, as in `compute_cohens_kappa`
+    return np.where(expected < 1, (observed - expected) / np.where(expected < 1, 1 - expected, 1), 1.0)
+
+
+def _grouped_krippendorff_alpha(counts: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Nominal Krippendorff's alpha of each group of items, from per-group coincidence matrices."""
+    pairable = counts.sum(axis=1)
+    valid = pairable >= 2
+    counts, pairable, groups = counts[valid], pairable[valid], groups[valid]
+    n_categories = counts.shape[1]
+    # Coincidences of one item: (n_c n_k - [c == k] n_c) / (m - 1)
+    coincidences = (np.einsum('ic,ik->ick', counts, counts) -
+                    counts[:, :, None] * np.eye(n_categories)[None]) / (pairable - 1)[:, None, None]
+    O = np.zeros((n_groups, n_categories, n_categories))
+    np.add.at(O, groups, coincidences)
+
+    n_c = O.sum(axis=2)
+    n = n_c.sum(axis=1)
+    disagreement = n - np.trace(O, axis1=1, axis2=2)
+    expected = np.divide(n ** 2 - (n_c ** 2).sum(axis=1), n - 1, out=np.zeros(n_groups), where=n > 1)
+    alpha = np.where(expected > 0, 1 - disagreement / np.where(expected > 0, expected, 1), 1.0)
+    return np.where(n > 1, alpha, np.nan)
+
+
+def fleiss_kappa(counts: np.ndarray) -> float:
+    """Fleiss' kappa from an items x categories count matrix."""
+    return float(_grouped_fleiss_kappa(counts, np.zeros(len(counts), dtype=np.int64), 1)[0])
+
+
+def krippendorff_alpha(counts: np.ndarray) -> float:
+    """Nominal Krippendorff's alpha from an items x categories count matrix (missing labels allowed)."""
+    return float(_grouped_krippendorff_alpha(counts, np.zeros(len(counts), dtype=np.int64), 1)[0])
+
+
+def category_kappas(counts: np.ndarray) -> np.ndarray:
+    """Fleiss' category-specific kappa: agreement on each category against all others."""
+    raters = counts.sum(axis=1)
+    valid = raters >= 2
+    counts, raters = counts[valid], raters[valid]
+    shares = counts.sum(axis=0) / max(counts.sum(), 1)
+    disagreement = (counts * (raters[:, None] - counts)).sum(axis=0)
+    expected = (raters * (raters - 1)).sum() * shares * (1 - shares)
+    return np.where(expected > 0, 1 - disagreement / np.where(expected > 0, expected, 1), np.nan)
+
+
+def pairwise_cohens_kappa(labels: np.ndarray, n_categories: int) -> np.ndarray:
+    """
+    Annotators x annotators Cohen's kappa, each pair over the items both labelled.
+
+    Computed with one-hot matrix products instead of a loop over pairs, so a
+    few hundred annotators take milliseconds. NaN where two annotators share
+    no item.
+    """
+    n_items, n_annotators = labels.shape
+    # float32 keeps items x annotators x categories small; counts stay exact far beyond any survey size
+    labelled = (labels >= 0).astype(np.float32)
+    one_hot = np.zeros((n_items, n_annotators, n_categories), dtype=np.float32)
+    rows, cols = np.nonzero(labels >= 0)
+    one_hot[rows, cols, labels[rows, cols]] = 1.0
+
+    shared = (labelled.T @ labelled).astype(float)                   # Items both labelled
+    by_annotator = one_hot.transpose(1, 0, 2).reshape(n_annotators, -1)
+    same = (by_annotator @ by_annotator.T).astype(float)             # Items given the same label
+    # Category marginals of annotator a restricted to the items b also labelled: (a, c, b)
+    marginals = (one_hot.reshape(n_items, -1).T @ labelled).astype(float)
+    marginals = marginals.reshape(n_annotators, n_categories, n_annotators)
+    chance = np.einsum('acb,bca->ab', marginals, marginals)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        observed = same / shared
+        expected = chance / shared ** 2
+        kappa = np.where(expected < 1, (observed - expected) / (1 - expected), 1.0)
+    return np.where(shared > 0, kappa, np.nan)
+
+
+def presence_cohens_kappa(presence: np.ndarray, yes_counts: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Annotators x annotators Cohen's kappa of binary "this pair interacts" decisions.
+
+    `presence` is annotators x candidate pairs; `yes_counts` overrides the number
+    of positive decisions per annotator used for the chance agreement.
+    """
+    total = presence.shape[1]
+    if total == 0:
+        return np.zeros((len(presence), len(presence)))
+    X = presence.astype(float)
+    p_observed = (X @ X.T + (1 - X) @ (1 - X).T) / total
+    p_yes = (X.sum(axis=1) if yes_counts is None else np.asarray(yes_counts, dtype=float)) / total
+    p_expected = np.outer(p_yes, p_yes) + np.outer(1 - p_yes, 1 - p_yes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(p_expected == 1, 1.0, (p_observed - p_expected) / (1 - p_expected))
+
+
+@dataclass
+class AgreementBreakdown:
+    """Multi-annotator agreement on a label matrix, overall and broken down."""
+    fleiss_kappa: float
+    krippendorff_alpha: float
+    mean_pairwise_kappa: float
+    items: int
+    annotators: int
+    by_type: Dict[str, Optional[float]] = field(default_factory=dict)   # Category-specific kappa
+    # Snippet -> {"items", "annotators", "fleiss_kappa", "krippendorff_alpha"}
+    by_snippet: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fleiss_kappa": _finite(self.fleiss_kappa),
+            "krippendorff_alpha": _finite(self.krippendorff_alpha),
+            "mean_pairwise_kappa": _finite(self.mean_pairwise_kappa),
+            "items": self.items,
+            "annotators": self.annotators,
+            "by_type": self.by_type,
+            "by_snippet": self.by_snippet,
+        }
+
+
+def _finite(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def compute_label_agreement(matrix: LabelMatrix) -> AgreementBreakdown:
+    """Fleiss' kappa, Krippendorff's alpha and pairwise Cohen's kappa, plus per-snippet and per-type views."""
+    counts = matrix.category_counts()
+    snippets = matrix.snippets
+    snippet_index = {snippet: s for s, snippet in enumerate(snippets)}
+    groups = np.array([snippet_index[snippet] for snippet, _, _ in matrix.items], dtype=np.int64)
+
+    snippet_kappa = _grouped_fleiss_kappa(counts, groups, len(snippets))
+    snippet_alpha = _grouped_krippendorff_alpha(counts, groups, len(snippets))
+    snippet_items = np.bincount(groups, minlength=len(snippets))
+    annotated = np.zeros((len(snippets), len(matrix.annotators)), dtype=bool)
+    np.logical_or.at(annotated, groups, matrix.labels >= 0)
+
+    kappas = pairwise_cohens_kappa(matrix.labels, len(matrix.categories))
+    upper = kappas[np.triu_indices(len(matrix.annotators), 1)]
+    upper = upper[~np.isnan(upper)]
+
+    return AgreementBreakdown(
+        fleiss_kappa=fleiss_kappa(counts),
+        krippendorff_alpha=krippendorff_alpha(counts),
+        mean_pairwise_kappa=float(upper.mean()) if len(upper) else float('nan'),
+        items=len(matrix.items),
+        annotators=len(matrix.annotators),
+        by_type={category: _finite(k) for category, k in zip(matrix.categories, category_kappas(counts))},
+        by_snippet={snippet: {"items": int(snippet_items[s]), "annotators": int(annotated[s].sum()),
+                              "fleiss_kappa": _finite(snippet_kappa[s]),
+                              "krippendorff_alpha": _finite(snippet_alpha[s])}
+                    for s, snippet in enumerate(snippets)},
+    )
+
+
+def crowd_label_matrix(records: List[Dict[str, Any]],
+                       name_resolver: Optional[Callable[[str], Optional[str]]] = None) -> LabelMatrix:
+    """
+    Label matrix of crowd annotations (`annotation_survey_app.py` records).
+
+    Items are the character pairs any annotator marked in a snippet. Every
+    annotator who submitted that snippet labels each of its items: with the
+    interaction type they gave the pair (the first one, if several), or
+    "No Interaction" if they did not mark it. A later submission of the same
+    snippet by the same annotator replaces the earlier one.
+    """
+    def name(mention: str) -> str:
+        return (name_resolver(mention) if name_resolver else None) or mention
+
+    latest: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for record in sorted(records, key=lambda r: r.get('timestamp', '')):
+        latest[(record['snippet_id'], record['annotator_id'])] = record.get('interactions', [])
+
+    snippet_labels: Dict[str, Dict[str, Dict[Tuple[str, str], str]]] = {}
+    for (snippet, annotator), interactions in latest.items():
+        pairs: Dict[Tuple[str, str], str] = {}
+        for interaction in interactions:
+            if interaction.get('type') == 'no_interaction' or not interaction.get('character_1'):
+                continue
+            pair = tuple(sorted((name(interaction['character_1']), name(interaction['character_2']))))
+            pairs.setdefault(pair, interaction.get('interaction_type') or NO_INTERACTION)
+        snippet_labels.setdefault(snippet, {})[annotator] = pairs
+
+    annotators = sorted({annotator for _, annotator in latest})
+    annotator_index = {annotator: a for a, annotator in enumerate(annotators)}
+    categories = [NO_INTERACTION] + sorted({label for by_annotator in snippet_labels.values()
+                                            for pairs in by_annotator.values()
+                                            for label in pairs.values()} - {NO_INTERACTION})
+    category_index = {category: c for c, category in enumerate(categories)}
+
+    items: List[Tuple[str, str, str]] = []
+    cells: List[Tuple[int, int, int]] = []
+    for snippet in sorted(snippet_labels):
+        by_annotator = snippet_labels[snippet]
+        for pair in sorted({pair for pairs in by_annotator.values() for pair in pairs}):
+            item = len(items)
+            items.append((snippet, *pair))
+            for annotator, pairs in by_annotator.items():
+                cells.append((item, annotator_index[annotator], category_index[pairs.get(pair, NO_INTERACTION)]))
+
+    labels = np.full((len(items), len(annotators)), -1, dtype=np.int64)
+    if cells:
+        item_ids, annotator_ids, category_ids = np.array(cells).T
+        labels[item_ids, annotator_ids] = category_ids
+    return LabelMatrix(items=items, annotators=annotators, categories=categories, labels=labels)
+
+
+def generate_agreement_report(breakdown: AgreementBreakdown, top_n: int = 10) -> str:
+    """Human-readable multi-annotator agreement report."""
+    def fmt(value: Optional[float]) -> str:
+        return "n/a" if value is None or np.isnan(value) else f"{value:.4f}"
+
+    lines = [
+        "=" * 60,
+        "INTER-ANNOTATOR AGREEMENT REPORT",
+        "=" * 60,
+        "",
+        f"  Annotators:           {breakdown.annotators}",
+        f"  Items (snippet x pair): {breakdown.items}",
+        f"  Fleiss' Kappa:        {fmt(breakdown.fleiss_kappa)}",
+        f"  Krippendorff's Alpha: {fmt(breakdown.krippendorff_alpha)}",
+        f"  Mean Cohen's Kappa:   {fmt(breakdown.mean_pairwise_kappa)}",
+        "",
+        "## Per-Type Agreement (category kappa)",
+    ]
+    for category, kappa in breakdown.by_type.items():
+        lines.append(f"  {category:<20} {fmt(kappa):>10}")
+    lines.extend(["", f"## {top_n} Least-Agreed Snippets",
+                  f"  {'Snippet':<24} {'Items':>6} {'Annotators':>11} {'Kappa':>8} {'Alpha':>8}"])
+    rated = [(s, v) for s, v in breakdown.by_snippet.items() if v["krippendorff_alpha"] is not None]
+    for snippet, values in sorted(rated, key=lambda item: (item[1]["krippendorff_alpha"], item[0]))[:top_n]:
+        lines.append(f"  {snippet:<24} {values['items']:>6} {values['annotators']:>11} "
+                     f"{fmt(values['fleiss_kappa']):>8} {fmt(values['krippendorff_alpha']):>8}")
+    lines.extend(["", "=" * 60])
+    return "\n".join(lines)
+
+
+def _presence_matrix(annotator_results: List[List[Dict[str, Any]]],
+                     all_possible_pairs: List[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Annotators x candidate pairs "interaction exists" matrix, and each annotator's number of pairs."""
+    pair_index = {pair: p for p, pair in enumerate(all_possible_pairs)}
+    presence = np.zeros((len(annotator_results), len(all_possible_pairs)), dtype=bool)
+    yes_counts = np.zeros(len(annotator_results))
+    for a, annotations in enumerate(annotator_results):
+        pairs = {normalize_interaction_flexible(ann) for ann in annotations}
+        yes_counts[a] = len(pairs)
+        columns = [pair_index[pair] for pair in pairs if pair in pair_index]
+        presence[a, columns] = True
+    return presence, yes_counts
+
+
 def compute_cohens_kappa(
     annotations_1: List[Dict[str, Any]],
     annotations_2: List[Dict[str, Any]],
@@ -217,35 +514,11 @@ def compute_cohens_kappa(
     Returns:
         Cohen's Kappa coefficient (-1 to 1, where 1 is perfect agreement)
     """
-    set_1 = {normalize_interaction_flexible(a) for a in annotations_1}
-    set_2 = {normalize_interaction_flexible(a) for a in annotations_2}
-    
-    # For each possible pair, both annotators make a binary decision (interaction exists or not)
-    agreements = 0
-    total = len(all_possible_pairs)
-    
-    if total == 0:
+    if not all_possible_pairs:
         return 0.0
-    
-    p_yes_1 = len(set_1) / total  # Proportion annotator 1 says "yes"
-    p_yes_2 = len(set_2) / total  # Proportion annotator 2 says "yes"
-    
-    for pair in all_possible_pairs:
-        in_1 = pair in set_1
-        in_2 = pair in set_2
-        if in_1 == in_2:
-            agreements += 1
-    
-    p_observed = agreements / total
-    
-    # Expected agreement by chance
-    p_expected = (p_yes_1 * p_yes_2) + ((1 - p_yes_1) * (1 - p_yes_2))
-    
-    if p_expected == 1:
-        return 1.0  # Perfect agreement
-    
-    kappa = (p_observed - p_expected) / (1 - p_expected)
-    return kappa
+    # For each possible pair, both annotators make a binary decision (interaction exists or not)
+    presence, yes_counts = _presence_matrix([annotations_1, annotations_2], all_possible_pairs)
+    return float(presence_cohens_kappa(presence, yes_counts)[0, 1])
 
 
 def compute_agreement_metrics(
@@ -260,25 +533,21 @@ def compute_agreement_metrics(
         all_possible_pairs: All character pairs that could be annotated
         
     Returns:
-        AgreementMetrics with kappa and percent agreement
+        AgreementMetrics with pairwise kappa, percent agreement, and Fleiss' kappa,
+        Krippendorff's alpha and per-type kappa over the interaction types
     """
     annotator_ids = list(annotator_results.keys())
     
     if len(annotator_ids) < 2:
         return AgreementMetrics(cohens_kappa=1.0, percent_agreement=1.0)
     
-    # Compute pairwise kappas and average
-    kappas = []
-    for i, ann1 in enumerate(annotator_ids):
-        for ann2 in annotator_ids[i+1:]:
-            kappa = compute_cohens_kappa(
-                annotator_results[ann1],
-                annotator_results[ann2],
-                all_possible_pairs
-            )
-            kappas.append(kappa)
-    
-    avg_kappa = sum(kappas) / len(kappas) if kappas else 0
+    # Every pairwise kappa at once, averaged over the upper triangle
+    if all_possible_pairs:
+        presence, yes_counts = _presence_matrix([annotator_results[a] for a in annotator_ids], all_possible_pairs)
+        kappas = presence_cohens_kappa(presence, yes_counts)
+        avg_kappa = float(kappas[np.triu_indices(len(annotator_ids), 1)].mean())
+    else:
+        avg_kappa = 0
     
     # Compute percent agreement (at least N-1 annotators agree)
     pair_counts = defaultdict(int)
@@ -291,29 +560,52 @@ def compute_agreement_metrics(
     agreements = sum(1 for count in pair_counts.values() if count >= n_annotators - 1)
     total_unique = len(pair_counts)
     percent_agreement = agreements / total_unique if total_unique > 0 else 1.0
+
+    # Type-level agreement: every annotator labels every candidate pair with a type or "No Interaction"
+    records = [{'snippet_id': '', 'annotator_id': annotator, 'interactions': annotator_results[annotator]}
+               for annotator in annotator_ids]
+    matrix = crowd_label_matrix(records, name_resolver=lambda mention: mention.lower().strip())
+    candidates = {tuple(sorted(c.lower().strip() for c in pair)) for pair in all_possible_pairs}
+    extra = sorted(candidates - {(c1, c2) for _, c1, c2 in matrix.items})
+    if extra:
+        matrix.items += [('', c1, c2) for c1, c2 in extra]
+        matrix.labels = np.vstack([matrix.labels, np.zeros((len(extra), n_annotators), dtype=np.int64)])
+    breakdown = compute_label_agreement(matrix)
     
     return AgreementMetrics(
         cohens_kappa=avg_kappa,
-        percent_agreement=percent_agreement
+        percent_agreement=percent_agreement,
+        krippendorff_alpha=breakdown.krippendorff_alpha,
+        fleiss_kappa=breakdown.fleiss_kappa,
+        agreement_by_type={t: k for t, k in breakdown.by_type.items() if k is not None}
     )
 
 
 def generate_evaluation_report(
     result: EvaluationResult,
-    agreement: Optional[AgreementMetrics] = None
+    agreement: Optional[AgreementMetrics] = None,
+    intervals: Optional[Dict[str, Tuple[float, float]]] = None
 ) -> str:
     """
     Generate a human-readable evaluation report.
+
+    `intervals` (metric -> (lower, upper), e.g. from `bootstrap_evaluation`)
+    are printed next to the overall point estimates.
     """
+    intervals = intervals or {}
+
+    def interval(metric: str) -> str:
+        return f"  [{intervals[metric][0]:.4f}, {intervals[metric][1]:.4f}]" if metric in intervals else ""
+
     lines = [
         "=" * 60,
         "INTERACTION EXTRACTION EVALUATION REPORT",
         "=" * 60,
         "",
         "## Overall Metrics",
-        f"  Precision:       {result.precision:.4f}",
-        f"  Recall:          {result.recall:.4f}",
-        f"  F1 Score:        {result.f1_score:.4f}",
+        f"  Precision:       {result.precision:.4f}{interval('precision')}",
+        f"  Recall:          {result.recall:.4f}{interval('recall')}",
+        f"  F1 Score:        {result.f1_score:.4f}{interval('f1_score')}",
         "",
         f"  True Positives:  {result.true_positives}",
         f"  False Positives: {result.false_positives}",
@@ -339,8 +631,14 @@ def generate_evaluation_report(
             "## Inter-Annotator Agreement",
             f"  Cohen's Kappa:     {agreement.cohens_kappa:.4f}",
             f"  Percent Agreement: {agreement.percent_agreement:.4f}",
-            "",
         ])
+        if agreement.fleiss_kappa is not None:
+            lines.append(f"  Fleiss' Kappa:     {agreement.fleiss_kappa:.4f}")
+        if agreement.krippendorff_alpha is not None:
+            lines.append(f"  Krippendorff's α:  {agreement.krippendorff_alpha:.4f}")
+        for itype, kappa in agreement.agreement_by_type.items():
+            lines.append(f"    {itype:<20} {kappa:>8.4f}")
+        lines.append("")
     
     if result.false_positive_examples:
         lines.extend([
@@ -363,6 +661,355 @@ def generate_evaluation_report(
     return "\n".join(lines)
 
 
+# --- Corpus-scale evaluation ---
+
+# (book, 0-based chapter index): the unit gold annotations and predictions are matched within
+DocumentKey = Tuple[str, int]
+EVALUATION_LEVELS = ("chapter", "book", "run")
+MATCH_MODES = ("strict", "flexible")
+
+
+def _prf(tp: np.ndarray, fp: np.ndarray, fn: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Element-wise precision, recall and F1 (0 where undefined, as in `InteractionEvaluator`)."""
+    tp, fp, fn = (np.asarray(x, dtype=float) for x in (tp, fp, fn))
+    precision = np.divide(tp, tp + fp, out=np.zeros_like(tp), where=(tp + fp) > 0)
+    recall = np.divide(tp, tp + fn, out=np.zeros_like(tp), where=(tp + fn) > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(tp), where=(precision + recall) > 0)
+    return precision, recall, f1
+
+
+class InteractionCodebook:
+    """
+    Interns character pairs and interaction types as integers shared by the
+    gold annotations and every run, so matching becomes integer set operations.
+
+    Names and types are normalised like `normalize_interaction`; an optional
+    `name_resolver` (e.g. `CharacterMapper.get_canonical_name`) maps aliases to
+    canonical names first, keeping the mention when it cannot be resolved.
+    """
+
+    def __init__(self, name_resolver: Optional[Callable[[str], Optional[str]]] = None):
+        self.name_resolver = name_resolver
+        self.pairs: Dict[Tuple[str, str], int] = {}
+        self.types: Dict[str, int] = {}
+
+    def _name(self, mention: Optional[str]) -> str:
+        mention = mention or ""
+        if self.name_resolver:
+            mention = self.name_resolver(mention) or mention
+        return mention.lower().strip()
+
+    def encode(self, interactions_by_document: Dict[DocumentKey, List[Dict[str, Any]]],
+               document_index: Dict[DocumentKey, int]) -> Dict[str, np.ndarray]:
+        """
+        Integer-coded arrays (document, pair, type, row) of every interaction in
+        an evaluated document; `row` is its position in the document's list.
+        """
+        columns: Dict[str, list] = {"document": [], "pair": [], "type": [], "row": []}
+        for key, interactions in interactions_by_document.items():
+            d = document_index.get(key)
+            if d is None:
+                continue
+            for row, interaction in enumerate(interactions):
+                chars = tuple(sorted((self._name(interaction.get('character_1')),
+                                      self._name(interaction.get('character_2')))))
+                itype = (interaction.get('interaction_type') or "").lower().strip()
+                columns["document"].append(d)
+                columns["pair"].append(self.pairs.setdefault(chars, len(self.pairs)))
+                columns["type"].append(self.types.setdefault(itype, len(self.types)))
+                columns["row"].append(row)
+        return {name: np.array(values, dtype=np.int64) for name, values in columns.items()}
+
+
+@dataclass
+class CorpusEvaluation:
+    """
+    Match counts of every run against the gold annotations.
+
+    Count arrays hold (true positives, false positives, false negatives) on
+    their first axis, then runs x documents (x types for `by_type`).
+    Documents are the (book, chapter) units that have gold annotations.
+    """
+    runs: List[str]
+    documents: List[DocumentKey]
+    types: List[str]
+    strict: np.ndarray                 # (3, runs, documents)
+    flexible: np.ndarray               # (3, runs, documents)
+    by_type: np.ndarray                # (3, runs, documents, types), strict matching
+    false_positive_examples: Dict[str, List[AnnotatedInteraction]] = field(default_factory=dict)
+    false_negative_examples: Dict[str, List[AnnotatedInteraction]] = field(default_factory=dict)
+
+    @property
+    def books(self) -> List[str]:
+        return sorted({book for book, _ in self.documents})
+
+    def _counts(self, level: str, mode: str) -> Tuple[List[tuple], np.ndarray]:
+        """Row labels and (3, rows) counts at one aggregation level."""
+        if mode in MATCH_MODES:
+            counts = self.strict if mode == "strict" else self.flexible
+        elif mode in self.types:
+            counts = self.by_type[..., self.types.index(mode)]
+        else:
+            raise ValueError(f"Unknown match mode '{mode}'. Use one of {MATCH_MODES} or an interaction type.")
+
+        if level == "chapter":
+            labels = [(run, book, chapter) for run in self.runs for book, chapter in self.documents]
+            return labels, counts.reshape(3, -1)
+        if level == "book":
+            books = self.books
+            book_of_document = np.array([books.index(book) for book, _ in self.documents], dtype=np.int64)
+            grouped = np.zeros((3, len(self.runs), len(books)))
+            np.add.at(grouped, (slice(None), slice(None), book_of_document), counts)
+            return [(run, book, None) for run in self.runs for book in books], grouped.reshape(3, -1)
+        if level == "run":
+            return [(run, None, None) for run in self.runs], counts.sum(axis=2)
+        raise ValueError(f"Unknown evaluation level '{level}'. Use one of {EVALUATION_LEVELS}.")
+
+    def scores(self, level: str = "run", mode: str = "strict") -> List[Dict[str, Any]]:
+        """Micro-averaged P/R/F1 per chapter, book or run (counts summed before dividing)."""
+        labels, (tp, fp, fn) = self._counts(level, mode)
+        precision, recall, f1 = _prf(tp, fp, fn)
+        return [{"run": run, "book": book, "chapter": chapter, "mode": mode,
+                 "precision": float(precision[i]), "recall": float(recall[i]), "f1_score": float(f1[i]),
+                 "true_positives": int(tp[i]), "false_positives": int(fp[i]), "false_negatives": int(fn[i])}
+                for i, (run, book, chapter) in enumerate(labels)]
+
+    def result_for_run(self, run: str) -> EvaluationResult:
+        """One run's corpus totals as an `EvaluationResult` (for `generate_evaluation_report`)."""
+        r = self.runs.index(run)
+        tp, fp, fn = self.strict[:, r].sum(axis=1)
+        precision, recall, f1 = _prf(tp, fp, fn)
+        type_tp, type_fp, type_fn = self.by_type[:, r].sum(axis=1)
+        type_p, type_r, type_f = _prf(type_tp, type_fp, type_fn)
+        observed = [t for t in range(len(self.types)) if type_tp[t] + type_fp[t] + type_fn[t] > 0]
+        return EvaluationResult(
+            precision=float(precision), recall=float(recall), f1_score=float(f1),
+            true_positives=int(tp), false_positives=int(fp), false_negatives=int(fn),
+            precision_by_type={self.types[t]: float(type_p[t]) for t in observed},
+            recall_by_type={self.types[t]: float(type_r[t]) for t in observed},
+            f1_by_type={self.types[t]: float(type_f[t]) for t in observed},
+            false_positive_examples=self.false_positive_examples.get(run, []),
+            false_negative_examples=self.false_negative_examples.get(run, []),
+        )
+
+
+def _example(interaction: Dict[str, Any], source: str) -> AnnotatedInteraction:
+    return AnnotatedInteraction(
+        character_1=interaction.get('character_1') or "",
+        character_2=interaction.get('character_2') or "",
+        interaction_type=interaction.get('interaction_type') or "",
+        evidence_snippet=interaction.get('evidence_snippet') or "",
+        annotation_source=source,
+    )
+
+
+def evaluate_corpus(
+    gold: Dict[DocumentKey, List[Dict[str, Any]]],
+    runs: Dict[str, Dict[DocumentKey, List[Dict[str, Any]]]],
+    name_resolver: Optional[Callable[[str], Optional[str]]] = None,
+    max_examples: int = 10
+) -> CorpusEvaluation:
+    """
+    Evaluate every run against every gold document in one pass.
+
+    Each interaction is encoded as one integer key
+    `((run * documents + document) * pairs + pair) * types + type`; matching
+    is a single `np.isin` over the unique keys of all runs, and per-chapter,
+    per-type and flexible (pair-only) counts are `np.bincount`s of the
+    matched keys. Predictions for chapters without gold annotations are
+    ignored. Duplicate interactions count once, as in `InteractionEvaluator`.
+    """
+    documents = sorted(gold)
+    document_index = {key: d for d, key in enumerate(documents)}
+    run_names = list(runs)
+    codebook = InteractionCodebook(name_resolver)
+    gold_codes = codebook.encode(gold, document_index)
+    run_codes = [codebook.encode(predictions, document_index) for predictions in runs.values()]
+
+    R, D = len(run_names), len(documents)
+    P, T = max(len(codebook.pairs), 1), max(len(codebook.types), 1)
+    run_ids = np.concatenate([np.full(len(codes["pair"]), r, dtype=np.int64) for r, codes in enumerate(run_codes)]
+                             or [np.zeros(0, dtype=np.int64)])
+    pred = {name: np.concatenate([codes[name] for codes in run_codes] or [np.zeros(0, dtype=np.int64)])
+            for name in ("document", "pair", "type", "row")}
+
+    # Gold is shared by every run: tile its keys once per run
+    gold_cells = (np.arange(R)[:, None] * D + gold_codes["document"][None, :]).ravel()
+    gold_pairs = np.tile(gold_codes["pair"], R)
+    gold_types = np.tile(gold_codes["type"], R)
+    pred_cells = run_ids * D + pred["document"]
+
+    # Strict: (cell, pair, type)
+    gold_strict = (gold_cells * P + gold_pairs) * T + gold_types
+    pred_strict = (pred_cells * P + pred["pair"]) * T + pred["type"]
+    gold_unique, gold_first = np.unique(gold_strict, return_index=True)
+    pred_unique, pred_first = np.unique(pred_strict, return_index=True)
+    hit = np.isin(pred_unique, gold_unique, assume_unique=True)
+    found = np.isin(gold_unique, pred_unique, assume_unique=True)
+
+    pred_cell_type = (pred_unique // (P * T)) * T + pred_unique % T
+    gold_cell_type = (gold_unique // (P * T)) * T + gold_unique % T
+    size = R * D * T
+    tp_type = np.bincount(pred_cell_type[hit], minlength=size)
+    fp_type = np.bincount(pred_cell_type[~hit], minlength=size)
+    fn_type = np.bincount(gold_cell_type[~found], minlength=size)
+    by_type = np.stack([tp_type, fp_type, fn_type]).reshape(3, R, D, T)
+
+    # Flexible: (cell, pair)
+    gold_flex = np.unique(gold_cells * P + gold_pairs)
+    pred_flex = np.unique(pred_cells * P + pred["pair"])
+    flex_hit = np.isin(pred_flex, gold_flex, assume_unique=True)
+    flex_found = np.isin(gold_flex, pred_flex, assume_unique=True)
+    flexible = np.stack([np.bincount(pred_flex[flex_hit] // P, minlength=R * D),
+                         np.bincount(pred_flex[~flex_hit] // P, minlength=R * D),
+                         np.bincount(gold_flex[~flex_found] // P, minlength=R * D)]).reshape(3, R, D)
+
+    # Error examples, in document order, from the first occurrence of each unmatched key
+    fp_rows, fn_rows = pred_first[~hit], gold_first[~found] % max(len(gold_codes["pair"]), 1)
+    fn_runs = gold_unique[~found] // (P * T) // D
+    false_positives: Dict[str, List[AnnotatedInteraction]] = {}
+    false_negatives: Dict[str, List[AnnotatedInteraction]] = {}
+    for r, (name, predictions) in enumerate(runs.items()):
+        rows = np.sort(fp_rows[run_ids[fp_rows] == r])[:max_examples]
+        false_positives[name] = [_example(predictions[documents[pred["document"][i]]][pred["row"][i]], "prediction")
+                                 for i in rows]
+        rows = np.sort(fn_rows[fn_runs == r])[:max_examples]
+        false_negatives[name] = [_example(gold[documents[gold_codes["document"][i]]][gold_codes["row"][i]], "gold")
+                                 for i in rows]
+
+    # Report types alphabetically rather than in order of first appearance
+    type_names = sorted(codebook.types, key=codebook.types.get) or [""]
+    order = sorted(range(len(type_names)), key=type_names.__getitem__)
+    return CorpusEvaluation(runs=run_names, documents=documents, types=[type_names[t] for t in order],
+                            strict=by_type.sum(axis=3), flexible=flexible, by_type=by_type[..., order],
+                            false_positive_examples=false_positives, false_negative_examples=false_negatives)
+
+
+# --- Bootstrap confidence intervals ---
+
+METRIC_NAMES = ("precision", "recall", "f1_score")
+BOOTSTRAP_UNITS = ("chapter", "book")
+
+
+@dataclass
+class PairedBootstrapTest:
+    """Difference `run_a - run_b` on one metric, over the same resampled units."""
+    run_a: str
+    run_b: str
+    metric: str
+    delta: float
+    lower: float
+    upper: float
+    p_value: float                     # Two-sided, from the null-centred bootstrap distribution
+
+
+@dataclass
+class BootstrapResult:
+    """Percentile confidence intervals of corpus P/R/F1 for every run."""
+    mode: str
+    unit: str
+    resamples: int
+    confidence: float
+    estimates: Dict[str, Dict[str, float]]                  # run -> metric -> point estimate
+    intervals: Dict[str, Dict[str, Tuple[float, float]]]    # run -> metric -> (lower, upper)
+    paired_tests: List[PairedBootstrapTest] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode, "unit": self.unit, "resamples": self.resamples, "confidence": self.confidence,
+            "runs": {run: {metric: {"estimate": self.estimates[run][metric],
+                                    "lower": self.intervals[run][metric][0],
+                                    "upper": self.intervals[run][metric][1]} for metric in METRIC_NAMES}
+                     for run in self.estimates},
+            "paired_tests": [vars(test) for test in self.paired_tests],
+        }
+
+
+def bootstrap_weights(n_units: int, resamples: int, seed: int = 42) -> np.ndarray:
+    """
+    (resamples, n_units) draw counts: row b says how often each unit appears
+    in resample b. Equivalent to drawing index arrays with replacement, but
+    the metrics of all resamples then come out of a single matrix product.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.multinomial(n_units, np.full(n_units, 1.0 / n_units), size=resamples).astype(float)
+
+
+def bootstrap_evaluation(
+    evaluation: CorpusEvaluation,
+    mode: str = "strict",
+    unit: str = "chapter",
+    resamples: int = 10000,
+    confidence: float = 0.95,
+    seed: int = 42,
+    paired_metric: str = "f1_score",
+) -> BootstrapResult:
+    """
+    Resample the gold chapters (or whole books) with replacement and recompute
+    micro-averaged P/R/F1 of every run on each resample.
+
+    All runs share the same resamples, so each pair of runs also gets a
+    paired test on `paired_metric`: the interval of the difference and a
+    two-sided p-value for "no difference".
+    """
+    if unit not in BOOTSTRAP_UNITS:
+        raise ValueError(f"Unknown bootstrap unit '{unit}'. Use one of {BOOTSTRAP_UNITS}.")
+    if paired_metric not in METRIC_NAMES:
+        raise ValueError(f"Unknown metric '{paired_metric}'. Use one of {METRIC_NAMES}.")
+    _, counts = evaluation._counts(unit, mode)
+    counts = counts.reshape(3, len(evaluation.runs), -1)          # (3, runs, units)
+    if counts.shape[2] < 2:
+        raise ValueError(f"The bootstrap needs at least two gold {unit}s; found {counts.shape[2]}.")
+
+    weights = bootstrap_weights(counts.shape[2], resamples, seed)  # (resamples, units)
+    tp, fp, fn = counts @ weights.T                                # Each (runs, resamples)
+    samples = dict(zip(METRIC_NAMES, _prf(tp, fp, fn)))
+    point = dict(zip(METRIC_NAMES, _prf(*counts.sum(axis=2))))
+
+    alpha = (1 - confidence) / 2
+    bounds = {metric: np.quantile(values, [alpha, 1 - alpha], axis=1) for metric, values in samples.items()}
+    estimates = {run: {metric: float(point[metric][r]) for metric in METRIC_NAMES}
+                 for r, run in enumerate(evaluation.runs)}
+    intervals = {run: {metric: (float(bounds[metric][0, r]), float(bounds[metric][1, r])) for metric in METRIC_NAMES}
+                 for r, run in enumerate(evaluation.runs)}
+
+    tests = []
+    values, observed = samples[paired_metric], point[paired_metric]
+    for a in range(len(evaluation.runs)):
+        for b in range(a + 1, len(evaluation.runs)):
+            delta = observed[a] - observed[b]
+            deltas = values[a] - values[b]
+            lower, upper = np.quantile(deltas, [alpha, 1 - alpha])
+            # Shift the bootstrap distribution to the null and count differences at least as extreme
+            p_value = (np.count_nonzero(np.abs(deltas - delta) >= abs(delta) - 1e-12) + 1) / (resamples + 1)
+            tests.append(PairedBootstrapTest(
+                run_a=evaluation.runs[a], run_b=evaluation.runs[b], metric=paired_metric,
+                delta=float(delta), lower=float(lower), upper=float(upper), p_value=float(p_value),
+            ))
+    return BootstrapResult(mode=mode, unit=unit, resamples=resamples, confidence=confidence,
+                           estimates=estimates, intervals=intervals, paired_tests=tests)
+
+
+def generate_bootstrap_report(result: BootstrapResult) -> str:
+    """Intervals per run and the paired tests, as a plain-text table."""
+    level = f"{result.confidence:.0%}"
+    lines = [f"## Bootstrap Confidence Intervals ({result.mode}, {level}, "
+             f"{result.resamples} resamples of {result.unit}s)",
+             f"  {'Run':<24} {'Metric':<10} {'Estimate':>9} {'Lower':>9} {'Upper':>9}"]
+    for run, estimates in result.estimates.items():
+        for metric in METRIC_NAMES:
+            lower, upper = result.intervals[run][metric]
+            lines.append(f"  {run:<24} {metric:<10} {estimates[metric]:>9.4f} {lower:>9.4f} {upper:>9.4f}")
+    if result.paired_tests:
+        lines.extend(["", f"## Paired Bootstrap Tests ({result.mode})",
+                      f"  {'Run A':<24} {'Run B':<24} {'Metric':<10} {'Delta':>8} {'Lower':>8} {'Upper':>8} "
+                      f"{'p':>8}"])
+        for test in result.paired_tests:
+            lines.append(f"  {test.run_a:<24} {test.run_b:<24} {test.metric:<10} {test.delta:>8.4f} "
+                         f"{test.lower:>8.4f} {test.upper:>8.4f} {test.p_value:>8.4f}")
+    return "\n".join(lines)
+
+
 # --- File I/O utilities ---
 
 def load_gold_annotations(file_path: str) -> List[Dict[str, Any]]:
@@ -408,3 +1055,195 @@ def export_for_error_analysis(result: EvaluationResult, output_path: str):
     }
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
+
+
+GOLD_FILE_PATTERN = re.compile(r'(book_\d+)_chapter_(\d+)')
+# llm_results/<book>[_<run>]: "book_1" is the default run, "book_1_sentenceSplitting" another run of book_1
+RUN_DIR_PATTERN = re.compile(r'^(book_\d+)(?:_(.+))?$')
+DEFAULT_RUN = "default"
+
+
+def load_gold_documents(gold_dir: str) -> Tuple[Dict[DocumentKey, List[Dict[str, Any]]],
+                                                 Dict[DocumentKey, Optional[Set[int]]]]:
+    """
+    Load every gold file in a directory, keyed by (book, 0-based chapter index),
+    with the paragraphs each chapter's gold covers.
+
+    The chapter comes from `_metadata.source` / `_metadata.chapter`, which count
+    chapters from 1 like the annotators do, or else from the file name
+    (`book_1_chapter_001_*.json`). Files for the same chapter are concatenated.
+    A file with `_metadata.partial` (the crowd gold) only annotates the
+    paragraphs listed in `_metadata.paragraphs`; the scope of a chapter is
+    the union of those, or None when a file covers the whole chapter.
+    """
+    corpus: Dict[DocumentKey, List[Dict[str, Any]]] = {}
+    scopes: Dict[DocumentKey, Optional[Set[int]]] = {}
+    for file_path in sorted(Path(gold_dir).glob("*.json")):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        metadata = data.get('_metadata', {}) if isinstance(data, dict) else {}
+        name_match = GOLD_FILE_PATTERN.search(file_path.stem)
+        book = metadata.get('source') or (name_match.group(1) if name_match else None)
+        chapter = metadata.get('chapter') or (int(name_match.group(2)) if name_match else None)
+        if book is None or chapter is None:
+            print(f"WARNING: Cannot tell which chapter {file_path.name} annotates. Skipped.")
+            continue
+        key = (book, int(chapter) - 1)
+        corpus.setdefault(key, []).extend(load_gold_annotations(str(file_path)))
+        paragraphs = set(metadata.get('paragraphs') or []) if metadata.get('partial') else None
+        if paragraphs is None or scopes.get(key, set()) is None:
+            scopes[key] = None
+        else:
+            scopes[key] = scopes.get(key, set()) | paragraphs
+    return corpus, scopes
+
+
+def load_gold_corpus(gold_dir: str) -> Dict[DocumentKey, List[Dict[str, Any]]]:
+    """
+    The whole-chapter gold files of a directory (see `load_gold_documents`).
+
+    Chapters whose gold only covers some paragraphs are skipped: scoring a
+    whole chapter's predictions against them would count every interaction
+    outside those paragraphs as a false positive.
+    """
+    corpus, scopes = load_gold_documents(gold_dir)
+    partial = sorted(key for key, scope in scopes.items() if scope is not None)
+    if partial:
+        print(f"WARNING: Skipped {len(partial)} chapter(s) whose gold covers only some paragraphs; "
+              f"evaluate them with run_evaluation.py --gold-dir {gold_dir}.")
+    return {key: interactions for key, interactions in corpus.items() if scopes[key] is None}
+
+
+def restrict_to_paragraphs(
+    predictions: Dict[DocumentKey, List[Dict[str, Any]]],
+    scopes: Dict[DocumentKey, Optional[Set[int]]],
+    chapter_texts: Dict[DocumentKey, str]
+) -> Tuple[Dict[DocumentKey, List[Dict[str, Any]]], int]:
+    """
+    Keep, in chapters with a paragraph scope, only the predictions whose
+    evidence snippet is quoted from a scoped paragraph.
+
+    Paragraphs are located as the snippet index splits them
+    (`ChapterParagraphs`). Predictions whose evidence cannot be found in the
+    chapter cannot be placed and are dropped; returns their count as well.
+    """
+    from src.snippet_queue import ChapterParagraphs
+
+    restricted: Dict[DocumentKey, List[Dict[str, Any]]] = {}
+    unplaced = 0
+    for key, interactions in predictions.items():
+        scope = scopes.get(key)
+        if scope is None:
+            restricted[key] = interactions
+            continue
+        paragraphs = ChapterParagraphs(chapter_texts.get(key, ""))
+        kept = []
+        for interaction in interactions:
+            p = paragraphs.locate(interaction.get('evidence_snippet'))
+            unplaced += p is None
+            if p is not None and p in scope:
+                kept.append(interaction)
+        restricted[key] = kept
+    return restricted, unplaced
+
+
+def load_crowd_annotations(annotations_dir: str) -> List[Dict[str, Any]]:
+    """
+    All submissions saved by `annotation_survey_app.py`: the annotation store
+    (`annotations.db`) if there is one, else the legacy `annotator_<id>.json` files.
+    """
+    from src.annotation_store import AnnotationStore, store_path
+
+    if store_path(Path(annotations_dir)).exists():
+        return AnnotationStore(store_path(Path(annotations_dir))).records()
+    records: List[Dict[str, Any]] = []
+    for file_path in sorted(Path(annotations_dir).glob("annotator_*.json")):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            records.extend(json.load(f))
+    return records
+
+
+def save_agreement_report(breakdown: AgreementBreakdown, output_dir: str, top_n: int = 10) -> Tuple[Path, Path]:
+    """Write `agreement_report.txt` and `agreement.json` (with every snippet)."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report_path, json_path = output_dir / "agreement_report.txt", output_dir / "agreement.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(generate_agreement_report(breakdown, top_n))
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(breakdown.to_dict(), f, indent=2)
+    return report_path, json_path
+
+
+def discover_runs(results_dir: str, books: Optional[Set[str]] = None) -> Dict[str, Dict[str, Path]]:
+    """
+    Run name -> book -> results directory, for every `<book>[_<run>]` directory.
+
+    `<book>_judged` holds judge scores rather than interactions and is skipped;
+    its thresholded runs (`<book>_judged_t070`, see `src/judge_sweep.py`) are not.
+    """
+    runs: Dict[str, Dict[str, Path]] = {}
+    for run_dir in sorted(p for p in Path(results_dir).iterdir() if p.is_dir()):
+        match = RUN_DIR_PATTERN.match(run_dir.name)
+        if not match or (books is not None and match.group(1) not in books) or match.group(2) == "judged":
+            continue
+        runs.setdefault(match.group(2) or DEFAULT_RUN, {})[match.group(1)] = run_dir
+    return runs
+
+
+def load_run_predictions(book_dirs: Dict[str, Path]) -> Dict[DocumentKey, List[Dict[str, Any]]]:
+    """One run's `chapter_XXX.json` interactions keyed by (book, chapter index)."""
+    predictions: Dict[DocumentKey, List[Dict[str, Any]]] = {}
+    for book, book_dir in book_dirs.items():
+        for file_path in sorted(book_dir.glob("chapter_*.json")):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                predictions[(book, int(file_path.stem.split('_')[-1]))] = json.load(f).get('interactions', [])
+    return predictions
+
+
+def save_corpus_evaluation(evaluation: CorpusEvaluation, output_dir: str, per_type: bool = True,
+                           bootstrap: Optional[List[BootstrapResult]] = None) -> Tuple[Path, Path, Path]:
+    """
+    Write `evaluation_report.txt` (one report per run plus per-book tables),
+    `evaluation.json` (every level and mode) and `evaluation_scores.csv`.
+    Bootstrap results, if given, add confidence intervals and paired tests
+    to the report and the JSON.
+    """
+    bootstrap = bootstrap or []
+    strict_intervals = next((result.intervals for result in bootstrap if result.mode == "strict"), {})
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    modes = list(MATCH_MODES) + (evaluation.types if per_type else [])
+    rows = [row for level in EVALUATION_LEVELS for mode in modes for row in evaluation.scores(level, mode)]
+
+    report_path = output_dir / "evaluation_report.txt"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(f"Gold chapters: {len(evaluation.documents)} in {len(evaluation.books)} book(s)\n\n")
+        for run in evaluation.runs:
+            f.write(f"# Run: {run}\n")
+            f.write(generate_evaluation_report(evaluation.result_for_run(run),
+                                               intervals=strict_intervals.get(run)) + "\n")
+            f.write(f"  {'Book':<12} {'Chapter':>8} {'Mode':<10} {'Precision':>10} {'Recall':>10} {'F1':>10}\n")
+            for row in rows:
+                if row["run"] == run and row["book"] and row["mode"] in MATCH_MODES:
+                    chapter = "all" if row["chapter"] is None else str(row["chapter"] + 1)
+                    f.write(f"  {row['book']:<12} {chapter:>8} {row['mode']:<10} {row['precision']:>10.4f} "
+                            f"{row['recall']:>10.4f} {row['f1_score']:>10.4f}\n")
+            f.write("\n")
+        for result in bootstrap:
+            f.write(generate_bootstrap_report(result) + "\n\n")
+
+    json_path = output_dir / "evaluation.json"
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({"runs": evaluation.runs, "documents": [list(key) for key in evaluation.documents],
+                   "types": evaluation.types, "scores": rows,
+                   "bootstrap": [result.to_dict() for result in bootstrap]}, f, indent=2)
+
+    csv_path = output_dir / "evaluation_scores.csv"
+    columns = ["run", "book", "chapter", "mode", "precision", "recall", "f1_score",
+               "true_positives", "false_positives", "false_negatives"]
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return report_path, json_path, csv_path
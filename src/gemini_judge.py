@@ -6,7 +6,6 @@ to provide a second opinion on extracted interactions, enabling quality filterin
 and confidence scoring.
 """
 
-import google.generativeai as genai
 import json
 import time
 from typing import List, Optional, Dict, Any
@@ -68,7 +67,11 @@ class GeminiJudge:
             api_key: Google AI API key
             model_name: Gemini model to use (gemini-1.5-pro recommended for judging)
         """
+        # Imported here so score-only tooling can use this module without the SDK
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
+        self._genai = genai
         self.model = genai.GenerativeModel(model_name)
         self.model_name = model_name
         self.last_request_time = 0
@@ -176,7 +179,7 @@ Respond ONLY with the JSON array, no other text.
                 prompt = self._create_judge_prompt(batch)
                 response = self.model.generate_content(
                     prompt,
-                    generation_config=genai.GenerationConfig(
+                    generation_config=self._genai.GenerationConfig(
                         response_mime_type="application/json",
                         temperature=0.1,  # Low temperature for consistent judgments
                     )
@@ -229,7 +232,13 @@ class JudgedInteraction(BaseModel):
     aggregate_score: float
     reasoning: str
     
+    # Raw dimension scores, kept so thresholds can be re-applied offline
+    factuality_score: Optional[float] = None
+    character_validity_score: Optional[float] = None
+    type_accuracy_score: Optional[float] = None
+    
     # Metadata
+    interaction_index: Optional[int] = None  # Position in the chapter's extracted interactions
     needs_human_review: bool = False
 
 
@@ -301,7 +310,7 @@ def judge_chapter_results(
     
     # Combine into JudgedInteraction objects
     judged = []
-    for interaction, evaluation in zip(chapter_interactions, evaluations):
+    for index, (interaction, evaluation) in enumerate(zip(chapter_interactions, evaluations)):
         if evaluation:
             judged.append(JudgedInteraction(
                 character_1=interaction['character_1'],
@@ -311,7 +320,11 @@ def judge_chapter_results(
                 verdict=evaluation.verdict,
                 confidence_score=evaluation.confidence_score,
                 aggregate_score=judge.compute_aggregate_score(evaluation),
-                reasoning=evaluation.reasoning
+                reasoning=evaluation.reasoning,
+                factuality_score=evaluation.factuality_score,
+                character_validity_score=evaluation.character_validity_score,
+                type_accuracy_score=evaluation.type_accuracy_score,
+                interaction_index=index
             ))
     
     return judged
@@ -0,0 +1,165 @@
+"""
+Graph Builder - Turns per-chapter LLM results into the weighted graph artifact.
+
+Shared by `build_graph.py`, `analyze_graph.py` and the batch driver so the
+chapter JSON is read once and the same pass yields both the graph (with rich
+edge details) and the per-chapter edge lists used by the temporal reports.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import networkx as nx
+
+from src.character_mapper import CharacterMapper
+from src.multilayer import LAYERS, MultilayerNetwork, interaction_layer, layer_attribute
+
+ChapterEdges = Dict[int, List[Tuple[str, str]]]
+
+# Graph attribute listing every chapter index, including chapters without interactions
+CHAPTERS_ATTRIBUTE = 'chapters'
+
+
+def result_files(book_results_dir: Path) -> List[Path]:
+    """The chapter result files of one extraction run, in chapter order."""
+    return sorted(book_results_dir.glob("chapter_*.json"))
+
+
+def add_interaction(G: nx.Graph, char1: str, char2: str, details: dict, interaction_type: Optional[str]):
+    """Count one interaction on the (char1, char2) edge: its weight, details and type layer."""
+    if not G.has_edge(char1, char2):
+        G.add_edge(char1, char2, weight=0, details=[], **{layer_attribute(layer): 0 for layer in LAYERS})
+    edge = G[char1][char2]
+    edge['weight'] += 1
+    edge['details'].append(details)
+    # Per-type counts: the interaction-type layers, without decoding 'details' later
+    edge[layer_attribute(interaction_layer(interaction_type))] += 1
+
+
+def add_extracted_interaction(G: nx.Graph, interaction: dict, chapter_index: int,
+                              character_mapper: CharacterMapper) -> Optional[Tuple[str, str]]:
+    """
+    Resolve one extracted interaction's characters and add it to `G`.
+
+    Returns the sorted canonical edge, or None when either character is unknown
+    or both resolve to the same character.
+    """
+    # "Trust, but Verify" step
+    char1 = character_mapper.get_canonical_name(interaction.get("character_1") or "")
+    char2 = character_mapper.get_canonical_name(interaction.get("character_2") or "")
+
+    if not (char1 and char2 and char1 != char2):
+        return None
+
+    # Sanitize the data and provide default values for every attribute.
+    interaction_details = {
+        "type": interaction.get("interaction_type", "Unknown"),
+        "sentiment": interaction.get("sentiment", "Neutral"),
+        "location": interaction.get("location", "Unknown"),
+        "evidence": interaction.get("evidence_snippet", "N/A"),
+        "chapter": chapter_index,
+    }
+
+    add_interaction(G, char1, char2, interaction_details, interaction.get("interaction_type"))
+    return tuple(sorted((char1, char2)))
+
+
+def build_interaction_graph(results_dirs: Sequence[Path],
+                            character_mapper: CharacterMapper) -> Tuple[nx.Graph, ChapterEdges]:
+    """
+    Build the weighted interaction graph and per-chapter edges in one pass.
+
+    Several result directories are concatenated in order (e.g. all books of
+    the novel); their chapters are numbered continuously so chapter indices
+    stay unique across books.
+    """
+    G = nx.Graph()
+    chapter_edges: ChapterEdges = {}
+    chapter_offset = 0
+
+    for book_results_dir in results_dirs:
+        files = result_files(book_results_dir)
+        last_index = -1
+        for file_path in files:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                chapter_data = json.load(f)
+
+            local_index = int(file_path.stem.split('_')[-1])
+            last_index = max(last_index, local_index)
+            chapter_index = chapter_offset + local_index
+            edges = chapter_edges.setdefault(chapter_index, [])
+
+            for interaction in chapter_data.get("interactions", []):
+                edge = add_extracted_interaction(G, interaction, chapter_index, character_mapper)
+                if edge:
+                    edges.append(edge)
+
+        chapter_offset += last_index + 1
+
+    record_chapters(G, chapter_edges)
+    return G, chapter_edges
+
+
+def record_chapters(G: nx.Graph, chapter_edges: ChapterEdges):
+    """Keep the chapter indices on the graph so `chapter_edges_from_graph` restores empty chapters."""
+    G.graph[CHAPTERS_ATTRIBUTE] = json.dumps(sorted(chapter_edges))
+
+
+def save_graph_artifact(G: nx.Graph, output_path: Path):
+    """
+    Write the graph as GML, encoding the 'details' lists as JSON strings,
+    plus its interaction-type layers as `<name>_layers.npz`.
+    """
+    artifact = G.copy()
+    for u, v, data in artifact.edges(data=True):
+        if not isinstance(data.get('details'), str):
+            data['details'] = json.dumps(data.get('details', []))
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    nx.write_gml(artifact, str(output_path))
+    save_layers_artifact(G, output_path)
+
+
+def layers_artifact_path(gml_path: Path) -> Path:
+    """`book_1_graph.gml` -> `book_1_layers.npz`."""
+    return gml_path.with_name(gml_path.stem.removesuffix("_graph") + "_layers.npz")
+
+
+def save_layers_artifact(G: nx.Graph, gml_path: Path):
+    """Write the interaction-type layers of `G` next to its GML artifact."""
+    MultilayerNetwork.from_graph(G).save(layers_artifact_path(gml_path))
+
+
+def load_graph_artifact(gml_path: Path) -> nx.Graph:
+    """Read a GML artifact and decode the 'details' edge attribute back into lists."""
+    G = nx.read_gml(str(gml_path))
+    for u, v, data in G.edges(data=True):
+        if isinstance(data.get('details'), str):
+            data['details'] = json.loads(data['details'])
+    return G
+
+
+def chapter_edges_from_graph(G: nx.Graph) -> Optional[ChapterEdges]:
+    """
+    Recover per-chapter edges from the 'chapter' field of each edge detail.
+
+    Chapters without interactions come back from the graph's chapter list, so
+    the result matches `build_interaction_graph`. Returns None for artifacts
+    written before details carried a chapter.
+    """
+    chapter_edges: ChapterEdges = {int(c): [] for c in json.loads(G.graph.get(CHAPTERS_ATTRIBUTE, "[]"))}
+    for u, v, data in G.edges(data=True):
+        edge = tuple(sorted((u, v)))
+        for detail in data.get('details', []):
+            if not isinstance(detail, dict) or 'chapter' not in detail:
+                return None
+            chapter_edges.setdefault(int(detail['chapter']), []).append(edge)
+    return dict(sorted(chapter_edges.items()))
+
+
+def artifact_is_current(gml_path: Path, book_results_dir: Path) -> bool:
+    """True when the artifact exists and is newer than every chapter result file."""
+    if not gml_path.exists():
+        return False
+    artifact_mtime = gml_path.stat().st_mtime
+    return all(f.stat().st_mtime <= artifact_mtime for f in result_files(book_results_dir))
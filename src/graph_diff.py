@@ -0,0 +1,255 @@
+"""
+Graph Diff - Aligns several graph artifacts and diffs them in one vectorised pass.
+
+Every graph is mapped onto one interned character index and one index of
+character pairs, giving a (graphs x pairs) weight matrix. Any set of
+comparisons (consecutive books, every pair, or everything against a baseline
+run) is then a handful of array operations over rows of that matrix:
+added / removed / reweighted edges, and centrality rank changes computed with
+`src.network_math` on the same arrays.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+
+from src.graph_builder import layers_artifact_path
+from src.multilayer import MultilayerNetwork
+from src.network_math import degree_centrality, eigenvector_centrality, pagerank
+
+PAIRINGS = ("consecutive", "all", "baseline")
+METRICS = ("degree_centrality", "strength", "eigenvector", "pagerank")
+
+
+def load_weighted_edges(gml_path: Path) -> Tuple[List[str], List[Tuple[str, str, float]]]:
+    """
+    Characters and (u, v, weight) edges of a graph artifact.
+
+    Reads the `_layers.npz` written next to the GML when it exists (no GML
+    parsing or `details` decoding), and the GML otherwise.
+    """
+    layers_path = layers_artifact_path(gml_path)
+    if layers_path.exists() and layers_path.stat().st_mtime >= gml_path.stat().st_mtime:
+        layers = MultilayerNetwork.load(layers_path)
+        totals = layers.weights.sum(axis=0)
+        return layers.characters, [(layers.characters[u], layers.characters[v], float(w))
+                                   for u, v, w in zip(layers.pair_u, layers.pair_v, totals)]
+    G = nx.read_gml(str(gml_path))
+    return list(G.nodes()), [(u, v, float(data.get('weight', 1))) for u, v, data in G.edges(data=True)]
+
+
+class AlignedGraphs:
+    """
+    Several graphs over shared character and pair ids.
+
+    `weights[g, p]` is the weight of pair p (`pair_u[p]`, `pair_v[p]`) in graph
+    g; `present[g, c]` marks the characters that appear in graph g.
+    """
+
+    def __init__(self, names: List[str], graphs: Sequence[Tuple[List[str], List[Tuple[str, str, float]]]]):
+        self.names = names
+        self.characters = sorted({node for nodes, _ in graphs for node in nodes})
+        self.character_index = {name: i for i, name in enumerate(self.characters)}
+        n = len(self.characters)
+
+        graph_ids, keys, values = [], [], []
+        self.present = np.zeros((len(graphs), n), dtype=bool)
+        for g, (nodes, edges) in enumerate(graphs):
+            self.present[g, [self.character_index[node] for node in nodes]] = True
+            for u, v, w in edges:
+                a, b = sorted((self.character_index[u], self.character_index[v]))
+                graph_ids.append(g)
+                keys.append(a * n + b)
+                values.append(w)
+
+        pair_keys, pair_ids = np.unique(np.array(keys, dtype=np.int64), return_inverse=True)
+        self.pair_u = pair_keys // max(n, 1)
+        self.pair_v = pair_keys % max(n, 1)
+        self.weights = np.zeros((len(graphs), len(pair_keys)))
+        np.add.at(self.weights, (np.array(graph_ids, dtype=np.int64), pair_ids), np.array(values))
+
+    @classmethod
+    def from_artifacts(cls, artifact_paths: Dict[str, Path]) -> 'AlignedGraphs':
+        return cls(list(artifact_paths), [load_weighted_edges(path) for path in artifact_paths.values()])
+
+    @classmethod
+    def from_graphs(cls, graphs: Dict[str, nx.Graph]) -> 'AlignedGraphs':
+        return cls(list(graphs), [(list(G.nodes()),
+                                   [(u, v, float(data.get('weight', 1))) for u, v, data in G.edges(data=True)])
+                                  for G in graphs.values()])
+
+    def pair_name(self, p: int) -> Tuple[str, str]:
+        return self.characters[self.pair_u[p]], self.characters[self.pair_v[p]]
+
+    def centralities(self, metric: str) -> np.ndarray:
+        """(graphs x characters) scores of one metric; characters absent from a graph score 0."""
+        n = len(self.characters)
+        rows = []
+        for w in self.weights:
+            if metric == "degree_centrality":
+                rows.append(degree_centrality(n, self.pair_u, self.pair_v, w))
+            elif metric == "strength":
+                rows.append(np.bincount(self.pair_u, weights=w, minlength=n) +
+                            np.bincount(self.pair_v, weights=w, minlength=n))
+            elif metric == "eigenvector":
+                rows.append(eigenvector_centrality(n, self.pair_u, self.pair_v, w))
+            elif metric == "pagerank":
+                rows.append(pagerank(n, self.pair_u, self.pair_v, w))
+            else:
+                raise ValueError(f"Unknown metric '{metric}'. Use one of {METRICS}.")
+        return np.array(rows).reshape(len(self.weights), n)
+
+    def ranks(self, scores: np.ndarray) -> np.ndarray:
+        """1-based rank of every character within each graph (ties by name); 0 where absent."""
+        # Characters are sorted by name, so a stable sort on -score breaks ties alphabetically
+        order = np.argsort(-np.where(self.present, scores, -np.inf), axis=1, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, order.shape[1] + 1)[None, :].repeat(len(order), 0), axis=1)
+        return np.where(self.present, ranks, 0)
+
+
+def comparison_pairs(count: int, pairing: str = "consecutive") -> List[Tuple[int, int]]:
+    """Index pairs (before, after) to compare among `count` graphs."""
+    if pairing == "consecutive":
+        return [(i, i + 1) for i in range(count - 1)]
+    if pairing == "all":
+        return [(i, j) for i in range(count) for j in range(i + 1, count)]
+    if pairing == "baseline":
+        return [(0, j) for j in range(1, count)]
+    raise ValueError(f"Unknown pairing '{pairing}'. Use one of {PAIRINGS}.")
+
+
+@dataclass
+class GraphDiff:
+    """Differences between two aligned graphs."""
+    before: str
+    after: str
+    metric: str
+    added: List[Tuple[str, str, float]] = field(default_factory=list)       # Pairs only in `after`
+    removed: List[Tuple[str, str, float]] = field(default_factory=list)     # Pairs only in `before`
+    reweighted: List[Tuple[str, str, float, float]] = field(default_factory=list)  # (u, v, before, after)
+    characters_added: List[str] = field(default_factory=list)
+    characters_removed: List[str] = field(default_factory=list)
+    # (character, rank before, rank after, score before, score after), biggest moves first
+    rank_changes: List[Tuple[str, int, int, float, float]] = field(default_factory=list)
+    edge_jaccard: float = 0.0      # |pairs in both| / |pairs in either|
+    weight_l1: float = 0.0         # Sum of absolute weight changes
+
+    def to_dict(self) -> dict:
+        return {
+            "before": self.before,
+            "after": self.after,
+            "metric": self.metric,
+            "summary": {
+                "edges_added": len(self.added),
+                "edges_removed": len(self.removed),
+                "edges_reweighted": len(self.reweighted),
+                "characters_added": len(self.characters_added),
+                "characters_removed": len(self.characters_removed),
+                "edge_jaccard": self.edge_jaccard,
+                "weight_l1": self.weight_l1,
+            },
+            "edges_added": [{"characters": [u, v], "weight": w} for u, v, w in self.added],
+            "edges_removed": [{"characters": [u, v], "weight": w} for u, v, w in self.removed],
+            "edges_reweighted": [{"characters": [u, v], "before": a, "after": b, "delta": b - a}
+                                 for u, v, a, b in self.reweighted],
+            "characters_added": self.characters_added,
+            "characters_removed": self.characters_removed,
+            "rank_changes": [{"character": c, "rank_before": ra, "rank_after": rb, "rank_change": ra - rb,
+                              "score_before": sa, "score_after": sb} for c, ra, rb, sa, sb in self.rank_changes],
+        }
+
+    def generate_report(self, top_n: int = 10) -> str:
+        report_lines = [f"--- Graph Diff: {self.before} -> {self.after} ---\n"]
+        report_lines.append(f"Edges added: {len(self.added)}, removed: {len(self.removed)}, "
+                            f"reweighted: {len(self.reweighted)}")
+        report_lines.append(f"Characters added: {len(self.characters_added)}, "
+                            f"removed: {len(self.characters_removed)}")
+        report_lines.append(f"Edge overlap (Jaccard): {self.edge_jaccard:.4f} | "
+                            f"Total weight change: {self.weight_l1:g}")
+
+        report_lines.append(f"\n--- Top {top_n} New Relationships ---")
+        for u, v, w in self.added[:top_n]:
+            report_lines.append(f"  +{w:<5g} | {u} -- {v}")
+        report_lines.append(f"\n--- Top {top_n} Lost Relationships ---")
+        for u, v, w in self.removed[:top_n]:
+            report_lines.append(f"  -{w:<5g} | {u} -- {v}")
+        report_lines.append(f"\n--- Top {top_n} Reweighted Relationships ---")
+        for u, v, a, b in self.reweighted[:top_n]:
+            report_lines.append(f"  {b - a:<+6g} | {u} -- {v} ({a:g} -> {b:g})")
+
+        if self.characters_added:
+            report_lines.append(f"\nNew characters: {', '.join(self.characters_added)}")
+        if self.characters_removed:
+            report_lines.append(f"Characters no longer present: {', '.join(self.characters_removed)}")
+
+        report_lines.append(f"\n--- Top {top_n} Rank Changes by {self.metric} ---")
+        for char, rank_before, rank_after, _, _ in self.rank_changes[:top_n]:
+            report_lines.append(f"  {char:<30} | #{rank_before:<3} -> #{rank_after:<3} ({rank_before - rank_after:+d})")
+        return "\n".join(report_lines)
+
+
+def diff_aligned(aligned: AlignedGraphs, pairs: Sequence[Tuple[int, int]],
+                 metric: str = "pagerank") -> List[GraphDiff]:
+    """Diff every (before, after) pair of graph indices in one pass over the weight matrix."""
+    if not pairs:
+        return []
+    before_idx = np.array([i for i, _ in pairs])
+    after_idx = np.array([j for _, j in pairs])
+    W_before, W_after = aligned.weights[before_idx], aligned.weights[after_idx]
+
+    added = (W_before == 0) & (W_after > 0)
+    removed = (W_before > 0) & (W_after == 0)
+    reweighted = (W_before > 0) & (W_after > 0) & (W_before != W_after)
+    union = ((W_before > 0) | (W_after > 0)).sum(axis=1)
+    intersection = ((W_before > 0) & (W_after > 0)).sum(axis=1)
+    l1 = np.abs(W_after - W_before).sum(axis=1)
+
+    scores = aligned.centralities(metric)
+    ranks = aligned.ranks(scores)
+    present_before, present_after = aligned.present[before_idx], aligned.present[after_idx]
+    in_both = present_before & present_after
+    rank_delta = np.where(in_both, ranks[before_idx] - ranks[after_idx], 0)
+
+    diffs = []
+    for k, (i, j) in enumerate(pairs):
+        def edges(mask, values):
+            idx = np.flatnonzero(mask)
+            idx = idx[np.argsort(-values[idx], kind='stable')]
+            return [(*aligned.pair_name(p), float(values[p])) for p in idx]
+
+        changed = np.flatnonzero(reweighted[k])
+        changed = changed[np.argsort(-np.abs(W_after[k, changed] - W_before[k, changed]), kind='stable')]
+        movers = np.flatnonzero(in_both[k] & (rank_delta[k] != 0))
+        movers = movers[np.argsort(-np.abs(rank_delta[k, movers]), kind='stable')]
+
+        diffs.append(GraphDiff(
+            before=aligned.names[i],
+            after=aligned.names[j],
+            metric=metric,
+            added=edges(added[k], W_after[k]),
+            removed=edges(removed[k], W_before[k]),
+            reweighted=[(*aligned.pair_name(p), float(W_before[k, p]), float(W_after[k, p])) for p in changed],
+            characters_added=[aligned.characters[c] for c in np.flatnonzero(present_after[k] & ~present_before[k])],
+            characters_removed=[aligned.characters[c] for c in np.flatnonzero(present_before[k] & ~present_after[k])],
+            rank_changes=[(aligned.characters[c], int(ranks[i, c]), int(ranks[j, c]),
+                           float(scores[i, c]), float(scores[j, c])) for c in movers],
+            edge_jaccard=float(intersection[k] / union[k]) if union[k] else 1.0,
+            weight_l1=float(l1[k]),
+        ))
+    return diffs
+
+
+def save_diffs(diffs: List[GraphDiff], output_dir: Path, top_n: int = 10) -> Tuple[Path, Path]:
+    """Write all diffs as one text report and one JSON document."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report_path, json_path = output_dir / "diff_report.txt", output_dir / "diff.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write("\n\n".join(diff.generate_report(top_n) for diff in diffs))
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({"diffs": [diff.to_dict() for diff in diffs]}, f, indent=2, ensure_ascii=False)
+    return report_path, json_path
@@ -1,14 +1,27 @@
+import importlib.util
 import json
+import os
+import re
+import shutil
 from pathlib import Path
 from collections import Counter, defaultdict
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Optional, TYPE_CHECKING
 import sys
 
 import networkx as nx
-from pyvis.network import Network
-import community as community_louvain
-import matplotlib.cm as cm
-import matplotlib.colors as mcolors
+
+from src.analytics_cache import (AnalyticsArtifact, chapter_rankings, compute_analytics, render_chapter_rankings,
+                                 render_chapters, render_community_members, render_overview)
+from src.centrality import BetweennessConfig
+from src.communities import CommunityResult, detect_communities
+from src.layout import forceatlas2_layout, community_layout
+from src.webgl_viewer import save_webgl_visualization
+
+if TYPE_CHECKING:
+    from pyvis.network import Network
+
+# pyvis and matplotlib are only needed to draw the network, so
+# they are imported inside the visualization methods to keep report-only runs fast.
 
 
 class GraphManager:
@@ -16,6 +29,9 @@ class GraphManager:
         print("Initializing Graph Manager...")
         self.edge_weights = Counter(edges)
         self.graph = self._build_analytical_graph()
+        self.community_result: Optional[CommunityResult] = None
+        # Cached analytics of this graph (see `from_graph`); report sections render from it when set
+        self.artifact: Optional[AnalyticsArtifact] = None
         print("Graph Manager initialized.")
 
     # ... (from_gml, _build_analytical_graph, etc. are unchanged) ...
@@ -25,30 +41,15 @@ class GraphManager:
         Analyzes each chapter individually to find the most important characters.
         'Importance' here is defined by the highest number of interactions (degree centrality).
         """
-        report_lines = [f"\n--- Top {top_n} Most Important Characters by Chapter ---"]
-
-        for chapter_idx, edges in sorted(chapter_data.items()):
-            if not edges:
-                continue
-
-            report_lines.append(f"\nChapter {chapter_idx + 1}:")
-
-            # Create a temporary graph for this chapter only
-            chapter_g = nx.Graph()
-            for char1, char2 in edges:
-                chapter_g.add_edge(char1, char2)
-
-            if not chapter_g.nodes:
-                continue
-
-            # Calculate degree centrality for just this chapter's graph
-            degrees = nx.degree_centrality(chapter_g)
-            sorted_degrees = sorted(degrees.items(), key=lambda item: item[1], reverse=True)
-
-            for i, (char, score) in enumerate(sorted_degrees[:top_n]):
-                report_lines.append(f"  {i + 1}. {char:<30} (Score: {score:.4f})")
+        if self.artifact is not None and self.artifact.chapters:
+            return render_chapters(self.artifact, top_n)
+        return render_chapter_rankings(chapter_rankings(chapter_data), top_n)
 
-        return "\n".join(report_lines)
+    def generate_community_report(self, communities: CommunityResult, max_members: int = 10) -> str:
+        """Lists each consensus community with its most connected members."""
+        self.community_result = communities
+        strength = self.artifact.strength if self.artifact is not None else dict(self.graph.degree(weight='weight'))
+        return render_community_members(communities, strength, max_members)
 
     # ... (The rest of the class, including the full analysis and visualization methods, remains the same) ...
 
@@ -71,19 +72,37 @@ class GraphManager:
             print(f"FATAL: Could not read or parse the graph file. Error: {e}")
             sys.exit(1)
 
+    @classmethod
+    def from_graph(cls, G: nx.Graph, artifact: Optional[AnalyticsArtifact] = None) -> 'GraphManager':
+        """
+        Wrap an already-built interaction graph (e.g. from `build_interaction_graph`),
+        with its cached analytics artifact when the caller has one.
+        """
+        instance = cls([])
+        instance.artifact = artifact
+        instance.edge_weights = Counter({tuple(sorted((u, v))): data.get('weight', 1)
+                                         for u, v, data in G.edges(data=True)})
+        # Keep only weights on the analytical graph; 'details' lists would bloat the HTML
+        instance.graph = instance._build_analytical_graph()
+        return instance
+
     def _build_analytical_graph(self) -> nx.Graph:
         G = nx.Graph()
         for (char1, char2), weight in self.edge_weights.items():
             G.add_edge(char1, char2, weight=weight, value=weight)
         return G
 
-    def _add_node_attributes(self):
+    def _add_node_attributes(self, communities: Optional[CommunityResult] = None):
         if not self.graph.nodes: return
+        from matplotlib import colormaps
+        import matplotlib.colors as mcolors
         try:
-            partition = community_louvain.best_partition(self.graph, weight='weight')
-            num_communities = len(set(partition.values()))
+            # A precomputed (cached) consensus partition, or a seeded one computed here
+            self.community_result = communities or self.community_result or detect_communities(self.graph)
+            partition = self.community_result.partition
+            num_communities = self.community_result.num_communities
             nx.set_node_attributes(self.graph, partition, 'group')
-            colors = cm.get_cmap('tab20', num_communities)
+            colors = colormaps['tab20'].resampled(num_communities)
             self.color_map = [mcolors.to_hex(colors(i)) for i in range(num_communities)]
         except Exception as e:
             print(f"Warning: Community detection failed. All nodes will be one color. Error: {e}")
@@ -104,7 +123,7 @@ class GraphManager:
             else:
                 self.graph.nodes[node]['size'] = 15
 
-    def _add_legend_nodes(self, net: Network):
+    def _add_legend_nodes(self, net: 'Network'):
         if not hasattr(self, 'color_map') or len(self.color_map) <= 1: return
         try:
             height_val = int(net.height.replace("px", "").strip())
@@ -117,44 +136,97 @@ class GraphManager:
         except Exception as e:
             print(f"Warning: Could not generate visualization legend. Error: {e}")
 
-    def generate_full_analysis_report(self, top_n: int = 10) -> str:
-        if not self.graph.nodes: return "Graph is empty. No analysis can be performed."
-        report_lines = ["--- Character Network Analysis Report ---\n"]
-        report_lines.append(f"Total Characters (Nodes): {self.graph.number_of_nodes()}")
-        report_lines.append(f"Total Unique Relationships (Edges): {self.graph.number_of_edges()}")
-        report_lines.append(f"\n--- Top {top_n} Relationships by Interaction Count ---")
-        for (char1, char2), weight in self.edge_weights.most_common(top_n):
-            report_lines.append(f"  {weight:<5} | {char1} -- {char2}")
-        for name, result in self._get_all_centralities(top_n=top_n).items():
-            report_lines.append(f"\n--- Top {top_n} Characters by {name} ---")
-            for char, score in result:
-                report_lines.append(f"  {char:<30} | Score: {score:.4f}")
-        return "\n".join(report_lines)
-
-    def _get_all_centralities(self, top_n: int = 10) -> Dict[str, Any]:
-        if not self.graph.nodes: return {}
-        try:
-            eigenvector = nx.eigenvector_centrality(self.graph, weight='weight', max_iter=1000)
-        except nx.PowerIterationFailedConvergence:
-            eigenvector = {}
-        return {
-            "Degree Centrality": sorted(nx.degree_centrality(self.graph).items(), key=lambda item: item[1],
-                                        reverse=True)[:top_n],
-            "Betweenness Centrality": sorted(nx.betweenness_centrality(self.graph, weight='weight').items(),
-                                             key=lambda item: item[1], reverse=True)[:top_n],
-            "Eigenvector Centrality": sorted(eigenvector.items(), key=lambda item: item[1], reverse=True)[:top_n],
-        }
-
-    def save_interactive_visualization(self, output_path: Path):
+    def generate_full_analysis_report(self, top_n: int = 10,
+                                      betweenness: Optional[BetweennessConfig] = None) -> str:
+        if self.artifact is not None and betweenness is None:
+            return render_overview(self.artifact, top_n)
+        return render_overview(compute_analytics(self.graph, betweenness=betweenness), top_n)
+
+    def save_interactive_visualization(self, output_path: Path, layout_seed: int = 42, layout_iterations: int = 300,
+                                       assets_dir: Optional[Path] = None,
+                                       communities: Optional[CommunityResult] = None):
+        """
+        Write the pyvis HTML with a pre-computed layout and physics switched off.
+
+        vis.js and its CSS are written once to `assets_dir` (by default
+        `analysis_reports/assets`) and linked from every page instead of being
+        inlined into each report.
+        """
         print(f"Generating interactive visualization... -> {output_path}")
-        self._add_node_attributes()
-        net = Network(height="900px", width="100%", bgcolor="#1a1a1a", font_color="white", cdn_resources='in_line')
-        net.from_nx(self.graph)
+        from pyvis.network import Network
+        self._add_node_attributes(communities)
+        for node, (x, y) in forceatlas2_layout(self.graph, iterations=layout_iterations, seed=layout_seed).items():
+            self.graph.nodes[node]['x'] = x
+            self.graph.nodes[node]['y'] = y
+        net = Network(height="900px", width="100%", bgcolor="#1a1a1a", font_color="white", cdn_resources='remote')
+        # from_nx pops each edge's 'weight' into 'value'; keep the analytical graph intact
+        net.from_nx(self.graph.copy())
         self._add_legend_nodes(net)
-        net.force_atlas_2based(spring_length=150)
+        net.toggle_physics(False)
+        net.set_edge_smooth('continuous')
         net.show_buttons(filter_=['physics', 'nodes', 'edges'])
         try:
-            net.save_graph(str(output_path))
+            assets_dir = assets_dir or output_path.parent.parent / "assets"
+            install_shared_assets(assets_dir)
+            html = _link_shared_assets(net.generate_html(), os.path.relpath(assets_dir, output_path.parent))
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(html)
             print("Visualization saved successfully.")
         except Exception as e:
-            print(f"An error occurred during visualization: {e}")
\ No newline at end of file
+            print(f"An error occurred during visualization: {e}")
+
+    def save_webgl_visualization(self, output_path: Path, layout_seed: int = 42, layout_iterations: int = 200,
+                                 communities: Optional[CommunityResult] = None):
+        """
+        Write the level-of-detail WebGL viewer for graphs too large for pyvis.
+
+        Communities are laid out first and their members around them, so a
+        collapsed community sits where its members are drawn when expanded.
+        """
+        print(f"Generating WebGL visualization... -> {output_path}")
+        if not hasattr(self, 'color_map') or communities is not None:
+            self._add_node_attributes(communities)
+        partition = {node: data.get('group', 0) for node, data in self.graph.nodes(data=True)}
+        positions = community_layout(self.graph, partition, iterations=layout_iterations, seed=layout_seed)
+        try:
+            save_webgl_visualization(self.graph, positions, self.color_map, output_path, title=output_path.stem)
+            print("Visualization saved successfully.")
+        except Exception as e:
+            print(f"An error occurred during visualization: {e}")
+
+
+# --- Shared visualization assets ---
+
+# pyvis template files copied once into the shared assets directory
+_SHARED_ASSET_FILES = ["vis-9.1.2/vis-network.min.js", "vis-9.1.2/vis-network.css", "bindings/utils.js"]
+_VIS_CDN_CSS = re.compile(r'<link rel="stylesheet" href="https://cdnjs\.cloudflare\.com/ajax/libs/vis-network/[^"]*"[^>]*/>')
+_VIS_CDN_JS = re.compile(r'<script src="https://cdnjs\.cloudflare\.com/ajax/libs/vis-network/[^"]*"[^>]*></script>')
+
+
+def _pyvis_lib_dir() -> Path:
+    # Located without importing pyvis, which pulls in IPython
+    return Path(importlib.util.find_spec("pyvis").origin).parent / "templates" / "lib"
+
+
+def install_shared_assets(assets_dir: Path):
+    """Copy the vis.js assets once; safe when several report processes race."""
+    lib_dir = _pyvis_lib_dir()
+    for relative in _SHARED_ASSET_FILES:
+        source, target = lib_dir / relative, assets_dir / relative
+        if target.exists() and target.stat().st_size == source.stat().st_size:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+
+
+def _link_shared_assets(html: str, relative_assets: str) -> str:
+    """Point a pyvis 'remote' page at the shared assets instead of the CDN / inline copies."""
+    base = Path(relative_assets).as_posix()
+    with open(_pyvis_lib_dir() / "bindings" / "utils.js", 'r', encoding='utf-8') as f:
+        utils_js = f.read()
+    html = html.replace(f"<script>{utils_js}</script>", f'<script src="{base}/bindings/utils.js"></script>')
+    html = _VIS_CDN_CSS.sub(f'<link rel="stylesheet" href="{base}/vis-9.1.2/vis-network.css" />', html)
+    html = _VIS_CDN_JS.sub(f'<script src="{base}/vis-9.1.2/vis-network.min.js"></script>', html)
+    return html
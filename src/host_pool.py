@@ -0,0 +1,195 @@
+"""
+Host Pool Module - Spreads extraction requests over several Ollama servers.
+
+`models.llm_host` is either one URL or a list of hosts, each a URL or a
+`{url, weight}` mapping. A host's weight is how many requests it serves at
+once (its share of the load); `run_llm_extraction.py` runs as many chapters
+in parallel as the weights add up to, so adding a box adds workers.
+
+`HostPool.acquire` picks the healthy host with the fewest outstanding
+requests per unit of weight (least-outstanding-requests), ties going to the
+host that has served the least. A host that fails `max_failures` requests in
+a row is ejected for `cooldown_seconds`; after that a `GET /api/version`
+health check readmits it or ejects it again. When every host is ejected the
+one that comes back first is used anyway, so a run never stalls on the pool.
+`LLMClient` retries a failed request on another host.
+
+Per-host counters (requests, failures, ejections, busy time, tokens) feed the
+host table of the extraction's telemetry summary.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Union
+
+import requests
+
+HEALTH_PATH = "/api/version"
+HEALTH_TIMEOUT = 2.0
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    failures: int = 0
+    ejections: int = 0
+    busy_seconds: float = 0.0               # Sum of request round trips
+    prompt_tokens: int = 0
+    generated_tokens: int = 0
+    first_request: Optional[float] = None   # time.perf_counter() of the first and last answer
+    last_request: Optional[float] = None
+
+
+@dataclass
+class Host:
+    url: str
+    weight: float = 1.0
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0              # time.perf_counter(); 0 while healthy
+    probing: bool = False
+    stats: HostStats = field(default_factory=HostStats)
+
+    @property
+    def healthy(self) -> bool:
+        return self.ejected_until == 0.0
+
+
+HostSpec = Union[str, Dict[str, Any]]
+
+
+def parse_hosts(llm_host: Union[HostSpec, List[HostSpec]]) -> List[Host]:
+    """`models.llm_host` as hosts: a URL, a list of URLs, or a list of `{url, weight}` mappings."""
+    specs = llm_host if isinstance(llm_host, list) else [llm_host]
+    hosts = []
+    for spec in specs:
+        if isinstance(spec, str):
+            spec = {'url': spec}
+        if not isinstance(spec, dict) or not spec.get('url'):
+            raise ValueError(f"Invalid llm_host entry {spec!r}: use a URL or a mapping with 'url' and 'weight'.")
+        weight = float(spec.get('weight', 1))
+        if weight <= 0:
+            raise ValueError(f"llm_host '{spec['url']}' needs a positive weight, got {weight}.")
+        hosts.append(Host(url=str(spec['url']).rstrip("/"), weight=weight))
+    if not hosts:
+        raise ValueError("llm_host lists no hosts.")
+    if len({host.url for host in hosts}) < len(hosts):
+        raise ValueError("llm_host lists the same URL more than once; raise its weight instead.")
+    return hosts
+
+
+def check_health(url: str, timeout: float = HEALTH_TIMEOUT) -> bool:
+    try:
+        return requests.get(f"{url}{HEALTH_PATH}", timeout=timeout).ok
+    except requests.exceptions.RequestException:
+        return False
+
+
+class HostPool:
+    """Thread-safe least-outstanding-requests scheduling with ejection and health checks."""
+
+    def __init__(self, hosts: List[Host], max_failures: int = 3, cooldown_seconds: float = 30.0):
+        self.hosts = hosts
+        self.max_failures = max_failures
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """Requests the pool serves at once: the weights, rounded, at least 1."""
+        return max(1, round(sum(host.weight for host in self.hosts)))
+
+    def check_all(self):
+        """Probe every host once, ejecting the ones that do not answer."""
+        for host in self.hosts:
+            if check_health(host.url):
+                print(f"  {host.url} (weight {host.weight:g}): healthy")
+            else:
+                print(f"  {host.url} (weight {host.weight:g}): no answer, ejected for {self.cooldown_seconds:g}s")
+                with self._lock:
+                    self._eject(host)
+
+    def _eject(self, host: Host):
+        host.ejected_until = time.perf_counter() + self.cooldown_seconds
+        host.stats.ejections += 1
+
+    def _probe_due_hosts(self):
+        """Health-check ejected hosts whose cooldown ran out (outside the lock; one prober per host)."""
+        now = time.perf_counter()
+        with self._lock:
+            due = [host for host in self.hosts if not host.healthy and not host.probing and host.ejected_until <= now]
+            for host in due:
+                host.probing = True
+        for host in due:
+            healthy = check_health(host.url)
+            with self._lock:
+                host.probing = False
+                if healthy:
+                    host.ejected_until, host.consecutive_failures = 0.0, 0
+                    print(f"\nINFO: Ollama host {host.url} passed its health check and is back in the pool.")
+                else:
+                    host.ejected_until = time.perf_counter() + self.cooldown_seconds
+
+    def acquire(self, exclude: Optional[Set[str]] = None) -> Host:
+        """
+        The host for the next request; pair every call with `release`.
+        Healthy hosts outside `exclude` (the ones a retry already tried) come
+        first, then healthy excluded ones, then the ejected host due back first.
+        """
+        self._probe_due_hosts()
+        with self._lock:
+            exclude = exclude or set()
+            healthy = [host for host in self.hosts if host.healthy]
+            preferred = [host for host in healthy if host.url not in exclude] or healthy
+            if preferred:
+                host = min(preferred, key=lambda h: (h.outstanding / h.weight, h.stats.requests / h.weight))
+            else:
+                host = min(self.hosts, key=lambda h: h.ejected_until)
+            host.outstanding += 1
+            return host
+
+    def release(self, host: Host, ok: bool, seconds: float, prompt_tokens: int = 0, generated_tokens: int = 0):
+        """Record a finished request; `max_failures` failures in a row eject the host."""
+        now = time.perf_counter()
+        with self._lock:
+            host.outstanding -= 1
+            stats = host.stats
+            stats.requests += 1
+            stats.busy_seconds += seconds
+            stats.prompt_tokens += prompt_tokens
+            stats.generated_tokens += generated_tokens
+            stats.first_request = stats.first_request if stats.first_request is not None else now - seconds
+            stats.last_request = now
+            if ok:
+                host.consecutive_failures = 0
+                return
+            stats.failures += 1
+            host.consecutive_failures += 1
+            if host.healthy and host.consecutive_failures >= self.max_failures:
+                self._eject(host)
+                print(f"\nWARNING: Ollama host {host.url} failed {host.consecutive_failures} requests in a row; "
+                      f"ejected for {self.cooldown_seconds:g}s.")
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-host counters and throughput, in configuration order."""
+        rows = []
+        with self._lock:
+            for host in self.hosts:
+                stats = host.stats
+                span = (stats.last_request - stats.first_request) if stats.first_request is not None else 0.0
+                succeeded = stats.requests - stats.failures
+                rows.append({
+                    'url': host.url,
+                    'weight': host.weight,
+                    'requests': stats.requests,
+                    'failures': stats.failures,
+                    'ejections': stats.ejections,
+                    'healthy': host.healthy,
+                    'busy_seconds': round(stats.busy_seconds, 3),
+                    'chunks_per_second': round(succeeded / span, 3) if span > 0 else None,
+                    'generated_tokens': stats.generated_tokens,
+                    'generated_tokens_per_second': (round(stats.generated_tokens / span, 2) if span > 0 else None),
+                    'prompt_tokens': stats.prompt_tokens,
+                })
+        return rows
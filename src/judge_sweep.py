@@ -0,0 +1,270 @@
+"""
+Judge Sweep Module - Re-applies judge thresholds offline from the stored scores.
+
+`run_judge_pipeline.py` keeps every judged interaction with its raw scores
+(the `judged` list of `llm_results/<book>_judged/chapter_XXX.json`). Here they
+are loaded into flat arrays and every accept threshold is evaluated at once.
+An interaction is accepted at threshold t when the judge's verdict is
+"accept", its aggregate score is at least t and it is not below the reject
+threshold, exactly as in `filter_by_verdict`. Acceptance counts and gold
+matches for all thresholds are then `searchsorted` lookups into sorted
+scores, so a full sweep costs no API calls and takes milliseconds.
+
+`materialise` writes the filtered output for one threshold as a new run,
+`llm_results/<book>_judged_t070/`, which `run_evaluation.py` and
+`build_graph.py` read like any other extraction run.
+"""
+
+import csv
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.evaluation_metrics import MATCH_MODES, DocumentKey, InteractionCodebook, _prf
+
+JUDGED_SUFFIX = "_judged"
+VERDICTS = ("accept", "needs_review", "reject")
+BUCKETS = ("accepted", "needs_review", "rejected")
+
+
+@dataclass
+class JudgedScores:
+    """Every judged interaction of one or more books, as flat arrays."""
+    documents: List[DocumentKey]       # Every judged chapter, including ones with nothing judged
+    records: List[Dict[str, Any]]      # Judged interactions as stored, grouped by document
+    offsets: np.ndarray                # (documents + 1,) start of each document in `records`
+    score: np.ndarray                  # (records,) aggregate score
+    verdict: np.ndarray                # (records,) index into VERDICTS
+
+    @property
+    def books(self) -> List[str]:
+        return sorted({book for book, _ in self.documents})
+
+    def by_document(self) -> Dict[DocumentKey, List[Dict[str, Any]]]:
+        return {key: self.records[self.offsets[d]:self.offsets[d + 1]] for d, key in enumerate(self.documents)}
+
+    def eligible(self, reject_threshold: float) -> np.ndarray:
+        """Interactions that some accept threshold would accept."""
+        return (self.verdict == VERDICTS.index("accept")) & (self.score >= reject_threshold)
+
+    def buckets(self, accept_threshold: float, reject_threshold: float) -> np.ndarray:
+        """Index into BUCKETS of every interaction, as `filter_by_verdict` would assign it."""
+        rejected = (self.verdict == VERDICTS.index("reject")) | (self.score < reject_threshold)
+        accepted = ~rejected & (self.verdict == VERDICTS.index("accept")) & (self.score >= accept_threshold)
+        return np.where(accepted, 0, np.where(rejected, 2, 1))
+
+
+def _judged_records(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if 'judged' in data:
+        return data['judged']
+    # Written before raw scores were stored: the buckets still hold every judged interaction
+    records = data.get('accepted', []) + data.get('needs_review', []) + data.get('rejected', [])
+    return sorted(records, key=lambda record: record.get('interaction_index') or 0)
+
+
+def _verdict(record: Dict[str, Any]) -> str:
+    # Stored as "accept", or as "Verdict.ACCEPT" when the enum was written with str()
+    return str(record.get('verdict', 'needs_review')).lower().split('.')[-1]
+
+
+def load_judged_scores(results_dir: Path, books: Sequence[str]) -> JudgedScores:
+    """Load `<book>_judged/chapter_XXX.json` of every book."""
+    documents, records, offsets = [], [], [0]
+    for book in books:
+        for file_path in sorted((Path(results_dir) / f"{book}{JUDGED_SUFFIX}").glob("chapter_*.json")):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                records.extend(_judged_records(json.load(f)))
+            documents.append((book, int(file_path.stem.split('_')[-1])))
+            offsets.append(len(records))
+    return JudgedScores(
+        documents=documents,
+        records=records,
+        offsets=np.array(offsets, dtype=np.int64),
+        score=np.array([float(record.get('aggregate_score', 0.0)) for record in records]),
+        verdict=np.array([VERDICTS.index(_verdict(record)) for record in records], dtype=np.int64),
+    )
+
+
+def _at_least(sorted_values: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """How many of `sorted_values` are >= each threshold."""
+    return len(sorted_values) - np.searchsorted(sorted_values, thresholds, side='left')
+
+
+@dataclass
+class ThresholdSweep:
+    """Bucket sizes and gold scores of the accepted set at every accept threshold."""
+    thresholds: np.ndarray
+    reject_threshold: float
+    judged: int
+    accepted: np.ndarray               # (thresholds,) accepted interactions
+    rejected: int                      # Does not depend on the accept threshold
+    gold_documents: int                # Judged chapters that have gold annotations
+    counts: Dict[str, np.ndarray]      # mode -> (3, thresholds) TP/FP/FN of the accepted set
+
+    @property
+    def needs_review(self) -> np.ndarray:
+        return self.judged - self.accepted - self.rejected
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One row per threshold: bucket rates plus P/R/F1 per match mode."""
+        judged = max(self.judged, 1)
+        rows = [{"threshold": float(t), "accepted": int(self.accepted[i]),
+                 "needs_review": int(self.needs_review[i]), "rejected": self.rejected,
+                 "acceptance_rate": self.accepted[i] / judged, "review_rate": self.needs_review[i] / judged,
+                 "rejection_rate": self.rejected / judged}
+                for i, t in enumerate(self.thresholds)]
+        for mode, (tp, fp, fn) in self.counts.items():
+            precision, recall, f1 = _prf(tp, fp, fn)
+            for i, row in enumerate(rows):
+                row.update({f"{mode}_precision": float(precision[i]), f"{mode}_recall": float(recall[i]),
+                            f"{mode}_f1_score": float(f1[i])})
+        return rows
+
+    def best_threshold(self, mode: str = "strict") -> Optional[float]:
+        """Lowest threshold with the highest F1, or None without gold."""
+        if not self.gold_documents:
+            return None
+        return float(self.thresholds[np.argmax(_prf(*self.counts[mode])[2])])
+
+
+def sweep_thresholds(
+    scores: JudgedScores,
+    gold: Dict[DocumentKey, List[Dict[str, Any]]],
+    thresholds: np.ndarray,
+    reject_threshold: float = 0.3,
+    name_resolver: Optional[Callable[[str], Optional[str]]] = None,
+) -> ThresholdSweep:
+    """
+    Evaluate every accept threshold in one pass.
+
+    Matching follows `evaluate_corpus`: interactions are interned per
+    (chapter, pair[, type]) and duplicates count once, so a key is accepted
+    from the lowest threshold its best eligible score reaches. Only judged
+    chapters with gold annotations are scored against the gold.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    eligible = scores.eligible(reject_threshold)
+    accepted = _at_least(np.sort(scores.score[eligible]), thresholds)
+    rejected = int(np.count_nonzero(scores.buckets(np.inf, reject_threshold) == 2))
+
+    documents = [key for key in scores.documents if key in gold]
+    document_index = {key: d for d, key in enumerate(documents)}
+    codebook = InteractionCodebook(name_resolver)
+    gold_codes = codebook.encode({key: gold[key] for key in documents}, document_index)
+    judged_by_document = scores.by_document()
+    pred_codes = codebook.encode({key: judged_by_document[key] for key in documents}, document_index)
+    # Position of every encoded prediction in the flat score arrays
+    position = {key: d for d, key in enumerate(scores.documents)}
+    starts = np.array([scores.offsets[position[key]] for key in documents], dtype=np.int64)
+    rows = starts[pred_codes["document"]] + pred_codes["row"]
+
+    P, T = max(len(codebook.pairs), 1), max(len(codebook.types), 1)
+    keys = {
+        "strict": ((gold_codes["document"] * P + gold_codes["pair"]) * T + gold_codes["type"],
+                   (pred_codes["document"] * P + pred_codes["pair"]) * T + pred_codes["type"]),
+        "flexible": (gold_codes["document"] * P + gold_codes["pair"],
+                     pred_codes["document"] * P + pred_codes["pair"]),
+    }
+    counts = {}
+    for mode in MATCH_MODES:
+        gold_keys, pred_keys = keys[mode]
+        gold_unique = np.unique(gold_keys)
+        pred_unique, inverse = np.unique(pred_keys, return_inverse=True)
+        # Best eligible score of each distinct predicted key
+        best = np.full(len(pred_unique), -np.inf)
+        np.maximum.at(best, inverse, np.where(eligible[rows], scores.score[rows], -np.inf))
+        hit = np.isin(pred_unique, gold_unique, assume_unique=True)
+        tp = _at_least(np.sort(best[hit]), thresholds)
+        fp = _at_least(np.sort(best[~hit]), thresholds)
+        counts[mode] = np.stack([tp, fp, len(gold_unique) - tp])
+
+    return ThresholdSweep(thresholds=thresholds, reject_threshold=reject_threshold, judged=len(scores.records),
+                          accepted=accepted, rejected=rejected, gold_documents=len(documents), counts=counts)
+
+
+def generate_sweep_report(sweep: ThresholdSweep, name: str, every: float = 0.05) -> str:
+    """Threshold table at `every` steps plus the best thresholds against the gold."""
+    lines = [
+        "=" * 60,
+        f"JUDGE THRESHOLD SWEEP: {name}",
+        "=" * 60,
+        f"  Judged interactions: {sweep.judged}",
+        f"  Reject threshold:    {sweep.reject_threshold}",
+        f"  Gold chapters:       {sweep.gold_documents}",
+        "",
+    ]
+    for mode in MATCH_MODES:
+        best = sweep.best_threshold(mode)
+        if best is not None:
+            lines.append(f"  Best {mode} F1 at accept threshold {best:.2f}")
+    lines.extend(["", f"  {'Accept >=':>9} {'Accepted':>9} {'Review':>8} {'Rejected':>9} "
+                      f"{'P':>7} {'R':>7} {'F1':>7}", "  " + "-" * 62])
+    marks = np.round(sweep.thresholds / every, 6)
+    for row, mark in zip(sweep.rows(), marks):
+        if mark != np.round(mark):
+            continue
+        gold_columns = (f" {row['strict_precision']:>7.3f} {row['strict_recall']:>7.3f} {row['strict_f1_score']:>7.3f}"
+                        if sweep.gold_documents else "")
+        lines.append(f"  {row['threshold']:>9.2f} {row['acceptance_rate']:>9.1%} {row['review_rate']:>8.1%} "
+                     f"{row['rejection_rate']:>9.1%}{gold_columns}")
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+
+def save_sweep(sweep: ThresholdSweep, name: str, output_dir: Path) -> Tuple[Path, Path, Path]:
+    """Write `<name>_threshold_sweep.txt`, `.json` and `.csv`."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rows = sweep.rows()
+    report_path = output_dir / f"{name}_threshold_sweep.txt"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(generate_sweep_report(sweep, name) + "\n")
+
+    json_path = output_dir / f"{name}_threshold_sweep.json"
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({"name": name, "judged": sweep.judged, "reject_threshold": sweep.reject_threshold,
+                   "gold_documents": sweep.gold_documents,
+                   "best_thresholds": {mode: sweep.best_threshold(mode) for mode in MATCH_MODES},
+                   "curve": rows}, f, indent=2)
+
+    csv_path = output_dir / f"{name}_threshold_sweep.csv"
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["threshold"])
+        writer.writeheader()
+        writer.writerows(rows)
+    return report_path, json_path, csv_path
+
+
+def materialised_run_name(accept_threshold: float) -> str:
+    """Run name of a materialised threshold, e.g. 'judged_t070' for 0.7."""
+    return f"{JUDGED_SUFFIX.lstrip('_')}_t{round(accept_threshold * 100):03d}"
+
+
+def materialise(scores: JudgedScores, accept_threshold: float, reject_threshold: float,
+                results_dir: Path) -> List[Path]:
+    """
+    Write the judge buckets for one threshold pair as
+    `<results_dir>/<book>_judged_tNNN/chapter_XXX.json`; the accepted
+    interactions are the file's `interactions`. Returns the run directories.
+    """
+    buckets = scores.buckets(accept_threshold, reject_threshold)
+    run_dirs = {}
+    for d, (book, chapter) in enumerate(scores.documents):
+        run_dir = run_dirs.get(book)
+        if run_dir is None:
+            run_dir = run_dirs[book] = Path(results_dir) / f"{book}_{materialised_run_name(accept_threshold)}"
+            run_dir.mkdir(parents=True, exist_ok=True)
+        start, end = scores.offsets[d], scores.offsets[d + 1]
+        chapter_buckets: Dict[str, List[Dict[str, Any]]] = {name: [] for name in BUCKETS}
+        for record, bucket in zip(scores.records[start:end], buckets[start:end]):
+            chapter_buckets[BUCKETS[bucket]].append({**record, 'needs_human_review': bool(bucket == 1)})
+
+        with open(run_dir / f"chapter_{chapter:03d}.json", 'w', encoding='utf-8') as f:
+            json.dump({'chapter': f"chapter_{chapter:03d}", 'accept_threshold': accept_threshold,
+                       'reject_threshold': reject_threshold, 'interactions': chapter_buckets['accepted'],
+                       'needs_review': chapter_buckets['needs_review'], 'rejected': chapter_buckets['rejected']},
+                      f, indent=2, ensure_ascii=False)
+    return list(run_dirs.values())
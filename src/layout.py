@@ -0,0 +1,139 @@
+"""
+Layout Module - Seeded, vectorised ForceAtlas2 for pre-computed node positions.
+
+The interactive reports used to run ForceAtlas2 physics in the browser, which
+is slow to settle on the denser book graphs. This computes the same kind of
+layout once in NumPy (degree-weighted repulsion, weighted linear attraction,
+gravity, and Gephi's adaptive swing/traction speed control), so the HTML can
+be rendered with physics switched off.
+"""
+
+import math
+from typing import Dict, Tuple
+
+import networkx as nx
+import numpy as np
+
+
+def forceatlas2_layout(G: nx.Graph, iterations: int = 300, seed: int = 42, weight: str = 'weight',
+                       scaling_ratio: float = 2.0, gravity: float = 1.0, jitter_tolerance: float = 1.0,
+                       extent: float = 400.0) -> Dict[str, Tuple[float, float]]:
+    """
+    Node positions from ForceAtlas2, scaled to fit within [-extent, extent].
+
+    Repulsion is computed for all node pairs at once (O(n^2) memory), which is
+    fine for per-book and whole-novel graphs of a few hundred characters.
+    """
+    nodes = list(G.nodes())
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: (0.0, 0.0)}
+
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data=True))
+    src = np.array([index[u] for u, _, _ in edges], dtype=np.int64)
+    dst = np.array([index[v] for _, v, _ in edges], dtype=np.int64)
+    w = np.array([float(data.get(weight, 1)) for _, _, data in edges])
+
+    mass = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n) + 1.0
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1.0, 1.0, size=(n, 2)) * math.sqrt(n)
+
+    prev_force = np.zeros((n, 2))
+    speed, speed_efficiency = 1.0, 1.0
+    mass_product = scaling_ratio * np.outer(mass, mass)
+
+    for _ in range(iterations):
+        # Repulsion: k_r * m_i * m_j / d along the unit vector
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist2 = np.einsum('ijk,ijk->ij', delta, delta)
+        np.fill_diagonal(dist2, np.inf)
+        dist2 = np.maximum(dist2, 1e-9)
+        force = np.einsum('ij,ijk->ik', mass_product / dist2, delta)
+
+        # Attraction along edges, linear in distance and in edge weight
+        pull = w[:, None] * (pos[src] - pos[dst])
+        np.add.at(force, src, -pull)
+        np.add.at(force, dst, pull)
+
+        # Gravity towards the origin, proportional to mass
+        norm = np.linalg.norm(pos, axis=1)
+        force -= (gravity * mass / np.maximum(norm, 1e-9))[:, None] * pos
+
+        # Adaptive speed (Jacomy et al., 2014): damp oscillating nodes
+        swinging = mass * np.linalg.norm(force - prev_force, axis=1)
+        traction = mass * np.linalg.norm(force + prev_force, axis=1) / 2
+        total_swinging, total_traction = swinging.sum(), traction.sum()
+
+        estimated_jitter = 0.05 * math.sqrt(n)
+        jitter = jitter_tolerance * max(math.sqrt(estimated_jitter),
+                                        min(10.0, estimated_jitter * total_traction / n ** 2))
+        if total_traction > 0 and total_swinging / total_traction > 2.0:
+            if speed_efficiency > 0.05:
+                speed_efficiency *= 0.5
+            jitter = max(jitter, jitter_tolerance)
+        target_speed = jitter * speed_efficiency * total_traction / max(total_swinging, 1e-9)
+        if total_swinging > jitter * total_traction:
+            if speed_efficiency > 0.05:
+                speed_efficiency *= 0.7
+        elif speed < 1000:
+            speed_efficiency *= 1.3
+        speed += min(target_speed - speed, 0.5 * speed)
+
+        node_speed = speed / (1.0 + np.sqrt(speed * swinging))
+        pos += force * node_speed[:, None]
+        prev_force = force
+
+    pos -= pos.mean(axis=0)
+    span = np.abs(pos).max()
+    if span > 0:
+        pos *= extent / span
+    return {node: (float(x), float(y)) for node, (x, y) in zip(nodes, pos)}
+
+
+def community_layout(G: nx.Graph, partition: Dict[str, int], iterations: int = 200, seed: int = 42,
+                     weight: str = 'weight', extent: float = 1000.0) -> Dict[str, Tuple[float, float]]:
+    """
+    Two-level layout for large graphs: communities first, then members.
+
+    The community graph (summed inter-community weights) is laid out with
+    ForceAtlas2, and each community's subgraph is laid out independently and
+    placed around its community's position, scaled by sqrt(size). Cost is
+    O(c^2 + sum of s_i^2) instead of O(n^2), and members of a community stay
+    together, which the level-of-detail viewer relies on when collapsing them.
+    """
+    if not G.nodes:
+        return {}
+
+    members: Dict[int, list] = {}
+    for node in G.nodes():
+        members.setdefault(partition.get(node, 0), []).append(node)
+
+    community_graph = nx.Graph()
+    community_graph.add_nodes_from(members)
+    for u, v, data in G.edges(data=True):
+        cu, cv = partition.get(u, 0), partition.get(v, 0)
+        if cu == cv:
+            continue
+        w = float(data.get(weight, 1))
+        if community_graph.has_edge(cu, cv):
+            community_graph[cu][cv][weight] += w
+        else:
+            community_graph.add_edge(cu, cv, **{weight: w})
+
+    centers = forceatlas2_layout(community_graph, iterations=iterations, seed=seed, weight=weight, extent=extent)
+    largest = max(len(nodes) for nodes in members.values())
+    # Radius of each cluster relative to the spacing of community centers
+    cluster_scale = extent / (2.0 * math.sqrt(max(len(members), 1)))
+
+    positions: Dict[str, Tuple[float, float]] = {}
+    for community, nodes in members.items():
+        cx, cy = centers[community]
+        radius = cluster_scale * math.sqrt(len(nodes) / largest)
+        local = forceatlas2_layout(G.subgraph(nodes), iterations=iterations, seed=seed + community,
+                                   weight=weight, extent=radius)
+        for node, (x, y) in local.items():
+            positions[node] = (cx + x, cy + y)
+    return positions
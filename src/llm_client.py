@@ -1,76 +1,143 @@
 import requests
 import json
-from typing import List, Optional, Dict
+import time
+from typing import Any, List, Optional, Dict, Tuple, Union
 from pydantic import ValidationError
 from src.schemas import LLMInteractionOutput, Interaction
+from src.telemetry import ChunkTelemetry
+from src.host_pool import HostPool, parse_hosts
+
+
+def heal_interaction_keys(interaction_dict: Dict) -> Dict:
+    """Fixes common key typos from the LLM before validation."""
+    healed_dict = {}
+    for key, value in interaction_dict.items():
+        # Remove trailing commas or spaces from keys
+        cleaned_key = key.replace(',', '').strip()
+        healed_dict[cleaned_key] = value
+    return healed_dict
+
+
+def parse_llm_output(json_string: str) -> Optional[LLMInteractionOutput]:
+    """
+    Resiliently parses the model's raw JSON output, validating each
+    interaction individually. Returns None if nothing usable came back.
+    """
+    return parse_llm_output_counted(json_string)[0]
+
+
+def parse_llm_output_counted(json_string: str) -> Tuple[Optional[LLMInteractionOutput], int]:
+    """`parse_llm_output` plus the number of interaction objects that failed validation."""
+    try:
+        # 1. First, parse the raw string into a basic Python dictionary.
+        raw_data = json.loads(json_string)
+    except json.JSONDecodeError as e:
+        # This catches cases where the LLM's entire output is not even valid JSON
+        print(f"\nERROR: LLM output was not valid JSON. Details: {e}")
+        print(f"--- LLM Raw Output ---\n{json_string}\n--------------------")
+        return None, 0
+
+    # 2. Extract the list of interactions. If it's not there, it's a major failure.
+    unvalidated_interactions = raw_data.get("interactions") if isinstance(raw_data, dict) else None
+    if unvalidated_interactions is None:
+        print(
+            f"\nWARNING: LLM response was valid JSON but missing the required 'interactions' key. Output ignored.")
+        print(f"--- LLM Raw Output ---\n{json_string}\n--------------------")
+        return None, 0
+
+    # 3. Iterate and validate each interaction individually.
+    valid_interactions: List[Interaction] = []
+    invalid = 0
+    for interaction_dict in unvalidated_interactions:
+        try:
+            # First, try to heal any common key typos
+            healed_dict = heal_interaction_keys(interaction_dict)
+            # Now, validate the single interaction against the Interaction schema
+            validated_interaction = Interaction.model_validate(healed_dict)
+            valid_interactions.append(validated_interaction)
+        except ValidationError as e:
+            print(f"\nWARNING: Skipping one malformed interaction object. Details:\n{e}")
+            print(f"--- Invalid Interaction Object ---\n{interaction_dict}\n--------------------")
+            invalid += 1
+            continue  # Skip this bad interaction and continue to the next one
+
+    # 4. Reassemble the final, fully validated Pydantic object.
+    return LLMInteractionOutput(interactions=valid_interactions), invalid
 
 
 class LLMClient:
     """
-    A client to handle communication with a local Ollama LLM instance.
-    This version includes a resilient parser that validates interactions individually
-    to maximize data recovery from imperfect LLM outputs.
+    A client to handle communication with one or more Ollama instances.
+    Responses go through `parse_llm_output`, which validates interactions
+    individually to maximize data recovery from imperfect LLM outputs.
+
+    `host` is `models.llm_host`: one URL or a list of weighted hosts, which
+    are scheduled by a `HostPool` (see `src/host_pool.py`). A failed request
+    is retried on up to `retries` other hosts.
     """
 
-    def __init__(self, host: str):
-        self.api_url = f"{host}/api/generate"
-        print(f"LLM Client initialized for Ollama GENERATE server at {self.api_url}")
+    def __init__(self, host: Union[str, List[Any]], retries: int = 2, max_failures: int = 3,
+                 cooldown_seconds: float = 30.0):
+        self.pool = HostPool(parse_hosts(host), max_failures=max_failures, cooldown_seconds=cooldown_seconds)
+        self.retries = min(retries, len(self.pool.hosts) - 1)
+        if len(self.pool.hosts) == 1:
+            self.api_url = f"{self.pool.hosts[0].url}/api/generate"
+            print(f"LLM Client initialized for Ollama GENERATE server at {self.api_url}")
+        else:
+            print(f"LLM Client initialized for {len(self.pool.hosts)} Ollama GENERATE servers "
+                  f"({self.pool.capacity} concurrent requests):")
+            self.pool.check_all()
 
-    def _heal_interaction_keys(self, interaction_dict: Dict) -> Dict:
-        """Fixes common key typos from the LLM before validation."""
-        healed_dict = {}
-        for key, value in interaction_dict.items():
-            # Remove trailing commas or spaces from keys
-            cleaned_key = key.strip().replace(',', '')
-            healed_dict[cleaned_key] = value
-        return healed_dict
+    def generate(self, model_name: str, prompt: str,
+                 queued_at: Optional[float] = None) -> Tuple[Optional[LLMInteractionOutput], ChunkTelemetry]:
+        """
+        Sends a prompt to Ollama and resiliently parses the response. Also
+        returns the call's token counts and timings; `queued_at` is the
+        `time.perf_counter()` at which the caller took up the chunk.
+        """
+        telemetry = ChunkTelemetry(model=model_name, prompt_chars=len(prompt))
+        payload = {"model": model_name, "prompt": prompt, "stream": False, "format": "json"}
+        tried = set()
+        response_data = None
+        while response_data is None and telemetry.attempts <= self.retries:
+            host = self.pool.acquire(exclude=tried)
+            tried.add(host.url)
+            sent = time.perf_counter()
+            if telemetry.attempts == 0:
+                telemetry.queue_seconds = sent - queued_at if queued_at is not None else 0.0
+            telemetry.attempts += 1
+            telemetry.host = host.url
+            try:
+                response = requests.post(f"{host.url}/api/generate", json=payload, timeout=600)
+                response.raise_for_status()
+                response_data = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self.pool.release(host, ok=False, seconds=time.perf_counter() - sent)
+                retrying = telemetry.attempts <= self.retries
+                print(f"\nERROR: Could not connect to Ollama server {host.url}"
+                      f"{'; retrying on another host' if retrying else ''}. Details: {e}")
+                telemetry.http_seconds += time.perf_counter() - sent
+                continue
+            telemetry.http_seconds += time.perf_counter() - sent
+            telemetry.read_response(response_data)
+            self.pool.release(host, ok=True, seconds=time.perf_counter() - sent,
+                              prompt_tokens=telemetry.prompt_eval_count, generated_tokens=telemetry.eval_count)
+        if response_data is None:
+            telemetry.status = "request_failed"
+            return None, telemetry
+
+        parse_start = time.perf_counter()
+        output, telemetry.invalid_interactions = parse_llm_output_counted(response_data.get("response", "{}"))
+        telemetry.parse_seconds = time.perf_counter() - parse_start
+        if output is None:
+            telemetry.status = "unparsed"
+        else:
+            telemetry.interactions = len(output.interactions)
+        return output, telemetry
 
     def get_llm_response(self, model_name: str, prompt: str) -> Optional[LLMInteractionOutput]:
         """
         Sends a prompt to Ollama and resiliently parses the response,
         validating each interaction individually.
         """
-        try:
-            payload = {"model": model_name, "prompt": prompt, "stream": False, "format": "json"}
-            response = requests.post(self.api_url, json=payload, timeout=600)
-            response.raise_for_status()
-
-            response_data = response.json()
-            json_string = response_data.get("response", "{}")
-
-            # 1. First, parse the raw string into a basic Python dictionary.
-            raw_data = json.loads(json_string)
-
-            # 2. Extract the list of interactions. If it's not there, it's a major failure.
-            unvalidated_interactions = raw_data.get("interactions")
-            if unvalidated_interactions is None:
-                print(
-                    f"\nWARNING: LLM response was valid JSON but missing the required 'interactions' key. Output ignored.")
-                print(f"--- LLM Raw Output ---\n{json_string}\n--------------------")
-                return None
-
-            # 3. Iterate and validate each interaction individually.
-            valid_interactions: List[Interaction] = []
-            for interaction_dict in unvalidated_interactions:
-                try:
-                    # First, try to heal any common key typos
-                    healed_dict = self._heal_interaction_keys(interaction_dict)
-                    # Now, validate the single interaction against the Interaction schema
-                    validated_interaction = Interaction.model_validate(healed_dict)
-                    valid_interactions.append(validated_interaction)
-                except ValidationError as e:
-                    print(f"\nWARNING: Skipping one malformed interaction object. Details:\n{e}")
-                    print(f"--- Invalid Interaction Object ---\n{interaction_dict}\n--------------------")
-                    continue  # Skip this bad interaction and continue to the next one
-
-            # 4. Reassemble the final, fully validated Pydantic object.
-            return LLMInteractionOutput(interactions=valid_interactions)
-
-        except requests.exceptions.RequestException as e:
-            print(f"\nERROR: Could not connect to Ollama server. Details: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            # This catches cases where the LLM's entire output is not even valid JSON
-            print(f"\nERROR: LLM output was not valid JSON. Details: {e}")
-            print(f"--- LLM Raw Output ---\n{json_string}\n--------------------")
-            return None
\ No newline at end of file
+        return self.generate(model_name, prompt)[0]
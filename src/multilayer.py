@@ -0,0 +1,211 @@
+"""
+Multilayer Network - One weighted layer per interaction type.
+
+`build_interaction_graph` counts every interaction into a per-type edge
+attribute (`w_direct_dialogue`, `w_physical_action`, ...) in the same pass
+that builds the graph, so type-specific questions no longer need the
+JSON-encoded `details`. The layers are the `InteractionType` vocabulary of
+`src/schemas.py` plus "Other". This module turns those attributes into a
+layer x pair weight matrix over interned character ids and computes
+per-layer and cross-layer centralities with the vectorised functions in
+`src.network_math`.
+"""
+
+import csv
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, get_args
+
+import networkx as nx
+import numpy as np
+
+from src.network_math import degree_and_strength, eigenvector_centrality, normalized_degree, pagerank
+from src.vocabulary import InteractionType
+
+OTHER_LAYER = "Other"
+# The controlled vocabulary, plus a layer for anything the LLM returned outside it
+LAYERS: List[str] = list(get_args(InteractionType)) + [OTHER_LAYER]
+
+
+def layer_slug(layer: str) -> str:
+    """File- and attribute-safe name of a layer, e.g. 'Memory/Reference' -> 'memory_reference'."""
+    return re.sub(r"[^0-9a-z]+", "_", layer.lower()).strip("_")
+
+
+def layer_attribute(layer: str) -> str:
+    """Edge attribute holding a layer's interaction count."""
+    return f"w_{layer_slug(layer)}"
+
+
+def interaction_layer(interaction_type: Optional[str]) -> str:
+    """The layer an extracted interaction belongs to."""
+    return interaction_type if interaction_type in LAYERS else OTHER_LAYER
+
+
+def layer_subgraph(G: nx.Graph, layer: str) -> nx.Graph:
+    """
+    The graph restricted to one interaction type: weights are that layer's
+    counts and `details` keep only interactions of that type.
+    """
+    attribute = layer_attribute(layer)
+    H = nx.Graph(**G.graph)
+    for u, v, data in G.edges(data=True):
+        details = [d for d in data.get('details', []) if interaction_layer(d.get('type')) == layer]
+        # Artifacts written before the per-type counts fall back to counting details
+        weight = data.get(attribute, len(details))
+        if weight:
+            H.add_edge(u, v, weight=weight, details=details, **{attribute: weight})
+    return H
+
+
+class MultilayerNetwork:
+    """
+    Interaction-type layers over shared character and pair ids.
+
+    `weights[l, p]` is the number of interactions of type LAYERS[l] between
+    characters `pair_u[p]` and `pair_v[p]`.
+    """
+
+    def __init__(self, characters: List[str], pair_u: np.ndarray, pair_v: np.ndarray, weights: np.ndarray,
+                 layers: Optional[List[str]] = None):
+        self.characters = characters
+        self.character_index = {name: i for i, name in enumerate(characters)}
+        self.pair_u = pair_u
+        self.pair_v = pair_v
+        self.weights = weights
+        self.layers = layers or list(LAYERS)
+
+    @classmethod
+    def from_graph(cls, G: nx.Graph) -> 'MultilayerNetwork':
+        """Read the per-type edge attributes (decoding `details` only for artifacts that predate them)."""
+        characters = sorted(G.nodes())
+        index = {name: i for i, name in enumerate(characters)}
+        edges = list(G.edges(data=True))
+        pair_u = np.array([index[u] for u, _, _ in edges], dtype=np.int64)
+        pair_v = np.array([index[v] for _, v, _ in edges], dtype=np.int64)
+        weights = np.zeros((len(LAYERS), len(edges)))
+        for p, (_, _, data) in enumerate(edges):
+            if layer_attribute(LAYERS[0]) in data:
+                weights[:, p] = [data.get(layer_attribute(layer), 0) for layer in LAYERS]
+            else:
+                for detail in data.get('details', []):
+                    weights[LAYERS.index(interaction_layer(detail.get('type'))), p] += 1
+        return cls(characters, pair_u, pair_v, weights)
+
+    # --- Persistence ---
+
+    def save(self, output_path: Path):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(output_path, characters=np.array(self.characters), layers=np.array(self.layers),
+                            pair_u=self.pair_u, pair_v=self.pair_v, weights=self.weights)
+
+    @classmethod
+    def load(cls, path: Path) -> 'MultilayerNetwork':
+        with np.load(path) as data:
+            return cls(data['characters'].tolist(), data['pair_u'], data['pair_v'], data['weights'],
+                       data['layers'].tolist())
+
+    # --- Queries ---
+
+    @property
+    def num_characters(self) -> int:
+        return len(self.characters)
+
+    def layer_weights(self, layer: str) -> np.ndarray:
+        return self.weights[self.layers.index(layer)]
+
+    def layer_totals(self) -> Dict[str, int]:
+        """Interactions per layer."""
+        return {layer: int(total) for layer, total in zip(self.layers, self.weights.sum(axis=1))}
+
+    def strength_matrix(self) -> np.ndarray:
+        """Layer x character interaction counts, in one pass over all layers."""
+        n, num_layers = self.num_characters, len(self.layers)
+        offsets = (np.arange(num_layers) * n)[:, None]
+        flat = (np.bincount((offsets + self.pair_u).ravel(), weights=self.weights.ravel(), minlength=num_layers * n) +
+                np.bincount((offsets + self.pair_v).ravel(), weights=self.weights.ravel(), minlength=num_layers * n))
+        return flat.reshape(num_layers, n)
+
+    def layer_centralities(self, layer: str) -> Dict[str, np.ndarray]:
+        """Degree centrality, strength, eigenvector and PageRank of one layer."""
+        n, w = self.num_characters, self.layer_weights(layer)
+        degree, strength = degree_and_strength(n, self.pair_u, self.pair_v, w)
+        return {
+            "degree_centrality": normalized_degree(degree),
+            "strength": strength,
+            "eigenvector": eigenvector_centrality(n, self.pair_u, self.pair_v, w),
+            "pagerank": pagerank(n, self.pair_u, self.pair_v, w),
+        }
+
+    def cross_layer_centralities(self) -> Dict[str, np.ndarray]:
+        """
+        Centralities that combine layers.
+
+        - strength: interactions summed over every layer;
+        - participation: multiplex participation coefficient, 1 when a
+          character's interactions are spread evenly over all layers and 0
+          when they are all of one type;
+        - dominant_layer: index into `layers` of the character's largest layer;
+        - eigenvector / pagerank: on the aggregated (all-types) graph.
+        """
+        strength_by_layer = self.strength_matrix()
+        total = strength_by_layer.sum(axis=0)
+        num_layers = len(self.layers)
+        shares = np.divide(strength_by_layer, total, out=np.zeros_like(strength_by_layer), where=total > 0)
+        participation = num_layers / (num_layers - 1) * (1 - (shares ** 2).sum(axis=0))
+        participation[total == 0] = 0.0
+        aggregate = self.weights.sum(axis=0)
+        return {
+            "strength": total,
+            "participation": participation,
+            "dominant_layer": strength_by_layer.argmax(axis=0),
+            "eigenvector": eigenvector_centrality(self.num_characters, self.pair_u, self.pair_v, aggregate),
+            "pagerank": pagerank(self.num_characters, self.pair_u, self.pair_v, aggregate),
+        }
+
+    def top_characters(self, scores: np.ndarray, top_n: int = 5) -> List[tuple]:
+        """Highest-scoring characters with a non-zero score, ties broken alphabetically."""
+        active = np.flatnonzero(scores > 0)
+        ranked = active[np.argsort(-scores[active], kind='stable')]
+        return [(self.characters[i], float(scores[i])) for i in ranked[:top_n]]
+
+    # --- Reports ---
+
+    def generate_report(self, top_n: int = 5, min_interactions: int = 10) -> str:
+        """Top characters per layer, and who spreads their interactions across types the most."""
+        report_lines = ["--- Interaction-Type Layers ---"]
+        for layer, total in self.layer_totals().items():
+            if not total:
+                continue
+            metrics = self.layer_centralities(layer)
+            report_lines.append(f"\n{layer} ({total} interactions)")
+            for i, (char, score) in enumerate(self.top_characters(metrics["strength"], top_n)):
+                report_lines.append(f"  {i + 1}. {char:<30} {int(score):>5} interactions | "
+                                    f"PageRank {metrics['pagerank'][self.character_index[char]]:.4f}")
+
+        cross = self.cross_layer_centralities()
+        report_lines.append(f"\n--- Top {top_n} Characters by Cross-Layer Participation "
+                            f"(at least {min_interactions} interactions) ---")
+        eligible = np.where(cross["strength"] >= min_interactions, cross["participation"], 0.0)
+        for char, score in self.top_characters(eligible, top_n):
+            dominant = self.layers[cross["dominant_layer"][self.character_index[char]]]
+            report_lines.append(f"  {char:<30} | Participation: {score:.4f} (mostly {dominant})")
+        return "\n".join(report_lines)
+
+    def export_centralities(self, output_path: Path):
+        """Long-format CSV: one row per layer x active character, plus an 'All' layer."""
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["layer", "character", "interactions", "degree_centrality", "eigenvector",
+                             "pagerank", "participation"])
+            cross = self.cross_layer_centralities()
+            for layer in self.layers:
+                metrics = self.layer_centralities(layer)
+                for i in np.flatnonzero(metrics["strength"] > 0):
+                    writer.writerow([layer, self.characters[i], int(metrics["strength"][i]),
+                                     f"{metrics['degree_centrality'][i]:.6f}", f"{metrics['eigenvector'][i]:.6f}",
+                                     f"{metrics['pagerank'][i]:.6f}", ""])
+            for i in np.flatnonzero(cross["strength"] > 0):
+                writer.writerow(["All", self.characters[i], int(cross["strength"][i]), "",
+                                 f"{cross['eigenvector'][i]:.6f}", f"{cross['pagerank'][i]:.6f}",
+                                 f"{cross['participation'][i]:.6f}"])
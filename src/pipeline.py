@@ -0,0 +1,151 @@
+"""
+Analysis Pipeline - Report and visualization stage for one graph artifact.
+
+`analyze_graph.py` runs this for a single book; `analyze_all.py` runs it for
+every book (and the combined novel) inside one process pool, reusing the
+graph that was just built instead of re-reading the extraction results.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import networkx as nx
+
+from src.settings import Settings
+from src.graph_builder import ChapterEdges
+from src.graph_manager import GraphManager, install_shared_assets
+from src.analytics_cache import (load_or_compute_analytics, memoized_page_path, prune_memoized_pages, render_text,
+                                 write_reports)
+from src.centrality import BetweennessConfig
+from src.multilayer import MultilayerNetwork
+from src.communities import (CommunityConfig, CommunityResult, community_graphs, detect_communities_batch,
+                             export_window_communities)
+from src.profiling import NULL_PROFILER
+
+REPORTS_DIR = Path("./analysis_reports")
+
+
+def betweenness_config_from_settings(settings: Settings) -> BetweennessConfig:
+    return BetweennessConfig(
+        mode=settings.BETWEENNESS_MODE,
+        pivots=settings.BETWEENNESS_PIVOTS,
+        seed=settings.BETWEENNESS_SEED,
+        workers=settings.BETWEENNESS_WORKERS,
+    )
+
+
+def community_config_from_settings(settings: Settings) -> CommunityConfig:
+    return CommunityConfig(
+        algorithm=settings.COMMUNITY_ALGORITHM,
+        seeds=settings.COMMUNITY_SEEDS,
+        seed=settings.COMMUNITY_SEED,
+        resolution=settings.COMMUNITY_RESOLUTION,
+        workers=settings.COMMUNITY_WORKERS,
+    )
+
+
+def community_cache_dir(settings: Settings) -> Path:
+    return settings.GRAPH_ARTIFACTS_DIR / "communities"
+
+
+def analytics_cache_dir(settings: Settings) -> Path:
+    return settings.GRAPH_ARTIFACTS_DIR / "analytics"
+
+
+def _render_page(output_path: Path, cached_path: Path, render: Callable[[], None]):
+    """Copy a memoized HTML page, or render it and memoize the result in place of the one it supersedes."""
+    if cached_path.exists():
+        shutil.copyfile(cached_path, output_path)
+        print(f"Visualization unchanged, reused {cached_path.name} -> {output_path}")
+        return
+    render()
+    if output_path.exists():
+        cached_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cached_path.with_name(f"{cached_path.name}.{os.getpid()}.tmp")
+        shutil.copyfile(output_path, temp_path)
+        os.replace(temp_path, cached_path)
+        prune_memoized_pages(cached_path)
+
+
+def analyze_graph_artifact(name: str, graph: nx.Graph, chapter_edges: ChapterEdges, settings: Settings,
+                           reports_dir: Path = REPORTS_DIR, visualize: bool = True, verbose: bool = True,
+                           communities: Optional[Dict[Tuple[str, Optional[int]], CommunityResult]] = None,
+                           top_n: Optional[int] = None, formats: Optional[List[str]] = None,
+                           profiler=NULL_PROFILER) -> Path:
+    """
+    Write the reports, temporal series and HTML visualization for one graph.
+
+    `communities` holds the partitions of the graph and its chapter windows
+    (see `community_graphs`) when the caller computed them in a batch;
+    otherwise they are computed here, through the same cache. The analytics
+    come from the hash-keyed cache, so when the graph is unchanged this only
+    renders. `top_n` and `formats` override the configured report settings;
+    `profiler` times the steps as stages (see `src/profiling.py`).
+
+    Returns the report directory.
+    """
+    top_n = top_n or settings.TOP_N_ANALYSIS
+    formats = formats or settings.REPORT_FORMATS
+    community_config = community_config_from_settings(settings)
+    if communities is None:
+        with profiler.stage("communities"):
+            communities = detect_communities_batch(
+                community_graphs(name, graph, chapter_edges, settings.TEMPORAL_WINDOW),
+                community_config, cache_dir=community_cache_dir(settings))
+
+    with profiler.stage("analytics"):
+        artifact = load_or_compute_analytics(graph, chapter_edges, analytics_cache_dir(settings),
+                                             betweenness=betweenness_config_from_settings(settings),
+                                             community_config=community_config,
+                                             communities=communities[(name, None)],
+                                             temporal_window=settings.TEMPORAL_WINDOW)
+
+    report_dir = reports_dir / name
+    if report_dir.exists():
+        shutil.rmtree(report_dir)
+    report_dir.mkdir(parents=True)
+
+    # Text / JSON / CSV reports and the per-chapter snapshot series, all rendered from the artifact
+    with profiler.stage("reports"):
+        written = write_reports(artifact, report_dir, formats=formats, top_n=top_n)
+        export_window_communities(report_dir / "communities_window.csv", communities)
+
+    # Interaction-type layers (read from the per-type edge counts, no 'details' decoding)
+    with profiler.stage("layers"):
+        layers = MultilayerNetwork.from_graph(graph)
+        with open(report_dir / "layers_report.txt", 'w', encoding='utf-8') as f:
+            f.write(layers.generate_report(top_n=top_n))
+        layers.export_centralities(report_dir / "layer_centralities.csv")
+    written += [report_dir / "layers_report.txt", report_dir / "layer_centralities.csv"]
+    print(f"Reports saved to {report_dir}: {', '.join(path.name for path in written)}")
+    if verbose and "text" in formats:
+        print("\n" + render_text(artifact, top_n))
+
+    if not visualize:
+        return report_dir
+
+    with profiler.stage("visualization"):
+        graph_manager = GraphManager.from_graph(graph, artifact=artifact)
+        pages_dir = analytics_cache_dir(settings)
+        if settings.VISUALIZATION in ("pyvis", "both"):
+            output_path = report_dir / f"{name}_network.html"
+            assets_dir = reports_dir / "assets"
+            install_shared_assets(assets_dir)
+            _render_page(output_path,
+                         memoized_page_path(pages_dir, name, artifact, "pyvis", seed=settings.LAYOUT_SEED,
+                                            iterations=settings.LAYOUT_ITERATIONS,
+                                            assets=os.path.relpath(assets_dir, report_dir)),
+                         lambda: graph_manager.save_interactive_visualization(
+                             output_path=output_path, layout_seed=settings.LAYOUT_SEED,
+                             layout_iterations=settings.LAYOUT_ITERATIONS, assets_dir=assets_dir,
+                             communities=artifact.community_result()))
+        if settings.VISUALIZATION in ("webgl", "both"):
+            output_path = report_dir / f"{name}_network_webgl.html"
+            _render_page(output_path, memoized_page_path(pages_dir, name, artifact, "webgl", seed=settings.LAYOUT_SEED),
+                         lambda: graph_manager.save_webgl_visualization(
+                             output_path=output_path, layout_seed=settings.LAYOUT_SEED,
+                             communities=artifact.community_result()))
+
+    return report_dir
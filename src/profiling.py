@@ -0,0 +1,270 @@
+"""
+Profiling Module - The `--profile` option of the pipeline's entry points.
+
+Scripts mark their stages with `profiler.stage("name")`. With `--profile`
+they then write a directory `run_logs/profile_<script>_<timestamp>/` with:
+
+- `stages.txt` / `stages.json`: calls, wall time, CPU time of the calling
+  thread and peak traced memory per stage (inclusive of nested stages;
+  repeated stages add up, also across threads running them in parallel);
+- `flamegraph.svg` / `stacks.folded`: a sampling profile of every Python
+  thread, rooted at the stage that thread was in. The folded stacks load into
+  speedscope or flamegraph.pl as well;
+- `memory.txt`: `tracemalloc` statistics of the allocations still alive when
+  each stage's most memory-hungry call ended.
+
+The profile is also written when a script exits early (`sys.exit`, an
+uncaught exception, Ctrl+C): `finish()` is registered with `atexit` and only
+writes once, and `stages.txt` then says the run ended early.
+
+Without `--profile` the scripts get `NULL_PROFILER`, whose `stage()` returns
+a shared no-op context manager. No sampler thread runs and `tracemalloc` stays
+off. `tracemalloc` slows allocation-heavy code down, so profiled wall times
+are inflated by roughly the same factor across stages. Worker processes
+(`betweenness_workers`, `community_workers`) are not sampled.
+"""
+
+import argparse
+import atexit
+import contextlib
+import json
+import sys
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+PROFILE_DIR = Path("./run_logs")
+SAMPLE_INTERVAL = 0.005                 # Seconds between stack samples
+MEMORY_TOP_N = 15                       # Allocation sites listed per stage
+SNAPSHOT_GROWTH = 1.25                  # A stage is re-snapshotted when its peak grew by this factor
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_bytes: int = 0
+
+
+class NullProfiler:
+    """What the scripts use without `--profile`: every call is a no-op."""
+    enabled = False
+    _NULL_STAGE = contextlib.nullcontext()
+
+    def stage(self, name: str):
+        return self._NULL_STAGE
+
+    def finish(self, complete: bool = True) -> Optional[Path]:
+        return None
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class Profiler:
+    """Stage timer, stack sampler and `tracemalloc` peak tracker for one script run."""
+    enabled = True
+
+    def __init__(self, name: str, output_root: Path = PROFILE_DIR, interval: float = SAMPLE_INTERVAL):
+        import tracemalloc
+
+        self.name = name
+        self.output_root = Path(output_root)
+        self.interval = interval
+        self.stages: Dict[str, StageStats] = {}
+        self.memory: Dict[str, List[str]] = {}
+        self.stacks: Dict[str, int] = {}
+        self._open: Dict[int, List[List]] = {}  # Thread -> [name, peak bytes so far] of the stages it runs
+        self._lock = threading.Lock()
+        self.snapshot_seconds = 0.0
+        self._tracemalloc = tracemalloc
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self.output_dir: Optional[Path] = None
+
+        tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        # Scripts call finish() at their end; this writes the profile when they exit before it
+        atexit.register(self.finish, complete=False)
+
+    # --- Stages and memory ---
+
+    def _fold_peak(self):
+        """Credit the peak since the last stage boundary to every open stage, then restart it (lock held)."""
+        _, peak = self._tracemalloc.get_traced_memory()
+        for open_stages in self._open.values():
+            for open_stage in open_stages:
+                open_stage[1] = max(open_stage[1], peak)
+        self._tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the block as `name`; stages nest, and threads each have their own."""
+        with self._lock:
+            self._fold_peak()
+            open_stages = self._open.setdefault(threading.get_ident(), [])
+            open_stages.append([name, 0])
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            with self._lock:
+                self._fold_peak()
+                _, peak = open_stages.pop()
+                stats = self.stages.setdefault(name, StageStats())
+                if name not in self.memory or peak > stats.peak_bytes * SNAPSHOT_GROWTH:
+                    # Snapshots walk every live allocation, so repeated stages only take one when they grew
+                    started = time.perf_counter()
+                    snapshot = self._tracemalloc.take_snapshot()
+                    self.memory[name] = [str(stat) for stat in snapshot.statistics('lineno')[:MEMORY_TOP_N]]
+                    self.snapshot_seconds += time.perf_counter() - started
+                stats.calls += 1
+                stats.wall_seconds += wall
+                stats.cpu_seconds += cpu
+                stats.peak_bytes = max(stats.peak_bytes, peak)
+
+    # --- Sampling ---
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stage = ";".join(f"[{open_stage[0]}]" for open_stage in list(self._open.get(ident, ()))) or "[no stage]"
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                key = ";".join([f"{names.get(ident, 'thread')}", stage, *reversed(labels)])
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    # --- Output ---
+
+    def finish(self, complete: bool = True) -> Path:
+        """
+        Stop sampling and tracing and write the profile; returns its directory.
+
+        Only the first call writes; `complete=False` marks a run that ended early.
+        """
+        if self.output_dir is not None:
+            return self.output_dir
+        atexit.unregister(self.finish)
+        self._stop.set()
+        self._sampler.join()
+        wall, cpu = time.perf_counter() - self._started, time.process_time() - self._cpu_started
+        _, peak = self._tracemalloc.get_traced_memory()
+        self._tracemalloc.stop()
+        peak = max([peak] + [stats.peak_bytes for stats in self.stages.values()])
+
+        output_dir = self.output_root / f"profile_{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = output_dir
+        summary = {'script': self.name, 'complete': complete, 'wall_seconds': round(wall, 3), 'cpu_seconds': round(cpu, 3),
+                   'peak_bytes': peak, 'samples': sum(self.stacks.values()), 'sample_interval': self.interval,
+                   'snapshot_seconds': round(self.snapshot_seconds, 3),
+                   'stages': {name: asdict(stats) for name, stats in self.stages.items()}}
+        with open(output_dir / "stages.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        with open(output_dir / "stages.txt", 'w', encoding='utf-8') as f:
+            f.write(generate_stage_report(summary))
+        with open(output_dir / "memory.txt", 'w', encoding='utf-8') as f:
+            for name, lines in self.memory.items():
+                f.write(f"--- {name} (peak {self.stages[name].peak_bytes / 2 ** 20:.1f} MiB) ---\n")
+                f.write("\n".join(lines) + "\n\n")
+        with open(output_dir / "stacks.folded", 'w', encoding='utf-8') as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+        with open(output_dir / "flamegraph.svg", 'w', encoding='utf-8') as f:
+            f.write(render_flamegraph(self.stacks, title=f"{self.name}: {summary['samples']} samples "
+                                                         f"every {self.interval * 1000:.0f} ms"))
+        print(f"\n{generate_stage_report(summary)}\nProfile saved to {output_dir}")
+        return output_dir
+
+
+def generate_stage_report(summary: Dict) -> str:
+    total = summary['wall_seconds'] or 1.0
+    lines = [
+        "=" * 78,
+        f"PROFILE: {summary['script']}  (wall {summary['wall_seconds']:.2f}s, CPU {summary['cpu_seconds']:.2f}s, "
+        f"peak {summary['peak_bytes'] / 2 ** 20:.1f} MiB)"
+        + ("" if summary.get('complete', True) else "  ENDED EARLY"),
+        "=" * 78,
+        f"{'Stage':<30} {'Calls':>6} {'Wall s':>9} {'% wall':>7} {'CPU s':>9} {'Peak MiB':>9}",
+        "-" * 78,
+    ]
+    for name, stats in summary['stages'].items():
+        lines.append(f"{name[:30]:<30} {stats['calls']:>6} {stats['wall_seconds']:>9.3f} "
+                     f"{stats['wall_seconds'] / total:>7.1%} {stats['cpu_seconds']:>9.3f} "
+                     f"{stats['peak_bytes'] / 2 ** 20:>9.1f}")
+    lines += ["-" * 78,
+              f"Outside the stages: {summary['snapshot_seconds']:.2f}s taking memory snapshots, "
+              f"the rest is startup and unmarked code."]
+    return "\n".join(lines)
+
+
+def render_flamegraph(stacks: Dict[str, int], title: str = "", width: int = 1200, row_height: int = 16) -> str:
+    """A self-contained SVG flame graph (root at the bottom) of folded stacks."""
+    root = {'children': {}, 'value': 0}
+    for stack, count in stacks.items():
+        node = root
+        node['value'] += count
+        for label in stack.split(";"):
+            node = node['children'].setdefault(label, {'children': {}, 'value': 0})
+            node['value'] += count
+
+    def depth(node) -> int:
+        return 1 + max((depth(child) for child in node['children'].values()), default=0)
+
+    rows = depth(root)
+    height = (rows + 2) * row_height
+    scale = (width - 20) / max(root['value'], 1)
+    rects = []
+
+    def place(node, label: str, x: float, level: int):
+        w = node['value'] * scale
+        if w < 0.5:
+            return
+        y = height - (level + 1) * row_height
+        hue = zlib.crc32(label.split(" (")[0].encode()) % 60
+        share = node['value'] / max(root['value'], 1)
+        text = label if len(label) * 7 < w else label[:max(int(w / 7) - 2, 0)] + ".." if w > 28 else ""
+        escaped = label.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        rects.append(f'<g><title>{escaped} ({node["value"]} samples, {share:.1%})</title>'
+                     f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" '
+                     f'fill="hsl({hue},85%,60%)"/>'
+                     f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{text}</text></g>')
+        for child_label, child in sorted(node['children'].items()):
+            place(child, child_label, x, level + 1)
+            x += child['value'] * scale
+
+    place(root, "all", 10, 0)
+    title = title.replace("&", "&amp;").replace("<", "&lt;")
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height + row_height}" '
+            f'font-family="monospace" font-size="11">'
+            f'<rect width="100%" height="100%" fill="#f8f8f8"/>'
+            f'<text x="10" y="{row_height}" font-size="13">{title}</text>'
+            + "".join(rects) + "</svg>")
+
+
+def add_profile_argument(parser: argparse.ArgumentParser):
+    parser.add_argument("--profile", action="store_true",
+                        help="Write per-stage wall/CPU time, a flame graph and memory peaks to run_logs/.")
+
+
+def start_profiler(enabled: bool, name: str):
+    """A running `Profiler` for `--profile`, else the no-op `NULL_PROFILER`."""
+    return Profiler(name) if enabled else NULL_PROFILER
@@ -1,8 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import List, Literal
+from typing import List
 
-# Define controlled vocabularies for strong validation
-InteractionType = Literal["Direct Dialogue", "Physical Action", "Observation", "Memory/Reference"]
+# Controlled vocabularies for strong validation (defined in src.vocabulary, re-exported here)
+from src.vocabulary import InteractionType
 
 class Interaction(BaseModel):
     """
@@ -17,16 +17,70 @@ class Settings:
         self.CHARACTER_FILE = self.PROJECT_ROOT / config['data']['character_file']
         self.RESULTS_DIR = self.PROJECT_ROOT / config['data']['llm_results_dir']
         self.GRAPH_ARTIFACTS_DIR = self.PROJECT_ROOT / config['data']['graph_artifacts_dir']
+        self.GOLD_ANNOTATIONS_DIR = self.PROJECT_ROOT / config['data'].get('gold_annotations_dir', './gold_annotations')
+        self.CROWD_ANNOTATIONS_DIR = self.PROJECT_ROOT / config['data'].get('crowd_annotations_dir', './crowd_annotations')
+        self.CROWD_GOLD_DIR = self.PROJECT_ROOT / config['data'].get('crowd_gold_dir', './crowd_gold_annotations')
 
         # Models
         self.LLM_MODEL = config['models']['llm_model']
         self.LLM_HOST = config['models']['llm_host']
+        self.LLM_HOST_RETRIES = config['models'].get('llm_host_retries', 2)
+        self.LLM_HOST_MAX_FAILURES = config['models'].get('llm_host_max_failures', 3)
+        self.LLM_HOST_COOLDOWN_SECONDS = config['models'].get('llm_host_cooldown_seconds', 30)
+        self.CASCADE_MODEL = config['models'].get('cascade_model')
+        self.CASCADE_MAX_CHARACTERS = config['models'].get('cascade_max_characters', 4)
+        self.CASCADE_ESCALATE_ON = config['models'].get(
+            'cascade_escalate_on', ["request_failed", "invalid_output", "unresolved_name", "alias_disagreement", "crowded"])
         self.FAST_TOKENIZER = config['models']['fast_tokenizer_for_counting']
 
         # Processing
         # THE CHANGE: Load token-based chunking settings
         self.CHUNK_TOKEN_LIMIT = config['processing']['chunk_token_limit']
         self.CHUNK_OVERLAP_SENTENCES = config['processing']['chunk_overlap_sentences']
+        self.STREAM_REFRESH_INTERACTIONS = config['processing'].get('stream_refresh_interactions', 25)
+        self.STREAM_SNAPSHOT_SECONDS = config['processing'].get('stream_snapshot_seconds', 30)
+        self.TELEMETRY_ENABLED = config['processing'].get('telemetry', True)
+        self.TELEMETRY_COLD_LOAD_SECONDS = config['processing'].get('telemetry_cold_load_seconds', 1.0)
+        self.TELEMETRY_SLOWEST_CHUNKS = config['processing'].get('telemetry_slowest_chunks', 10)
+        self.EXTRACTION_WORKERS = config['processing'].get('extraction_workers')
+
+        # Judge
+        self.JUDGE_ACCEPT_THRESHOLD = config['judge'].get('accept_threshold', 0.7)
+        self.JUDGE_REJECT_THRESHOLD = config['judge'].get('reject_threshold', 0.3)
+        self.JUDGE_SWEEP_STEP = config['judge'].get('sweep_step', 0.01)
+
+        # Crowd annotation
+        self.SNIPPET_INDEX_FILE = self.PROJECT_ROOT / config['annotation'].get('snippet_index_file', './annotation_snippets.json')
+        self.SNIPPET_INDEX_SIZE = config['annotation'].get('snippet_index_size', 500)
+        self.SNIPPET_INDEX_SEED = config['annotation'].get('snippet_index_seed', 42)
+        self.ANNOTATORS_PER_SNIPPET = config['annotation'].get('annotators_per_snippet', 3)
+        self.SNIPPET_LEASE_MINUTES = config['annotation'].get('snippet_lease_minutes', 15)
+        self.GOLD_VOTE = config['annotation'].get('gold_vote', 'majority')
+        self.GOLD_MIN_ANNOTATORS = config['annotation'].get('gold_min_annotators', 2)
 
         # Analysis
-        self.TOP_N_ANALYSIS = config['analysis']['top_n_results']
\ No newline at end of file
+        self.TOP_N_ANALYSIS = config['analysis']['top_n_results']
+        self.REPORT_FORMATS = config['analysis'].get('report_formats', ['text'])
+        self.BETWEENNESS_MODE = config['analysis'].get('betweenness_mode', 'exact')
+        self.BETWEENNESS_PIVOTS = config['analysis'].get('betweenness_pivots', 64)
+        self.BETWEENNESS_SEED = config['analysis'].get('betweenness_seed', 42)
+        self.BETWEENNESS_WORKERS = config['analysis'].get('betweenness_workers', 1)
+        self.TEMPORAL_WINDOW = config['analysis'].get('temporal_window', 3)
+        self.LAYOUT_SEED = config['analysis'].get('layout_seed', 42)
+        self.LAYOUT_ITERATIONS = config['analysis'].get('layout_iterations', 300)
+        self.VISUALIZATION = config['analysis'].get('visualization', 'pyvis')
+        self.COMMUNITY_ALGORITHM = config['analysis'].get('community_algorithm', 'louvain')
+        self.COMMUNITY_SEEDS = config['analysis'].get('community_seeds', 8)
+        self.COMMUNITY_SEED = config['analysis'].get('community_seed', 42)
+        self.COMMUNITY_RESOLUTION = config['analysis'].get('community_resolution', 1.0)
+        self.COMMUNITY_WORKERS = config['analysis'].get('community_workers', 1)
+        self.COOCCURRENCE_UNIT = config['analysis'].get('cooccurrence_unit', 'sentence')
+        self.COOCCURRENCE_WINDOW = config['analysis'].get('cooccurrence_window', 50)
+
+        # Evaluation
+        self.EVAL_PER_TYPE_METRICS = config['evaluation'].get('compute_per_type_metrics', True)
+        self.EVAL_EXPORT_ERROR_ANALYSIS = config['evaluation'].get('export_error_analysis', True)
+        self.EVAL_BOOTSTRAP_RESAMPLES = config['evaluation'].get('bootstrap_resamples', 10000)
+        self.EVAL_BOOTSTRAP_UNIT = config['evaluation'].get('bootstrap_unit', 'chapter')
+        self.EVAL_BOOTSTRAP_CONFIDENCE = config['evaluation'].get('bootstrap_confidence', 0.95)
+        self.EVAL_BOOTSTRAP_SEED = config['evaluation'].get('bootstrap_seed', 42)
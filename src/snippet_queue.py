@@ -0,0 +1,261 @@
+"""
+Snippet Queue Module - Which passage each crowd annotator sees next.
+
+`build_snippet_index` turns every paragraph of the novel into a candidate
+snippet and ranks it by how unsure the models are about it. Each extracted
+interaction is located in its paragraph through its evidence snippet. A
+paragraph's priority is then the sum of two signals, each between 0 and 1:
+
+- review: the share of its judged interactions the judge left as `needs_review`;
+- disagreement: 1 - Jaccard overlap of the character pairs that the
+  extraction runs (e.g. `default` and `sentenceSplitting`) found in it.
+
+The top paragraphs are saved once as `annotation_snippets.json`, so the app
+never rescans the books. `SnippetQueue` serves them in priority order until
+each has `annotators_per_snippet` annotators. It counts submissions
+incrementally from the annotation store's row ids, and it leases the passage
+an annotator is working on so concurrent sessions spread out instead of
+piling onto the same snippet.
+"""
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.annotation_store import AnnotationStore
+from src.character_mapper import CharacterMapper
+from src.data_preprocessor import load_books, split_chapters
+from src.evaluation_metrics import DocumentKey, discover_runs, load_run_predictions
+from src.judge_sweep import BUCKETS, JUDGED_SUFFIX, load_judged_scores
+from src.settings import Settings
+
+SNIPPET_LENGTH = 1000                  # Characters of a paragraph shown to annotators
+SNIPPET_ID_PATTERN = re.compile(r'^(book_\d+)_ch(\d+)_p(\d+)$')
+
+
+def snippet_document(snippet_id: str) -> Optional[DocumentKey]:
+    """(book, 0-based chapter) of an indexed snippet; None for ids from before the index."""
+    match = SNIPPET_ID_PATTERN.match(snippet_id)
+    return (match.group(1), int(match.group(2))) if match else None
+
+
+def snippet_paragraph(snippet_id: str) -> Optional[int]:
+    """Index of an indexed snippet's paragraph in its chapter (see `ChapterParagraphs`)."""
+    match = SNIPPET_ID_PATTERN.match(snippet_id)
+    return int(match.group(3)) if match else None
+
+
+def _normalise(text: str) -> str:
+    return " ".join(text.split())
+
+
+class ChapterParagraphs:
+    """A chapter's paragraphs, with evidence lookup on whitespace-normalised text."""
+
+    def __init__(self, chapter_text: str):
+        self.paragraphs = [p.strip() for p in chapter_text.split('\n\n') if p.strip()]
+        normalised = [_normalise(p) for p in self.paragraphs]
+        self.text = "\n".join(normalised)
+        self.starts = np.cumsum([0] + [len(p) + 1 for p in normalised[:-1]])
+
+    def locate(self, evidence: str) -> Optional[int]:
+        """Index of the paragraph quoting `evidence`, or None if it cannot be found."""
+        evidence = _normalise(evidence or "")
+        if len(evidence) < 10:
+            return None
+        position = self.text.find(evidence)
+        if position < 0:
+            # Long quotes are sometimes trimmed or altered towards the end
+            position = self.text.find(evidence[:60])
+        if position < 0:
+            return None
+        return int(np.searchsorted(self.starts, position, side='right') - 1)
+
+
+def _pair(interaction: Dict[str, Any], name_resolver: Optional[Callable[[str], Optional[str]]]) -> Tuple[str, str]:
+    names = []
+    for key in ('character_1', 'character_2'):
+        mention = interaction.get(key) or ""
+        resolved = name_resolver(mention) if name_resolver else None
+        names.append(resolved or mention.lower().strip())
+    return tuple(sorted(names))
+
+
+def build_snippet_index(
+    book_texts: Dict[str, str],
+    runs: Dict[str, Dict[DocumentKey, List[Dict[str, Any]]]],
+    judged: Optional[Dict[DocumentKey, List[Tuple[Dict[str, Any], bool]]]] = None,
+    name_resolver: Optional[Callable[[str], Optional[str]]] = None,
+    size: int = 500,
+    min_length: int = 100,
+    seed: int = 42,
+) -> List[Dict[str, Any]]:
+    """
+    Rank every paragraph longer than `min_length` and keep the top `size`.
+
+    `runs` maps run name -> (book, chapter) -> extracted interactions;
+    `judged` maps (book, chapter) -> (judged interaction, needs review).
+    Paragraphs with equal priority are ordered by a seeded shuffle, so ties
+    spread over the whole novel instead of filling up from chapter 1.
+    """
+    judged = judged or {}
+    candidates: List[Dict[str, Any]] = []
+    for book, book_text in book_texts.items():
+        for chapter, chapter_text in enumerate(split_chapters(book_text)):
+            paragraphs = ChapterParagraphs(chapter_text)
+            n = len(paragraphs.paragraphs)
+            key = (book, chapter)
+
+            covering = [predictions[key] for predictions in runs.values() if key in predictions]
+            pairs = [[set() for _ in range(n)] for _ in covering]
+            for run_pairs, interactions in zip(pairs, covering):
+                for interaction in interactions:
+                    p = paragraphs.locate(interaction.get('evidence_snippet'))
+                    if p is not None:
+                        run_pairs[p].add(_pair(interaction, name_resolver))
+
+            judged_count, review_count = np.zeros(n), np.zeros(n)
+            for interaction, needs_review in judged.get(key, []):
+                p = paragraphs.locate(interaction.get('evidence_snippet'))
+                if p is not None:
+                    judged_count[p] += 1
+                    review_count[p] += needs_review
+
+            review = np.divide(review_count, judged_count, out=np.zeros(n), where=judged_count > 0)
+            for p, paragraph in enumerate(paragraphs.paragraphs):
+                if len(paragraph) <= min_length:
+                    continue
+                union = set().union(*(run_pairs[p] for run_pairs in pairs)) if pairs else set()
+                disagreement = 0.0
+                if len(pairs) > 1 and union:
+                    common = set.intersection(*(run_pairs[p] for run_pairs in pairs))
+                    disagreement = 1 - len(common) / len(union)
+                candidates.append({
+                    'id': f"{book}_ch{chapter:03d}_p{p:03d}",
+                    'source': book,
+                    'chapter': chapter,
+                    'paragraph': p,
+                    'text': paragraph[:SNIPPET_LENGTH],
+                    'context': f"From {book}, chapter {chapter + 1}",
+                    'priority': round(float(review[p]) + disagreement, 4),
+                    'needs_review': int(review_count[p]),
+                    'disagreement': round(disagreement, 4),
+                    'extracted': len(union) + int(judged_count[p]),
+                })
+
+    tie_break = np.random.default_rng(seed).permutation(len(candidates))
+    order = sorted(range(len(candidates)),
+                   key=lambda i: (-candidates[i]['priority'], -bool(candidates[i]['extracted']), tie_break[i]))
+    return [candidates[i] for i in order[:size]]
+
+
+def snippet_index_from_settings(settings: Settings) -> List[Dict[str, Any]]:
+    """Build the index from the books, every extraction run and every `<book>_judged` result."""
+    book_texts = {Path(name).stem: text for name, text in load_books(str(settings.BOOKS_DIR)).items()}
+    # Thresholded judge runs are subsets of an extraction run, not a second opinion
+    runs = {name: load_run_predictions(book_dirs)
+            for name, book_dirs in discover_runs(str(settings.RESULTS_DIR), set(book_texts)).items()
+            if not name.startswith(JUDGED_SUFFIX.lstrip('_'))}
+
+    judged_books = [book for book in book_texts if (settings.RESULTS_DIR / f"{book}{JUDGED_SUFFIX}").is_dir()]
+    scores = load_judged_scores(settings.RESULTS_DIR, judged_books)
+    needs_review = scores.buckets(settings.JUDGE_ACCEPT_THRESHOLD,
+                                  settings.JUDGE_REJECT_THRESHOLD) == BUCKETS.index("needs_review")
+    judged = {key: list(zip(scores.records[scores.offsets[d]:scores.offsets[d + 1]],
+                            needs_review[scores.offsets[d]:scores.offsets[d + 1]]))
+              for d, key in enumerate(scores.documents)}
+
+    name_resolver = CharacterMapper(file_path=str(settings.CHARACTER_FILE)).get_canonical_name
+    return build_snippet_index(book_texts, runs, judged, name_resolver=name_resolver,
+                               size=settings.SNIPPET_INDEX_SIZE, seed=settings.SNIPPET_INDEX_SEED)
+
+
+def save_snippet_index(snippets: List[Dict[str, Any]], path: Path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snippets, f, indent=2, ensure_ascii=False)
+
+
+class SnippetQueue:
+    """
+    Hands out snippets, highest priority first, until each has
+    `annotators_per_snippet` distinct annotators.
+
+    Shared by every session (e.g. via `st.cache_resource`); all methods are
+    thread-safe. A snippet handed to an annotator stays theirs across reruns
+    and counts towards its quota for `lease_seconds` or until they submit or skip.
+    """
+
+    def __init__(self, snippets: List[Dict[str, Any]], annotators_per_snippet: int = 3,
+                 lease_seconds: float = 900.0):
+        # Snippet files written before priorities existed keep their order
+        self.snippets = sorted(snippets, key=lambda s: -s.get('priority', 0.0))
+        self.index = {snippet['id']: i for i, snippet in enumerate(self.snippets)}
+        self.annotators_per_snippet = annotators_per_snippet
+        self.lease_seconds = lease_seconds
+        self.counts = np.zeros(len(self.snippets), dtype=np.int64)
+        self._annotated: Set[Tuple[str, str]] = set()
+        self._leases: Dict[str, Tuple[int, float]] = {}     # annotator -> (snippet, expiry)
+        self._watermark = 0
+        self._lock = threading.Lock()
+
+    def _count(self, annotator_id: str, snippet_id: str):
+        i = self.index.get(snippet_id)
+        if i is not None and (annotator_id, snippet_id) not in self._annotated:
+            self._annotated.add((annotator_id, snippet_id))
+            self.counts[i] += 1
+
+    def refresh(self, store: AnnotationStore) -> int:
+        """Count submissions stored since the last refresh; returns how many were read."""
+        with self._lock:
+            read = 0
+            for row_id, record in store.iter_records(after=self._watermark):
+                self._count(str(record['annotator_id']), str(record['snippet_id']))
+                self._watermark = row_id
+                read += 1
+            return read
+
+    def record(self, annotator_id: str, snippet_id: str):
+        """Count a submission right away and end the annotator's lease."""
+        with self._lock:
+            self._count(annotator_id, snippet_id)
+            self._leases.pop(annotator_id, None)
+
+    def release(self, annotator_id: str):
+        with self._lock:
+            self._leases.pop(annotator_id, None)
+
+    def next_for(self, annotator_id: str, exclude: Set[str]) -> Optional[Dict[str, Any]]:
+        """
+        The annotator's leased snippet, or the highest-priority one that still
+        needs annotators and is not in `exclude` (done or skipped). None when
+        nothing is left for them.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._leases = {a: lease for a, lease in self._leases.items() if lease[1] > now}
+            lease = self._leases.get(annotator_id)
+            if lease is not None and self.snippets[lease[0]]['id'] not in exclude:
+                return self.snippets[lease[0]]
+
+            leased = np.bincount([i for a, (i, _) in self._leases.items() if a != annotator_id],
+                                 minlength=len(self.snippets))
+            open_slots = self.counts + leased < self.annotators_per_snippet
+            for snippet_id in exclude:
+                i = self.index.get(snippet_id)
+                if i is not None:
+                    open_slots[i] = False
+            if not open_slots.any():
+                self._leases.pop(annotator_id, None)
+                return None
+            i = int(np.argmax(open_slots))
+            self._leases[annotator_id] = (i, now + self.lease_seconds)
+            return self.snippets[i]
+
+    def open_slots(self) -> int:
+        """Annotations still needed before every snippet has its quota."""
+        return int(np.maximum(self.annotators_per_snippet - self.counts, 0).sum())
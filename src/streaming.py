@@ -0,0 +1,264 @@
+"""
+Streaming Module - Live graph updates while the extraction is still running.
+
+`run_llm_extraction.py --stream` submits every chunk's validated interactions
+to a `StreamingPipeline`. A consumer thread takes them off a bounded queue,
+deduplicates them per chapter exactly like the chapter JSON is deduplicated,
+resolves aliases and adds them to one `LiveGraph` per book. Centralities are
+refreshed every few interactions on the graph's edge arrays (warm-started
+from the previous refresh), and a snapshot artifact is written on a time
+cadence, so a long extraction run always has a usable partial network:
+
+    graph_artifacts/<book>_live_graph.gml          # Same format as build_graph.py
+    graph_artifacts/<book>_live_layers.npz
+    graph_artifacts/<book>_live_centralities.json  # Progress + current centralities
+
+Once a book is complete its live graph equals the one `build_graph.py`
+builds from the saved chapter files.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from src.character_mapper import CharacterMapper
+from src.graph_builder import (ChapterEdges, add_extracted_interaction, layers_artifact_path,
+                               save_graph_artifact)
+from src.network_math import degree_and_strength, eigenvector_centrality, pagerank
+from src.utils import interaction_key
+
+CENTRALITY_NAMES = ("degree_centrality", "strength", "eigenvector", "pagerank")
+
+
+@dataclass
+class StreamConfig:
+    """How often the live graphs are analysed and written."""
+    refresh_every: int = 25          # Accepted interactions between centrality refreshes
+    snapshot_seconds: float = 30.0   # Minimum seconds between snapshot artifacts of a book
+    queue_size: int = 1000           # Pending chunks before the extraction waits for the consumer
+
+
+class LiveGraph:
+    """
+    One book's interaction graph, grown one extracted interaction at a time.
+
+    Alongside the NetworkX graph it keeps interned character ids and
+    parallel pair arrays, so centralities are refreshed without rebuilding
+    anything from the graph.
+    """
+
+    def __init__(self, name: str, character_mapper: CharacterMapper):
+        self.name = name
+        self.character_mapper = character_mapper
+        self.graph = nx.Graph()
+        self.chapter_edges: ChapterEdges = {}
+        self.characters: List[str] = []
+        self.character_index: Dict[str, int] = {}
+        self._pair_ids: Dict[Tuple[int, int], int] = {}
+        self._pair_u: List[int] = []
+        self._pair_v: List[int] = []
+        self._weights: List[float] = []
+        self._seen: Dict[int, set] = {}
+
+        self.accepted = 0            # Interactions added to the graph
+        self.duplicates = 0          # Repeats of an interaction already seen in the chapter
+        self.rejected = 0            # Unknown characters or self-interactions
+        self.since_refresh = 0
+        self.centralities: Dict[str, np.ndarray] = {}
+        self.updated_at: Optional[float] = None
+
+    def _character_id(self, name: str) -> int:
+        if name not in self.character_index:
+            self.character_index[name] = len(self.characters)
+            self.characters.append(name)
+        return self.character_index[name]
+
+    def add(self, chapter: int, interactions: List[dict]) -> int:
+        """Add a chunk's interactions; returns how many were new and resolvable."""
+        seen = self._seen.setdefault(chapter, set())
+        accepted = 0
+        for interaction in interactions:
+            key = interaction_key(interaction)
+            if key in seen:
+                self.duplicates += 1
+                continue
+            seen.add(key)
+
+            edge = add_extracted_interaction(self.graph, interaction, chapter, self.character_mapper)
+            if edge is None:
+                self.rejected += 1
+                continue
+            self.chapter_edges.setdefault(chapter, []).append(edge)
+            pair = (self._character_id(edge[0]), self._character_id(edge[1]))
+            if pair not in self._pair_ids:
+                self._pair_ids[pair] = len(self._weights)
+                self._pair_u.append(pair[0])
+                self._pair_v.append(pair[1])
+                self._weights.append(0.0)
+            self._weights[self._pair_ids[pair]] += 1
+            accepted += 1
+
+        self.accepted += accepted
+        self.since_refresh += accepted
+        return accepted
+
+    def _warm_start(self, name: str) -> Optional[np.ndarray]:
+        previous = self.centralities.get(name)
+        if previous is None:
+            return None
+        # Characters first seen since the last refresh start from zero
+        return np.pad(previous, (0, len(self.characters) - len(previous)))
+
+    def refresh_centralities(self):
+        """Recompute every centrality, warm-started from the previous refresh."""
+        n = len(self.characters)
+        u, v = np.array(self._pair_u, dtype=np.int64), np.array(self._pair_v, dtype=np.int64)
+        w = np.array(self._weights)
+        degree, strength = degree_and_strength(n, u, v, w)
+        self.centralities = {
+            "degree_centrality": degree / (n - 1) if n > 1 else np.zeros(n),
+            "strength": strength,
+            "eigenvector": eigenvector_centrality(n, u, v, w, x0=self._warm_start("eigenvector")),
+            "pagerank": pagerank(n, u, v, w, x0=self._warm_start("pagerank")),
+        }
+        self.since_refresh = 0
+        self.updated_at = time.time()
+
+    def top_characters(self, metric: str = "pagerank", top_n: int = 10) -> List[Tuple[str, float]]:
+        """Highest-scoring characters at the last refresh, ties broken by name."""
+        scores = self.centralities.get(metric)
+        if scores is None:
+            return []
+        ranked = sorted(range(len(scores)), key=lambda i: (-scores[i], self.characters[i]))
+        return [(self.characters[i], float(scores[i])) for i in ranked[:top_n]]
+
+    def summary(self) -> dict:
+        return {
+            "book": self.name,
+            "chapters": sorted(self.chapter_edges),
+            "interactions": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "nodes": self.graph.number_of_nodes(),
+            "edges": self.graph.number_of_edges(),
+            "updated_at": self.updated_at,
+        }
+
+    def write_snapshot(self, output_dir: Path) -> Path:
+        """
+        Write `<name>_live_graph.gml`, its layers and the current centralities.
+
+        Each file is written under a temporary name and then renamed, so a
+        reader never sees a half-written snapshot.
+        """
+        gml_path = output_dir / f"{self.name}_live_graph.gml"
+        staging_path = output_dir / ".live" / gml_path.name
+        save_graph_artifact(self.graph, staging_path)
+        os.replace(layers_artifact_path(staging_path), layers_artifact_path(gml_path))
+        os.replace(staging_path, gml_path)
+
+        centralities = {
+            name: {metric: float(self.centralities[metric][i]) for metric in CENTRALITY_NAMES}
+            for i, name in enumerate(self.characters)
+        } if self.centralities else {}
+        json_path = output_dir / f"{self.name}_live_centralities.json"
+        staging_json = staging_path.with_name(json_path.name)
+        with open(staging_json, 'w', encoding='utf-8') as f:
+            json.dump({**self.summary(), "centralities": centralities}, f, indent=2, ensure_ascii=False)
+        os.replace(staging_json, json_path)
+        return gml_path
+
+
+class StreamingPipeline:
+    """
+    Queue + consumer thread turning extracted interactions into live graphs.
+
+    Use as a context manager around the extraction loop; `submit` never
+    blocks for longer than it takes the consumer to catch up with a full queue.
+    """
+
+    _STOP = object()
+
+    def __init__(self, character_mapper: CharacterMapper, output_dir: Path, config: Optional[StreamConfig] = None):
+        self.character_mapper = character_mapper
+        self.output_dir = Path(output_dir)
+        self.config = config or StreamConfig()
+        self.graphs: Dict[str, LiveGraph] = {}
+        self.failures = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=self.config.queue_size)
+        self._last_snapshot: Dict[str, float] = {}
+        self._dirty: set = set()
+        self._thread = threading.Thread(target=self._run, name="graph-stream", daemon=True)
+
+    def __enter__(self) -> 'StreamingPipeline':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+
+    def submit(self, book_name: str, chapter: int, interactions: List[dict]):
+        """Queue one chunk's (or chapter's) interactions as plain dicts."""
+        self._queue.put((book_name, chapter, interactions))
+
+    def close(self) -> Dict[str, LiveGraph]:
+        """Drain the queue, write final snapshots and stop the consumer."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        return self.graphs
+
+    # --- Consumer thread ---
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            try:
+                self._consume(*item)
+            except Exception as e:
+                # The chapter JSON is still written by the extraction; only the live view suffers
+                self.failures += 1
+                print(f"\nWARNING: Streaming graph update failed. Details: {e}")
+        for book_name in sorted(self._dirty):
+            self._publish(self.graphs[book_name])
+
+    def _consume(self, book_name: str, chapter: int, interactions: List[dict]):
+        # A new book means the previous ones are finished: publish their final state
+        for other in sorted(self._dirty - {book_name}):
+            self._publish(self.graphs[other])
+
+        live = self.graphs.get(book_name)
+        if live is None:
+            live = self.graphs[book_name] = LiveGraph(book_name, self.character_mapper)
+            self._last_snapshot[book_name] = time.monotonic()
+        if not live.add(chapter, interactions):
+            return
+        self._dirty.add(book_name)
+
+        if live.since_refresh >= self.config.refresh_every:
+            live.refresh_centralities()
+        if time.monotonic() - self._last_snapshot[book_name] >= self.config.snapshot_seconds:
+            self._publish(live)
+
+    def _publish(self, live: LiveGraph):
+        if live.since_refresh or not live.centralities:
+            live.refresh_centralities()
+        path = live.write_snapshot(self.output_dir)
+        self._last_snapshot[live.name] = time.monotonic()
+        self._dirty.discard(live.name)
+        leaders = ", ".join(name for name, _ in live.top_characters("pagerank", 3))
+        print(f"\n[stream] {live.name}: {live.accepted} interactions, {live.graph.number_of_edges()} edges "
+              f"(top PageRank: {leaders}) -> {path}")
@@ -0,0 +1,203 @@
+"""
+Telemetry Module - Token counts and timings of every extraction call.
+
+Ollama reports per response how many prompt tokens it evaluated and how many
+it generated, and how long the model load, the prompt evaluation and the
+generation took (in nanoseconds). `LLMClient.generate` keeps them in a
+`ChunkTelemetry`, together with what the client measured itself:
+
+- queue: from the pipeline taking up the chunk to its request being sent
+  (building the prompt, waiting for a connection);
+- http: the request round trip;
+- parse: validating the output into interactions.
+
+`run_llm_extraction.py` writes one file per chapter next to its results,
+`llm_results/<book>/telemetry/chapter_XXX.json`, and a summary of the whole
+run to `llm_results/telemetry/`. The summary holds throughput in tokens/s, the
+split of server time between load, prompt evaluation and generation, cold
+model loads, and the slowest chunks. With several Ollama hosts it also holds
+the `HostPool` counters per host (`src/host_pool.py`).
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+NANOSECONDS = 1e9
+TELEMETRY_DIRNAME = "telemetry"
+
+
+@dataclass
+class ChunkTelemetry:
+    """One Ollama call. Server-side fields stay 0 when the call failed before a response."""
+    model: str
+    prompt_chars: int
+    status: str = "ok"                      # "ok", "request_failed" or "unparsed"
+    interactions: int = 0
+    invalid_interactions: int = 0           # Interaction objects dropped by validation
+    prompt_eval_count: int = 0
+    eval_count: int = 0
+    load_seconds: float = 0.0
+    prompt_eval_seconds: float = 0.0
+    eval_seconds: float = 0.0
+    total_seconds: float = 0.0              # Ollama's total_duration
+    queue_seconds: float = 0.0
+    http_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    book: str = ""
+    chapter: int = -1
+    chunk: int = -1
+    host: str = ""                          # The Ollama server that answered (or was tried last)
+    attempts: int = 0                       # Requests sent, retries on other hosts included
+    escalation: str = ""                    # Cascade: why the chunk went to the large model (src/cascade.py)
+
+    def read_response(self, response_data: Dict[str, Any]):
+        """Copy the counters of an Ollama response (durations are in nanoseconds)."""
+        self.prompt_eval_count = int(response_data.get("prompt_eval_count") or 0)
+        self.eval_count = int(response_data.get("eval_count") or 0)
+        self.load_seconds = (response_data.get("load_duration") or 0) / NANOSECONDS
+        self.prompt_eval_seconds = (response_data.get("prompt_eval_duration") or 0) / NANOSECONDS
+        self.eval_seconds = (response_data.get("eval_duration") or 0) / NANOSECONDS
+        self.total_seconds = (response_data.get("total_duration") or 0) / NANOSECONDS
+
+
+def _rate(tokens: float, seconds: float) -> Optional[float]:
+    return round(tokens / seconds, 2) if seconds > 0 else None
+
+
+def _share(part: float, whole: float) -> Optional[float]:
+    return round(part / whole, 4) if whole > 0 else None
+
+
+def summarize(records: List[ChunkTelemetry], cold_load_seconds: float = 1.0, slowest: int = 10) -> Dict[str, Any]:
+    """Totals, rates and outliers over any set of chunk records (a chapter or a whole run)."""
+    answered = [r for r in records if r.status != "request_failed"]
+    load = sum(r.load_seconds for r in answered)
+    prompt = sum(r.prompt_eval_seconds for r in answered)
+    generation = sum(r.eval_seconds for r in answered)
+    server = sum(r.total_seconds for r in answered)
+    http = sum(r.http_seconds for r in records)
+    prompt_tokens = sum(r.prompt_eval_count for r in answered)
+    generated_tokens = sum(r.eval_count for r in answered)
+
+    def brief(r: ChunkTelemetry) -> Dict[str, Any]:
+        return {'book': r.book, 'chapter': r.chapter, 'chunk': r.chunk, 'http_seconds': round(r.http_seconds, 3),
+                'load_seconds': round(r.load_seconds, 3), 'prompt_tokens': r.prompt_eval_count,
+                'generated_tokens': r.eval_count, 'status': r.status}
+
+    return {
+        'chunks': len(records),
+        'failed_requests': sum(r.status == "request_failed" for r in records),
+        'unparsed_outputs': sum(r.status == "unparsed" for r in records),
+        'interactions': sum(r.interactions for r in records),
+        'prompt_tokens': prompt_tokens,
+        'generated_tokens': generated_tokens,
+        'mean_prompt_tokens': round(prompt_tokens / len(answered), 1) if answered else None,
+        'mean_generated_tokens': round(generated_tokens / len(answered), 1) if answered else None,
+        'prompt_tokens_per_second': _rate(prompt_tokens, prompt),
+        'generated_tokens_per_second': _rate(generated_tokens, generation),
+        'seconds': {
+            'queue': round(sum(r.queue_seconds for r in records), 3),
+            'http': round(http, 3),
+            'parse': round(sum(r.parse_seconds for r in records), 3),
+            'server': round(server, 3),
+            'load': round(load, 3),
+            'prompt_eval': round(prompt, 3),
+            'generation': round(generation, 3),
+        },
+        # Shares of the server's total_duration; the rest is Ollama's own overhead
+        'server_time_share': {
+            'load': _share(load, server),
+            'prompt_eval': _share(prompt, server),
+            'generation': _share(generation, server),
+        },
+        # HTTP time the server does not account for: network, serialisation, waiting for a slot
+        'transport_seconds': round(max(http - server, 0.0), 3),
+        'cold_loads': [brief(r) for r in records if r.load_seconds >= cold_load_seconds],
+        'slowest_chunks': [brief(r) for r in sorted(records, key=lambda r: -r.http_seconds)[:slowest]],
+    }
+
+
+def telemetry_dir(book_results_dir: Path) -> Path:
+    return Path(book_results_dir) / TELEMETRY_DIRNAME
+
+
+def save_chapter_telemetry(book_results_dir: Path, chapter: int, records: List[ChunkTelemetry],
+                           cold_load_seconds: float = 1.0) -> Path:
+    """`<book results>/telemetry/chapter_XXX.json`: every chunk plus the chapter's summary."""
+    output_dir = telemetry_dir(book_results_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"chapter_{chapter:03d}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'summary': summarize(records, cold_load_seconds, slowest=3),
+                   'chunks': [asdict(r) for r in records]}, f, indent=2)
+    return path
+
+
+def load_chapter_telemetry(book_results_dir: Path) -> List[ChunkTelemetry]:
+    """Every chunk record saved for one book's results, in chapter order."""
+    records = []
+    for path in sorted(telemetry_dir(book_results_dir).glob("chapter_*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            records.extend(ChunkTelemetry(**chunk) for chunk in json.load(f)['chunks'])
+    return records
+
+
+def generate_telemetry_report(summary: Dict[str, Any]) -> str:
+    def fmt(value: Optional[float], unit: str = "") -> str:
+        return "n/a" if value is None else f"{value:,.2f}{unit}"
+
+    def pct(value: Optional[float]) -> str:
+        return "n/a" if value is None else f"{value:.0%}"
+
+    seconds, share = summary['seconds'], summary['server_time_share']
+    lines = [
+        "=" * 60,
+        "EXTRACTION TELEMETRY",
+        "=" * 60,
+        f"Chunks:                {summary['chunks']} ({summary['failed_requests']} failed requests, "
+        f"{summary['unparsed_outputs']} unparsed outputs)",
+        f"Interactions:          {summary['interactions']}",
+        f"Prompt tokens:         {summary['prompt_tokens']:,} (mean {fmt(summary['mean_prompt_tokens'])} per chunk)",
+        f"Generated tokens:      {summary['generated_tokens']:,} (mean {fmt(summary['mean_generated_tokens'])} per chunk)",
+        f"Prompt evaluation:     {fmt(summary['prompt_tokens_per_second'], ' tokens/s')}",
+        f"Generation:            {fmt(summary['generated_tokens_per_second'], ' tokens/s')}",
+        "",
+        f"HTTP time:             {seconds['http']:.1f}s (server {seconds['server']:.1f}s, "
+        f"transport {summary['transport_seconds']:.1f}s)",
+        f"  load / prompt / generation: {pct(share['load'])} / {pct(share['prompt_eval'])} / "
+        f"{pct(share['generation'])} of server time",
+        f"Client queue:          {seconds['queue']:.1f}s, parsing {seconds['parse']:.2f}s",
+        "",
+        f"Cold model loads:      {len(summary['cold_loads'])}",
+    ]
+    for chunk in summary['cold_loads'][:10]:
+        lines.append(f"  {chunk['book']} chapter {chunk['chapter'] + 1} chunk {chunk['chunk']}: "
+                     f"{chunk['load_seconds']:.1f}s load")
+    lines.append("Slowest chunks:")
+    for chunk in summary['slowest_chunks']:
+        lines.append(f"  {chunk['book']} chapter {chunk['chapter'] + 1} chunk {chunk['chunk']}: "
+                     f"{chunk['http_seconds']:.2f}s, {chunk['prompt_tokens']} prompt / "
+                     f"{chunk['generated_tokens']} generated tokens ({chunk['status']})")
+    if len(summary.get('hosts', [])) > 1:
+        lines += ["", f"{'Host':<32} {'Weight':>6} {'Requests':>8} {'Failed':>6} {'Ejected':>7} "
+                      f"{'Chunks/s':>8} {'Tokens/s':>9}"]
+        for host in summary['hosts']:
+            lines.append(f"{host['url'][:32]:<32} {host['weight']:>6g} {host['requests']:>8} {host['failures']:>6} "
+                         f"{host['ejections']:>7} {fmt(host['chunks_per_second']):>8} "
+                         f"{fmt(host['generated_tokens_per_second']):>9}")
+    return "\n".join(lines)
+
+
+def save_run_telemetry(results_dir: Path, summary: Dict[str, Any], settings: Dict[str, Any]) -> Path:
+    """`llm_results/telemetry/run_<timestamp>.json` and `.txt`; returns the JSON path."""
+    output_dir = Path(results_dir) / TELEMETRY_DIRNAME
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    with open(output_dir / f"{stem}.json", 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'summary': summary}, f, indent=2)
+    with open(output_dir / f"{stem}.txt", 'w', encoding='utf-8') as f:
+        f.write(generate_telemetry_report(summary))
+    return output_dir / f"{stem}.json"
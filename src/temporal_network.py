@@ -0,0 +1,202 @@
+"""
+Temporal Network - Chapter-sliced character network with incremental queries.
+
+The whole book (or novel) is held as a sparse chapter x character x character
+tensor: every observed character pair gets an id, and interaction counts are
+stored as COO triplets (chapter, pair, weight) sorted by chapter, with one
+offset per chapter, so memory grows with the interactions rather than with
+chapters x pairs. Every cumulative, sliding-window or single-chapter query is
+one `bincount` over a contiguous run of triplets, and centralities are
+computed directly on the edge arrays (see `src.network_math`) with warm
+starts from the previous snapshot, so no graph is ever rebuilt.
+"""
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.character_mapper import CharacterMapper
+from src.network_math import degree_and_strength, eigenvector_centrality, normalized_degree, pagerank
+
+SERIES_MODES = ("cumulative", "window", "chapter")
+SERIES_COLUMNS = ["chapter", "label", "character", "degree_centrality", "weighted_degree", "eigenvector", "pagerank"]
+
+
+@dataclass
+class Snapshot:
+    """Network state for one chapter slice. Arrays are indexed by character id."""
+    chapter: int
+    label: str
+    edge_weights: np.ndarray
+    degree_centrality: np.ndarray
+    weighted_degree: np.ndarray
+    eigenvector: np.ndarray
+    pagerank: np.ndarray
+
+    @property
+    def active(self) -> np.ndarray:
+        return self.weighted_degree > 0
+
+
+def load_chapter_edges(book_results_dir: Path, character_mapper: CharacterMapper) -> Dict[int, List[Tuple[str, str]]]:
+    """A book's canonical, sorted edges per chapter index, as `build_interaction_graph` reads them."""
+    # The graph builder pulls in networkx; only reading raw results needs it
+    from src.graph_builder import build_interaction_graph
+
+    return build_interaction_graph([book_results_dir], character_mapper)[1]
+
+
+class TemporalNetwork:
+    """
+    Sparse chapter x character x character interaction tensor.
+
+    Chapters are positions 0..C-1 in reading order; `labels` carries their
+    display names (e.g. "Chapter 3" or "book_2 ch 3" for the whole novel).
+    """
+
+    def __init__(self, chapters: Sequence[Tuple[str, List[Tuple[str, str]]]]):
+        self.labels = [label for label, _ in chapters]
+        self.characters = sorted({name for _, edges in chapters for edge in edges for name in edge})
+        self.character_index = {name: i for i, name in enumerate(self.characters)}
+
+        pair_ids: Dict[Tuple[int, int], int] = {}
+        chapter_idx, pair_idx = [], []
+        for c, (_, edges) in enumerate(chapters):
+            for char1, char2 in edges:
+                a, b = sorted((self.character_index[char1], self.character_index[char2]))
+                chapter_idx.append(c)
+                pair_idx.append(pair_ids.setdefault((a, b), len(pair_ids)))
+
+        pairs = np.array(list(pair_ids.keys()), dtype=np.int64).reshape(-1, 2)
+        self.pair_u = pairs[:, 0]
+        self.pair_v = pairs[:, 1]
+
+        # COO triplets of the tensor, one per (chapter, pair), in chapter order
+        num_pairs = len(pair_ids)
+        keys, counts = np.unique(np.array(chapter_idx, dtype=np.int64) * max(num_pairs, 1) +
+                                 np.array(pair_idx, dtype=np.int64), return_counts=True)
+        self.coo_chapter = keys // max(num_pairs, 1)
+        self.coo_pair = keys % max(num_pairs, 1)
+        self.coo_weight = counts.astype(float)
+
+        # Triplets of chapter c are coo_*[offsets[c]:offsets[c + 1]]
+        self._offsets = np.searchsorted(self.coo_chapter, np.arange(len(self.labels) + 1))
+
+    @classmethod
+    def from_chapter_edges(cls, chapter_data: Dict[int, List[Tuple[str, str]]],
+                           label_prefix: str = "Chapter") -> 'TemporalNetwork':
+        """Build from the per-chapter edge lists used by `analyze_graph.py`."""
+        return cls([(f"{label_prefix} {idx + 1}", edges) for idx, edges in sorted(chapter_data.items())])
+
+    @classmethod
+    def from_results(cls, results_dir: Path, book_names: List[str],
+                     character_mapper: CharacterMapper) -> 'TemporalNetwork':
+        """Concatenate several books' chapters, in the given order, into one timeline."""
+        chapters = []
+        for book_name in book_names:
+            chapter_data = load_chapter_edges(results_dir / book_name, character_mapper)
+            chapters.extend((f"{book_name} ch {idx + 1}", edges) for idx, edges in sorted(chapter_data.items()))
+        return cls(chapters)
+
+    @property
+    def num_chapters(self) -> int:
+        return len(self.labels)
+
+    # --- Edge-weight queries ---
+
+    def edge_weights(self, start: int, end: int) -> np.ndarray:
+        """Summed pair weights over chapters [start, end] (inclusive)."""
+        start = max(0, start)
+        end = min(end, self.num_chapters - 1)
+        if end < start:
+            return np.zeros(len(self.pair_u))
+        lo, hi = self._offsets[start], self._offsets[end + 1]
+        return np.bincount(self.coo_pair[lo:hi], weights=self.coo_weight[lo:hi], minlength=len(self.pair_u))
+
+    def cumulative(self, chapter: int) -> np.ndarray:
+        return self.edge_weights(0, chapter)
+
+    def window(self, chapter: int, size: int) -> np.ndarray:
+        return self.edge_weights(chapter - size + 1, chapter)
+
+    def chapter(self, chapter: int) -> np.ndarray:
+        return self.edge_weights(chapter, chapter)
+
+    def slice_weights(self, chapter: int, mode: str = "cumulative", window: int = 3) -> np.ndarray:
+        if mode == "cumulative":
+            return self.cumulative(chapter)
+        if mode == "window":
+            return self.window(chapter, window)
+        if mode == "chapter":
+            return self.chapter(chapter)
+        raise ValueError(f"Unknown series mode '{mode}'. Use one of {SERIES_MODES}.")
+
+    def edge_weight_dict(self, weights: np.ndarray) -> Dict[Tuple[str, str], int]:
+        """Named view of a pair-weight vector, non-zero pairs only."""
+        nonzero = np.flatnonzero(weights)
+        return {(self.characters[self.pair_u[p]], self.characters[self.pair_v[p]]): int(weights[p])
+                for p in nonzero}
+
+    # --- Centralities ---
+
+    def snapshot(self, chapter: int, mode: str = "cumulative", window: int = 3,
+                 previous: Optional[Snapshot] = None) -> Snapshot:
+        """Centralities for one slice; `previous` warm-starts eigenvector and PageRank."""
+        n = len(self.characters)
+        weights = self.slice_weights(chapter, mode, window)
+        degree, strength = degree_and_strength(n, self.pair_u, self.pair_v, weights)
+
+        return Snapshot(
+            chapter=chapter,
+            label=self.labels[chapter],
+            edge_weights=weights,
+            degree_centrality=normalized_degree(degree),
+            weighted_degree=strength,
+            eigenvector=eigenvector_centrality(n, self.pair_u, self.pair_v, weights,
+                                               x0=previous.eigenvector if previous else None),
+            pagerank=pagerank(n, self.pair_u, self.pair_v, weights,
+                              x0=previous.pagerank if previous else None),
+        )
+
+    def series(self, mode: str = "cumulative", window: int = 3) -> List[Snapshot]:
+        """One snapshot per chapter, each warm-started from the one before."""
+        snapshots: List[Snapshot] = []
+        previous = None
+        for chapter in range(self.num_chapters):
+            previous = self.snapshot(chapter, mode, window, previous)
+            snapshots.append(previous)
+        return snapshots
+
+    def top_characters(self, snapshot: Snapshot, metric: str = "degree_centrality",
+                       top_n: int = 5) -> List[Tuple[str, float]]:
+        """Highest-scoring active characters in a snapshot, ties broken alphabetically."""
+        scores = getattr(snapshot, metric)
+        active = np.flatnonzero(snapshot.active)
+        ranked = active[np.argsort(-scores[active], kind='stable')]
+        return [(self.characters[i], float(scores[i])) for i in ranked[:top_n]]
+
+    # --- Export ---
+
+    def series_rows(self, mode: str = "cumulative", window: int = 3) -> List[list]:
+        """Long-format rows (one per chapter x active character), columns as in SERIES_COLUMNS."""
+        rows = []
+        for snap in self.series(mode, window):
+            for i in np.flatnonzero(snap.active):
+                rows.append([snap.chapter + 1, snap.label, self.characters[i],
+                             f"{snap.degree_centrality[i]:.6f}", int(snap.weighted_degree[i]),
+                             f"{snap.eigenvector[i]:.6f}", f"{snap.pagerank[i]:.6f}"])
+        return rows
+
+    def export_series(self, output_path: Path, mode: str = "cumulative", window: int = 3):
+        """Write a long-format CSV (one row per chapter x active character) for plotting."""
+        write_series_csv(output_path, self.series_rows(mode, window))
+
+
+def write_series_csv(output_path: Path, rows: List[list]):
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(SERIES_COLUMNS)
+        writer.writerows(rows)
@@ -0,0 +1,63 @@
+import hashlib
+import ssl
+
+import networkx as nx
+
+
+def ensure_nltk_resource(resource_path: str, package: str) -> bool:
+    """
+    Make sure an NLTK data package is available, downloading it only if missing.
+
+    `nltk.data.find` only looks in the local data directories, so runs after
+    the first one never touch the network. Returns True if the resource is
+    usable afterwards.
+    """
+    import nltk
+
+    try:
+        nltk.data.find(resource_path)
+        return True
+    except LookupError:
+        pass
+
+    # Some macOS Python builds lack root certificates for the NLTK download server
+    try:
+        _create_unverified_https_context = ssl._create_unverified_context
+    except AttributeError:
+        pass
+    else:
+        ssl._create_default_https_context = _create_unverified_https_context
+
+    print(f"NLTK resource '{package}' not found locally. Downloading...")
+    nltk.download(package, quiet=True)
+    try:
+        nltk.data.find(resource_path)
+        return True
+    except LookupError:
+        print(f"WARNING: Could not download NLTK resource '{package}'.")
+        return False
+
+
+def graph_content_hash(G: nx.Graph, weight: str = 'weight') -> str:
+    """
+    SHA-256 of a graph's nodes and weighted edges, independent of insertion order.
+
+    Used as the cache key for analytics derived from a graph, so a result is
+    reused exactly when the graph it was computed from is unchanged.
+    """
+    digest = hashlib.sha256()
+    for node in sorted(map(str, G.nodes())):
+        digest.update(f"n\t{node}\n".encode('utf-8'))
+    edges = sorted((*sorted((str(u), str(v))), float(data.get(weight, 1))) for u, v, data in G.edges(data=True))
+    for u, v, w in edges:
+        digest.update(f"e\t{u}\t{v}\t{w!r}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def interaction_key(interaction: dict) -> tuple:
+    """
+    Deduplication key of an extracted interaction: its two characters in
+    either order plus the evidence snippet. Overlapping chunks often report
+    the same interaction twice; both copies share this key.
+    """
+    return tuple(sorted((interaction['character_1'], interaction['character_2']))), interaction['evidence_snippet']
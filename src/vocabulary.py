@@ -0,0 +1,10 @@
+"""
+Vocabulary Module - Controlled vocabularies shared by the schemas and the graph code.
+
+Kept free of pydantic so graph building and analysis can use the interaction
+types without paying for the validation stack at import time.
+"""
+
+from typing import Literal
+
+InteractionType = Literal["Direct Dialogue", "Physical Action", "Observation", "Memory/Reference"]
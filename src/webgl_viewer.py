@@ -0,0 +1,386 @@
+"""
+WebGL Viewer - Static level-of-detail network page for large graphs.
+
+pyvis/vis.js stops being usable at a few thousand edges (whole novel, several
+novels). This writes a single self-contained HTML file that draws the graph
+with raw WebGL from compact binary buffers (base64 little-endian typed arrays
+embedded in the page, so it opens offline from disk) and offers
+level-of-detail controls:
+
+- communities (the Louvain `group` node attribute) start collapsed into
+  super-nodes; clicking one expands it, shift-clicking a member collapses it;
+- an edge-weight threshold slider filters (aggregated) edges;
+- labels are drawn only for the largest visible nodes.
+"""
+
+import base64
+import html
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+
+def _b64(array: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def export_graph_buffers(G: nx.Graph, positions: Dict[str, Tuple[float, float]], color_map: List[str],
+                         weight: str = 'weight') -> Dict[str, object]:
+    """
+    Pack a graph into the compact buffer payload read by the viewer.
+
+    Node ids are positions in `names`; edges are pairs of node ids. Numeric
+    arrays are base64-encoded little-endian Float32 / Uint32 / Uint16.
+    """
+    names = list(G.nodes())
+    index = {name: i for i, name in enumerate(names)}
+
+    xy = np.array([positions.get(name, (0.0, 0.0)) for name in names], dtype='<f4').reshape(-1, 2)
+    groups = np.array([int(G.nodes[name].get('group', 0)) for name in names], dtype='<u2')
+    sizes = np.array([float(G.nodes[name].get('size', 15)) for name in names], dtype='<f4')
+
+    edge_list = list(G.edges(data=True))
+    endpoints = np.array([(index[u], index[v]) for u, v, _ in edge_list], dtype='<u4').reshape(-1, 2)
+    weights = np.array([float(data.get(weight, 1)) for _, _, data in edge_list], dtype='<f4')
+    strength = (np.bincount(endpoints[:, 0], weights=weights, minlength=len(names)) +
+                np.bincount(endpoints[:, 1], weights=weights, minlength=len(names))).astype('<f4')
+
+    return {
+        "names": names,
+        "colors": color_map or ["#97c2fc"],
+        "positions": _b64(xy),
+        "groups": _b64(groups),
+        "sizes": _b64(sizes),
+        "strength": _b64(strength),
+        "edges": _b64(endpoints),
+        "weights": _b64(weights),
+    }
+
+
+def save_webgl_visualization(G: nx.Graph, positions: Dict[str, Tuple[float, float]], color_map: List[str],
+                             output_path: Path, title: Optional[str] = None):
+    """Write the self-contained WebGL viewer page for `G`."""
+    payload = export_graph_buffers(G, positions, color_map)
+    page = (_VIEWER_TEMPLATE
+            .replace("__TITLE__", html.escape(title or output_path.stem))
+            # "</" would end the inline <script> if a name ever contained it
+            .replace("__GRAPH_DATA__", json.dumps(payload).replace("</", "<\\/")))
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+
+
+_VIEWER_TEMPLATE = r"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  html, body { margin: 0; height: 100%; background: #1a1a1a; color: #eee; font-family: sans-serif; overflow: hidden; }
+  #gl, #labels { position: absolute; top: 0; left: 0; width: 100%; height: 100%; }
+  #labels { pointer-events: none; }
+  #panel { position: absolute; top: 10px; left: 10px; background: rgba(0,0,0,0.75); padding: 10px 12px;
+           border-radius: 6px; font-size: 13px; min-width: 260px; }
+  #panel h3 { margin: 0 0 6px 0; font-size: 15px; }
+  #panel button { margin: 4px 4px 0 0; }
+  #info { margin-top: 8px; min-height: 3em; color: #ccc; }
+</style>
+</head>
+<body>
+<canvas id="gl"></canvas>
+<canvas id="labels"></canvas>
+<div id="panel">
+  <h3>__TITLE__</h3>
+  <div>Min edge weight: <input id="threshold" type="range" min="1" max="1" value="1"> <span id="thresholdValue">1</span></div>
+  <div><label><input id="hideIsolated" type="checkbox" checked> Hide nodes without visible edges</label></div>
+  <div><button id="expandAll">Expand all</button><button id="collapseAll">Collapse all</button><button id="resetView">Reset view</button></div>
+  <div id="stats"></div>
+  <div id="info">Click a community to expand it; shift-click a character to collapse its community. Scroll to zoom, drag to pan.</div>
+</div>
+<script>
+const DATA = __GRAPH_DATA__;
+
+function decode(b64, Type) {
+  const bin = atob(b64);
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  return new Type(bytes.buffer);
+}
+
+const names = DATA.names;
+const N = names.length;
+const pos = decode(DATA.positions, Float32Array);
+const groups = decode(DATA.groups, Uint16Array);
+const sizes = decode(DATA.sizes, Float32Array);
+const strength = decode(DATA.strength, Float32Array);
+const edges = decode(DATA.edges, Uint32Array);
+const weights = decode(DATA.weights, Float32Array);
+const M = weights.length;
+
+function hexToRgb(hex) {
+  const v = parseInt(hex.slice(1), 16);
+  return [(v >> 16 & 255) / 255, (v >> 8 & 255) / 255, (v & 255) / 255];
+}
+const palette = DATA.colors.map(hexToRgb);
+const colorOf = g => palette[g % palette.length];
+
+// --- Communities (super-nodes) ---
+const communities = new Map();
+for (let i = 0; i < N; i++) {
+  const g = groups[i];
+  if (!communities.has(g)) communities.set(g, { id: g, members: [], x: 0, y: 0, internal: 0 });
+  const c = communities.get(g);
+  c.members.push(i); c.x += pos[2 * i]; c.y += pos[2 * i + 1];
+}
+for (const c of communities.values()) { c.x /= c.members.length; c.y /= c.members.length; }
+// Interactions inside a community (edges to other communities are shown as super-edges)
+for (let e = 0; e < M; e++) {
+  const g = groups[edges[2 * e]];
+  if (g === groups[edges[2 * e + 1]]) communities.get(g).internal += weights[e];
+}
+
+const expanded = new Set();
+if (communities.size <= 1) for (const g of communities.keys()) expanded.add(g);
+
+// --- Display lists (rebuilt on every level-of-detail change) ---
+let display = { nodes: [], edges: [] };
+
+function displayKey(i) { return expanded.has(groups[i]) ? i : N + groups[i]; }
+
+function rebuild() {
+  const threshold = parseFloat(document.getElementById('threshold').value);
+  const hideIsolated = document.getElementById('hideIsolated').checked;
+
+  // Aggregate edges onto visible endpoints (members or their super-node)
+  const agg = new Map();
+  for (let e = 0; e < M; e++) {
+    const a = displayKey(edges[2 * e]), b = displayKey(edges[2 * e + 1]);
+    if (a === b) continue;
+    const key = a < b ? a * 4294967296 + b : b * 4294967296 + a;
+    agg.set(key, (agg.get(key) || 0) + weights[e]);
+  }
+  const visibleEdges = [];
+  const touched = new Set();
+  let maxWeight = 1;
+  for (const [key, w] of agg) {
+    maxWeight = Math.max(maxWeight, w);
+    if (w < threshold) continue;
+    const a = Math.floor(key / 4294967296), b = key % 4294967296;
+    visibleEdges.push([a, b, w]); touched.add(a); touched.add(b);
+  }
+  const slider = document.getElementById('threshold');
+  slider.max = Math.max(1, Math.ceil(maxWeight));
+
+  const nodes = [];
+  for (const c of communities.values()) {
+    if (expanded.has(c.id)) {
+      for (const i of c.members) {
+        if (hideIsolated && !touched.has(i) && threshold > 1) continue;
+        nodes.push({ key: i, x: pos[2 * i], y: pos[2 * i + 1], size: sizes[i], color: colorOf(c.id),
+                     label: names[i], detail: `Community ${c.id} · ${strength[i]} interactions`, group: c.id, isSuper: false });
+      }
+    } else {
+      const key = N + c.id;
+      if (hideIsolated && !touched.has(key) && threshold > 1) continue;
+      nodes.push({ key, x: c.x, y: c.y, size: 14 + 6 * Math.sqrt(c.members.length), color: colorOf(c.id),
+                   label: `Community ${c.id} (${c.members.length})`, detail: `${c.members.length} characters · ${c.internal} interactions within`,
+                   group: c.id, isSuper: true });
+    }
+  }
+  const byKey = new Map(nodes.map(n => [n.key, n]));
+  display = {
+    nodes,
+    edges: visibleEdges.filter(([a, b]) => byKey.has(a) && byKey.has(b)).map(([a, b, w]) => [byKey.get(a), byKey.get(b), w]),
+    maxWeight,
+  };
+  document.getElementById('stats').textContent =
+    `${display.nodes.length} nodes, ${display.edges.length} edges shown (${N} characters, ${M} relationships)`;
+  upload();
+  draw();
+}
+
+// --- WebGL ---
+const canvas = document.getElementById('gl');
+const labels = document.getElementById('labels');
+const ctx = labels.getContext('2d');
+const gl = canvas.getContext('webgl', { antialias: true });
+if (!gl) document.getElementById('info').textContent = 'WebGL is not available in this browser.';
+
+const VERT = `
+attribute vec2 a_pos; attribute vec4 a_color; attribute float a_size;
+uniform vec2 u_center; uniform vec2 u_scale; uniform float u_pointScale;
+varying vec4 v_color;
+void main() {
+  gl_Position = vec4((a_pos - u_center) * u_scale, 0.0, 1.0);
+  gl_PointSize = a_size * u_pointScale;
+  v_color = a_color;
+}`;
+const FRAG = `
+precision mediump float; uniform bool u_points; varying vec4 v_color;
+void main() {
+  if (u_points) { vec2 d = gl_PointCoord - vec2(0.5); if (dot(d, d) > 0.25) discard; }
+  gl_FragColor = v_color;
+}`;
+
+function compile(type, source) {
+  const shader = gl.createShader(type);
+  gl.shaderSource(shader, source); gl.compileShader(shader);
+  return shader;
+}
+const program = gl.createProgram();
+gl.attachShader(program, compile(gl.VERTEX_SHADER, VERT));
+gl.attachShader(program, compile(gl.FRAGMENT_SHADER, FRAG));
+gl.linkProgram(program);
+gl.useProgram(program);
+const loc = {
+  pos: gl.getAttribLocation(program, 'a_pos'), color: gl.getAttribLocation(program, 'a_color'),
+  size: gl.getAttribLocation(program, 'a_size'), center: gl.getUniformLocation(program, 'u_center'),
+  scale: gl.getUniformLocation(program, 'u_scale'), pointScale: gl.getUniformLocation(program, 'u_pointScale'),
+  points: gl.getUniformLocation(program, 'u_points'),
+};
+const buffers = { edgePos: gl.createBuffer(), edgeColor: gl.createBuffer(), nodePos: gl.createBuffer(),
+                  nodeColor: gl.createBuffer(), nodeSize: gl.createBuffer() };
+let counts = { edges: 0, nodes: 0 };
+
+function upload() {
+  const ep = new Float32Array(display.edges.length * 4), ec = new Float32Array(display.edges.length * 8);
+  display.edges.forEach(([a, b, w], k) => {
+    ep.set([a.x, a.y, b.x, b.y], 4 * k);
+    const alpha = 0.15 + 0.6 * Math.log(1 + w) / Math.log(1 + display.maxWeight);
+    ec.set([0.7, 0.7, 0.7, alpha, 0.7, 0.7, 0.7, alpha], 8 * k);
+  });
+  const np_ = new Float32Array(display.nodes.length * 2), nc = new Float32Array(display.nodes.length * 4),
+        ns = new Float32Array(display.nodes.length);
+  display.nodes.forEach((n, k) => { np_.set([n.x, n.y], 2 * k); nc.set([...n.color, 1.0], 4 * k); ns[k] = n.size; });
+  for (const [buf, data] of [[buffers.edgePos, ep], [buffers.edgeColor, ec], [buffers.nodePos, np_],
+                             [buffers.nodeColor, nc], [buffers.nodeSize, ns]]) {
+    gl.bindBuffer(gl.ARRAY_BUFFER, buf); gl.bufferData(gl.ARRAY_BUFFER, data, gl.STATIC_DRAW);
+  }
+  counts = { edges: display.edges.length * 2, nodes: display.nodes.length };
+}
+
+// --- Camera ---
+const view = { cx: 0, cy: 0, zoom: 1 };
+function resetView() {
+  let minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity;
+  for (let i = 0; i < N; i++) {
+    minX = Math.min(minX, pos[2 * i]); maxX = Math.max(maxX, pos[2 * i]);
+    minY = Math.min(minY, pos[2 * i + 1]); maxY = Math.max(maxY, pos[2 * i + 1]);
+  }
+  view.cx = (minX + maxX) / 2; view.cy = (minY + maxY) / 2;
+  view.zoom = 0.9 * Math.min(canvas.width / Math.max(maxX - minX, 1), canvas.height / Math.max(maxY - minY, 1));
+}
+function toScreen(x, y) { return [(x - view.cx) * view.zoom + canvas.width / 2, (y - view.cy) * view.zoom + canvas.height / 2]; }
+function toWorld(sx, sy) { return [(sx - canvas.width / 2) / view.zoom + view.cx, (sy - canvas.height / 2) / view.zoom + view.cy]; }
+
+function bindAttrib(buf, location, size) {
+  gl.bindBuffer(gl.ARRAY_BUFFER, buf); gl.enableVertexAttribArray(location);
+  gl.vertexAttribPointer(location, size, gl.FLOAT, false, 0, 0);
+}
+
+function draw() {
+  gl.viewport(0, 0, canvas.width, canvas.height);
+  gl.clearColor(0.1, 0.1, 0.1, 1); gl.clear(gl.COLOR_BUFFER_BIT);
+  gl.enable(gl.BLEND); gl.blendFunc(gl.SRC_ALPHA, gl.ONE_MINUS_SRC_ALPHA);
+  gl.uniform2f(loc.center, view.cx, view.cy);
+  gl.uniform2f(loc.scale, 2 * view.zoom / canvas.width, -2 * view.zoom / canvas.height);
+  gl.uniform1f(loc.pointScale, Math.min(Math.max(view.zoom, 0.3), 3));
+
+  gl.uniform1i(loc.points, 0);
+  bindAttrib(buffers.edgePos, loc.pos, 2); bindAttrib(buffers.edgeColor, loc.color, 4);
+  gl.disableVertexAttribArray(loc.size); gl.vertexAttrib1f(loc.size, 1.0);
+  gl.drawArrays(gl.LINES, 0, counts.edges);
+
+  gl.uniform1i(loc.points, 1);
+  bindAttrib(buffers.nodePos, loc.pos, 2); bindAttrib(buffers.nodeColor, loc.color, 4);
+  bindAttrib(buffers.nodeSize, loc.size, 1);
+  gl.drawArrays(gl.POINTS, 0, counts.nodes);
+
+  drawLabels();
+}
+
+function drawLabels() {
+  ctx.clearRect(0, 0, labels.width, labels.height);
+  ctx.fillStyle = '#fff'; ctx.font = '12px sans-serif'; ctx.textAlign = 'center';
+  const onScreen = display.nodes.filter(n => {
+    const [sx, sy] = toScreen(n.x, n.y);
+    return sx >= 0 && sy >= 0 && sx <= labels.width && sy <= labels.height;
+  }).sort((a, b) => b.size - a.size).slice(0, 60);
+  for (const n of onScreen) {
+    const [sx, sy] = toScreen(n.x, n.y);
+    ctx.fillText(n.label, sx, sy - n.size * Math.min(Math.max(view.zoom, 0.3), 3) / 2 - 4);
+  }
+}
+
+function nearestNode(sx, sy) {
+  let best = null, bestDist = Infinity;
+  const pointScale = Math.min(Math.max(view.zoom, 0.3), 3);
+  for (const n of display.nodes) {
+    const [nx, ny] = toScreen(n.x, n.y);
+    const d = Math.hypot(nx - sx, ny - sy);
+    if (d < Math.max(6, n.size * pointScale / 2) && d < bestDist) { best = n; bestDist = d; }
+  }
+  return best;
+}
+
+// --- Interaction ---
+function resize() {
+  canvas.width = labels.width = window.innerWidth;
+  canvas.height = labels.height = window.innerHeight;
+}
+let drag = null;
+canvas.addEventListener('mousedown', e => { drag = { x: e.clientX, y: e.clientY, moved: false }; });
+window.addEventListener('mouseup', e => {
+  if (drag && !drag.moved) {
+    const n = nearestNode(e.clientX, e.clientY);
+    if (n && n.isSuper) { expanded.add(n.group); rebuild(); }
+    else if (n && e.shiftKey) { expanded.delete(n.group); rebuild(); }
+  }
+  drag = null;
+});
+window.addEventListener('mousemove', e => {
+  if (drag) {
+    const dx = e.clientX - drag.x, dy = e.clientY - drag.y;
+    if (Math.abs(dx) + Math.abs(dy) > 2) drag.moved = true;
+    view.cx -= dx / view.zoom; view.cy -= dy / view.zoom;
+    drag.x = e.clientX; drag.y = e.clientY;
+    draw();
+    return;
+  }
+  const n = nearestNode(e.clientX, e.clientY);
+  // Labels are character names from the data: insert them as text, never as HTML
+  const info = document.getElementById('info');
+  if (n) {
+    const label = document.createElement('b');
+    label.textContent = n.label;
+    info.replaceChildren(label, document.createElement('br'), n.detail);
+  } else {
+    info.textContent = '\u00a0';
+  }
+});
+canvas.addEventListener('wheel', e => {
+  e.preventDefault();
+  const [wx, wy] = toWorld(e.clientX, e.clientY);
+  view.zoom *= Math.exp(-e.deltaY * 0.001);
+  view.cx = wx - (e.clientX - canvas.width / 2) / view.zoom;
+  view.cy = wy - (e.clientY - canvas.height / 2) / view.zoom;
+  draw();
+}, { passive: false });
+document.getElementById('threshold').addEventListener('input', e => {
+  document.getElementById('thresholdValue').textContent = e.target.value; rebuild();
+});
+document.getElementById('hideIsolated').addEventListener('change', rebuild);
+document.getElementById('expandAll').addEventListener('click', () => { for (const g of communities.keys()) expanded.add(g); rebuild(); });
+document.getElementById('collapseAll').addEventListener('click', () => { expanded.clear(); rebuild(); });
+document.getElementById('resetView').addEventListener('click', () => { resetView(); draw(); });
+window.addEventListener('resize', () => { resize(); draw(); });
+
+resize();
+resetView();
+rebuild();
+</script>
+</body>
+</html>
+"""
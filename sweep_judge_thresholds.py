@@ -0,0 +1,96 @@
+"""
+Judge Threshold Sweep - Picks judge thresholds from stored scores, without the API.
+
+Reads the raw scores that `run_judge_pipeline.py` stores in
+`llm_results/<book>_judged/` and evaluates every accept threshold in one
+vectorised pass (see `src/judge_sweep.py`): acceptance, review and rejection
+rates, plus precision/recall/F1 of the accepted interactions against the gold
+annotations. --materialise writes the filtered output for one threshold as the
+run `<book>_judged_tNNN`, ready for `run_evaluation.py` and `build_graph.py`.
+
+Usage:
+    uv run sweep_judge_thresholds.py book_1
+    uv run sweep_judge_thresholds.py --all --reject-threshold 0.2
+    uv run sweep_judge_thresholds.py book_1 --materialise 0.65
+    uv run sweep_judge_thresholds.py book_1 --materialise best
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.settings import Settings
+from src.character_mapper import CharacterMapper
+from src.evaluation_metrics import load_gold_corpus
+from src.judge_sweep import (JUDGED_SUFFIX, generate_sweep_report, load_judged_scores, materialise,
+                             save_sweep, sweep_thresholds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep judge thresholds over the stored judge scores.")
+    parser.add_argument("book_names", nargs="*", help="Judged books to sweep together (e.g. 'book_1').")
+    parser.add_argument("--all", action="store_true", help="Sweep every book with a '<book>_judged' directory.")
+    parser.add_argument("--reject-threshold", type=float, default=None,
+                        help="Scores below this are rejected (default: judge.reject_threshold).")
+    parser.add_argument("--step", type=float, default=None,
+                        help="Spacing of the accept thresholds (default: judge.sweep_step).")
+    parser.add_argument("--materialise", default=None, metavar="THRESHOLD",
+                        help="Write the filtered output for this accept threshold, or 'best' (strict F1).")
+    parser.add_argument("--raw-names", action="store_true",
+                        help="Do not resolve character aliases before matching the gold.")
+    parser.add_argument("--output-dir", type=Path, default=Path("./analysis_reports/judge_sweep"),
+                        help="Where the sweep curves are written.")
+    args = parser.parse_args()
+
+    settings = Settings(config_path="config.yaml")
+    reject_threshold = settings.JUDGE_REJECT_THRESHOLD if args.reject_threshold is None else args.reject_threshold
+    step = args.step or settings.JUDGE_SWEEP_STEP
+
+    names = list(args.book_names)
+    if args.all:
+        names += sorted((p.name[:-len(JUDGED_SUFFIX)] for p in settings.RESULTS_DIR.glob(f"*{JUDGED_SUFFIX}")
+                         if p.is_dir() and p.name[:-len(JUDGED_SUFFIX)] not in names),
+                        key=lambda name: (len(name), name))
+    if not names:
+        parser.error("Give at least one book name, or --all.")
+    missing = [name for name in names if not (settings.RESULTS_DIR / f"{name}{JUDGED_SUFFIX}").is_dir()]
+    if missing:
+        print(f"FATAL: No judge results for {missing}. Run 'run_judge_pipeline.py <book>' first.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    scores = load_judged_scores(settings.RESULTS_DIR, names)
+    if not scores.records:
+        print(f"FATAL: No judged interactions found for {names}.")
+        sys.exit(1)
+    gold = load_gold_corpus(str(settings.GOLD_ANNOTATIONS_DIR))
+    name_resolver = None
+    if not args.raw_names:
+        name_resolver = CharacterMapper(file_path=str(settings.CHARACTER_FILE)).get_canonical_name
+
+    thresholds = np.round(np.arange(0.0, 1.0 + step / 2, step), 6)
+    sweep = sweep_thresholds(scores, gold, thresholds, reject_threshold=reject_threshold,
+                             name_resolver=name_resolver)
+    name = "_".join(names)
+    report_path, json_path, csv_path = save_sweep(sweep, name, args.output_dir)
+    print(generate_sweep_report(sweep, name))
+    print(f"\nSwept {len(thresholds)} thresholds over {sweep.judged} judged interactions "
+          f"in {time.perf_counter() - start:.2f}s.")
+    if not sweep.gold_documents:
+        print("No judged chapter has gold annotations; only the acceptance curves were computed.")
+    print(f"Curves saved to {csv_path} and {json_path}\nReport saved to {report_path}")
+
+    if args.materialise is not None:
+        if args.materialise == "best":
+            accept_threshold = sweep.best_threshold("strict")
+            if accept_threshold is None:
+                print("FATAL: --materialise best needs gold annotations for a judged chapter.")
+                sys.exit(1)
+        else:
+            accept_threshold = float(args.materialise)
+        run_dirs = materialise(scores, accept_threshold, reject_threshold, settings.RESULTS_DIR)
+        print(f"\nMaterialised accept >= {accept_threshold:.2f}, reject < {reject_threshold:.2f}:")
+        for run_dir in run_dirs:
+            print(f"  -> {run_dir}")
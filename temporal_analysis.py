@@ -0,0 +1,46 @@
+import argparse
+import re
+import sys
+from pathlib import Path
+
+from src.settings import Settings
+from src.character_mapper import CharacterMapper
+from src.temporal_network import TemporalNetwork, SERIES_MODES
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export chapter-by-chapter network snapshots for one or more books.")
+    parser.add_argument("book_names", nargs="*", help="Books to concatenate in order (e.g., 'book_1 book_2').")
+    parser.add_argument("--all", action="store_true", help="Use every 'book_N' results directory (the whole novel).")
+    parser.add_argument("--mode", choices=SERIES_MODES, default="cumulative", help="Slice type for each snapshot.")
+    parser.add_argument("--window", type=int, default=None, help="Window size in chapters (default: config value).")
+    parser.add_argument("--name", type=str, default=None, help="Report directory name (default: derived from books).")
+    args = parser.parse_args()
+
+    settings = Settings(config_path="config.yaml")
+
+    book_names = args.book_names
+    if args.all:
+        book_names = sorted((d.name for d in settings.RESULTS_DIR.iterdir() if re.fullmatch(r"book_\d+", d.name)),
+                            key=lambda name: int(name.split('_')[-1]))
+    if not book_names:
+        print("FATAL: Give at least one book name or use --all.")
+        sys.exit(1)
+
+    missing = [name for name in book_names if not (settings.RESULTS_DIR / name).exists()]
+    if missing:
+        print(f"FATAL: No results found for {missing}. Please run 'run_llm_extraction.py' first.")
+        sys.exit(1)
+
+    character_mapper = CharacterMapper(file_path=str(settings.CHARACTER_FILE))
+    temporal = TemporalNetwork.from_results(settings.RESULTS_DIR, book_names, character_mapper)
+    print(f"Temporal network: {temporal.num_chapters} chapters, {len(temporal.characters)} characters, "
+          f"{len(temporal.pair_u)} character pairs.")
+
+    report_name = args.name or ("novel" if args.all else "_".join(book_names))
+    report_dir = Path("./analysis_reports") / report_name
+    report_dir.mkdir(parents=True, exist_ok=True)
+
+    window = args.window or settings.TEMPORAL_WINDOW
+    output_path = report_dir / f"temporal_{args.mode}.csv"
+    temporal.export_series(output_path, mode=args.mode, window=window)
+    print(f"Snapshot series saved to {output_path}")